@@ -1,43 +1,216 @@
+import functools
 import logging
-import asyncio
-import json
-import os
+import statistics
 import sys
+import time
 from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
-    AgentSession,
     JobContext,
     JobProcess,
     MetricsCollectedEvent,
-    RoomInputOptions,
-    WorkerOptions,
-    cli,
     metrics,
-    tokenize,
     function_tool,
     RunContext,
 )
-from livekit.plugins import murf, silero, google, cartesia, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 # Add parent directory to path to enable imports
 sys.path.insert(0, str(Path(__file__).parent))
 import db
+from retrieval import ConceptRetriever, estimate_tokens
+from scheduler import ReviewScheduler
+from question_bank import QuestionBank, difficulty_for_repetitions, get_question_bank
+from handoff import HandoffPolicy
+import tts_pool
+from greeting import speak_greeting
+import session_factory
+import shared_data
+from session_factory import AgentSpec, SessionConfig
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
+# Number of concept titles mentioned when a mode introduces itself
+PREVIEW_CONCEPTS = 5
 
-class CoordinatorAgent(Agent):
-    """Main coordinator that greets users and handles mode switching."""
+# Per-concept teach-back scores and review schedules
+MASTERY_DB_PATH = shared_data.DATA_DIR / "mastery.db"
+
+
+def _log_handoff(from_mode: str, to_mode: str, seconds: float) -> None:
+    logger.info(f"Handoff {from_mode} -> {to_mode} took {seconds * 1000:.1f} ms")
+
+
+class PrefetchStats:
+    """Time-to-first-audio of learn-mode turns, split by whether the concept was prefetched."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[bool, list] = {True: [], False: []}
+
+    def record(self, prefetched: bool, seconds: float) -> None:
+        self.samples[prefetched].append(seconds)
+        label = "with" if prefetched else "without"
+        logger.info(f"Learn turn time-to-first-audio {label} prefetch: {seconds * 1000:.0f} ms")
+
+    def summary(self) -> str:
+        parts = []
+        for prefetched, label in ((True, "with prefetch"), (False, "without prefetch")):
+            samples = self.samples[prefetched]
+            if samples:
+                median = statistics.median(samples) * 1000
+                parts.append(f"{label}: {len(samples)} turns, median {median:.0f} ms")
+            else:
+                parts.append(f"{label}: no turns")
+        return "Time-to-first-audio " + "; ".join(parts)
+
+
+# Rendered (instructions, on_enter instructions) per mode and content version
+_RENDERED_INSTRUCTIONS: Dict[Tuple[str, str], Tuple[str, str]] = {}
 
-    def __init__(self, content: list) -> None:
+
+class TutorModes:
+    """Per-session registry that builds each mode agent once and reuses it on later handoffs."""
+
+    def __init__(
+        self,
+        content: list,
+        retriever: Optional[ConceptRetriever] = None,
+        on_handoff: Optional[Callable[[str, str, float], None]] = None,
+        handoff_policy: Optional[HandoffPolicy] = None,
+        prefetch: bool = True,
+    ) -> None:
+        self.content = content
+        self.retriever = retriever or ConceptRetriever(content)
+        self.on_handoff = on_handoff or _log_handoff
+        self.handoff_policy = handoff_policy or HandoffPolicy()
+        self.prefetch = prefetch
+        self.prefetch_stats = PrefetchStats()
+        self._agents: Dict[str, "TutorAgent"] = {}
+        self._pending: Optional[Tuple[str, str, float]] = None
+
+    def register(self, agent: "TutorAgent") -> None:
+        self._agents.setdefault(agent.mode, agent)
+
+    def get(self, mode: str) -> "TutorAgent":
+        """Return the session's agent for a mode, creating it on first use."""
+        agent = self._agents.get(mode)
+        if agent is None:
+            agent = MODE_AGENTS[mode](self.content, retriever=self.retriever, modes=self)
+        return agent
+
+    async def switch(self, from_agent: "TutorAgent", to_mode: str) -> Tuple["TutorAgent", str]:
+        """Hand off to another mode, carrying a bounded slice of the recent conversation.
+
+        Latency is reported once the new agent is entered.
+        """
+        self._pending = (from_agent.mode, to_mode, time.perf_counter())
+        agent = self.get(to_mode)
+        carried, tokens = self.handoff_policy.carry_over(from_agent.chat_ctx)
+        await agent.update_chat_ctx(carried)
+        logger.info(
+            f"Handoff {from_agent.mode} -> {to_mode} carried {len(carried.items)} items "
+            f"(~{tokens} tokens, prompt ~{estimate_tokens(agent.instructions) + tokens} tokens)"
+        )
+        return agent, SWITCH_MESSAGES[to_mode]
+
+    def entered(self, mode: str) -> None:
+        if self._pending is None or self._pending[1] != mode:
+            return
+        from_mode, to_mode, started = self._pending
+        self._pending = None
+        self.on_handoff(from_mode, to_mode, time.perf_counter() - started)
+
+
+class TutorAgent(Agent):
+    """Base for tutor modes: cached instructions, per-mode voice and per-turn concept injection."""
+
+    mode = ""
+    voice = "en-US-matthew"
+    include_sample_questions = False
+    inject_concepts = True
+    instructions_template = ""
+    enter_template = ""
+    # Fixed opening line spoken from cached audio the first time the mode is entered
+    greeting = ""
+
+    def __init__(
+        self,
+        content: list,
+        retriever: Optional[ConceptRetriever] = None,
+        modes: Optional[TutorModes] = None,
+    ) -> None:
         self.content = content
-        super().__init__(
-            instructions="""You are a friendly learning coordinator for a programming tutor system.
+        self.modes = modes or TutorModes(content, retriever)
+        self.retriever = retriever or self.modes.retriever
+        self.modes.register(self)
+        self._greeted = False
+        instructions, self.enter_instructions = self.render_instructions()
+        # This mode's voice, leased for the session; switching modes swaps which TTS it uses
+        super().__init__(instructions=instructions, tts=tts_pool.get_tts(self.voice))
+
+    def render_instructions(self) -> Tuple[str, str]:
+        """Render this mode's instructions once per content version."""
+        key = (self.mode, self.retriever.version)
+        rendered = _RENDERED_INSTRUCTIONS.get(key)
+        if rendered is None:
+            preview = self.concept_preview()
+            rendered = (
+                self.instructions_template.format(concepts=preview),
+                self.enter_template.format(concepts=preview),
+            )
+            _RENDERED_INSTRUCTIONS[key] = rendered
+        return rendered
+
+    def concept_preview(self) -> str:
+        """A short list of example concepts for mode introductions."""
+        titles = self.retriever.titles(limit=PREVIEW_CONCEPTS)
+        if len(self.content) > PREVIEW_CONCEPTS:
+            titles.append("and more")
+        return ", ".join(titles)
+
+    async def on_enter(self) -> None:
+        """Called when this agent becomes active."""
+        self.modes.entered(self.mode)
+        if self.greeting and not self._greeted:
+            self._greeted = True
+            await speak_greeting(self.session, self.greeting, self.voice)
+            return
+        await self.session.generate_reply(instructions=self.enter_instructions)
+
+    async def on_user_turn_completed(self, turn_ctx, new_message) -> None:
+        """Retrieve the top-k concepts for this turn and add them to the chat context."""
+        concepts = []
+        if self.inject_concepts:
+            concepts = self.retriever.search(new_message.text_content or "")
+        injected = 0
+        if concepts:
+            context = self.retriever.render_context(
+                concepts, include_question=self.include_sample_questions
+            )
+            turn_ctx.add_message(role="assistant", content=context)
+            injected = estimate_tokens(context)
+        history = sum(
+            estimate_tokens(item.text_content or "")
+            for item in turn_ctx.items
+            if item.type == "message"
+        )
+        logger.info(
+            f"{type(self).__name__} turn prompt ~{estimate_tokens(self.instructions) + history} tokens "
+            f"(instructions {estimate_tokens(self.instructions)}, "
+            f"{len(concepts)} concepts injected ~{injected} tokens)"
+        )
+
+
+class CoordinatorAgent(TutorAgent):
+    """Main coordinator that greets users and handles mode switching."""
+
+    mode = "coordinator"
+    voice = "en-US-matthew"
+    inject_concepts = False
+    instructions_template = """You are a friendly learning coordinator for a programming tutor system.
 
             Your role is to help users choose between three learning modes:
             1. LEARN mode - I will explain programming concepts to you
@@ -46,50 +219,40 @@ class CoordinatorAgent(Agent):
 
             Be warm and encouraging. Ask the user which mode they'd like to start with,
             or help them switch modes if they request it during the conversation."""
-        )
-
-    async def on_enter(self) -> None:
-        """Called when this agent becomes active."""
-        # Ensure voice is Matthew
-        self.session.tts = murf.TTS(
-            voice="en-US-matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-        await self.session.generate_reply(
-            instructions="""Greet the user warmly and introduce yourself as their learning coordinator.
+    enter_template = """Greet the user warmly and introduce yourself as their learning coordinator.
             Briefly explain the three learning modes available (learn, quiz, teach-back) and ask 
             which mode they'd like to start with."""
-        )
+    greeting = (
+        "Hi, I'm your learning coordinator! I can explain programming concepts in learn mode, "
+        "test you in quiz mode, or listen while you teach a concept back to me. "
+        "Which would you like to start with?"
+    )
 
     @function_tool()
     async def switch_to_learn(self, context: RunContext):
         """Switch to learn mode where the agent explains programming concepts."""
-        return LearnAgent(self.content), "Switching to learn mode"
+        return await self.modes.switch(self, "learn")
 
     @function_tool()
     async def switch_to_quiz(self, context: RunContext):
         """Switch to quiz mode where the agent asks questions to test knowledge."""
-        return QuizAgent(self.content), "Switching to quiz mode"
+        return await self.modes.switch(self, "quiz")
 
     @function_tool()
     async def switch_to_teach_back(self, context: RunContext):
         """Switch to teach-back mode where the user explains concepts to the agent."""
-        return TeachBackAgent(self.content), "Switching to teach-back mode"
+        return await self.modes.switch(self, "teach_back")
 
 
-class LearnAgent(Agent):
+class LearnAgent(TutorAgent):
     """Learn mode agent that explains concepts using Matthew's voice."""
 
-    def __init__(self, content: list) -> None:
-        self.content = content
-        self.concepts_dict = {c["id"]: c for c in content}
-        concepts_list = ", ".join([c["title"] for c in content])
-        super().__init__(
-            instructions=f"""You are a patient and knowledgeable programming tutor in LEARN mode.
+    mode = "learn"
+    voice = "en-US-matthew"
+    instructions_template = """You are a patient and knowledgeable programming tutor in LEARN mode.
 
-            Available concepts you can teach: {concepts_list}
+            The curriculum concepts relevant to each user message are provided in the
+            conversation just before you reply. Use the explain_concept tool for any other concept.
 
             Your role:
             - Explain programming concepts clearly and thoroughly
@@ -99,29 +262,66 @@ class LearnAgent(Agent):
             - If asked about a concept, use the detailed summary provided in your knowledge
 
             When the user wants to switch modes, use the appropriate switch tool."""
-        )
-
-    async def on_enter(self) -> None:
-        """Called when this agent becomes active."""
-        # Ensure voice is Matthew
-        self.session.tts = murf.TTS(
-            voice="en-US-matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-        concepts_list = ", ".join([c["title"] for c in self.content])
-        await self.session.generate_reply(
-            instructions=f"""You are now in LEARN mode. 
-            
-            IMPORTANT: Do NOT ask what they want to learn if they just told you. 
-            Continue the conversation naturally based on what they just said.
+    enter_template = """You are now in LEARN mode. The recent conversation is above; continue from it.
             
             If they already mentioned a concept, start explaining it immediately.
-            If they haven't mentioned a specific concept yet, briefly say you're ready to teach them about: {concepts_list}.
+            If they haven't mentioned a specific concept yet, briefly say you're ready to teach them about topics such as: {concepts}.
             
             Be conversational and natural - don't repeat questions they already answered."""
+
+    def __init__(
+        self,
+        content: list,
+        retriever: Optional[ConceptRetriever] = None,
+        modes: Optional[TutorModes] = None,
+    ) -> None:
+        self._prefetched: Optional[dict] = None
+        self._turn_started: Optional[Tuple[float, bool]] = None
+        super().__init__(content, retriever=retriever, modes=modes)
+
+    async def on_enter(self) -> None:
+        """Called when this agent becomes active."""
+        if self.modes.prefetch:
+            self.session.on("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+        await super().on_enter()
+
+    async def on_exit(self) -> None:
+        """Called when this agent hands off to another mode."""
+        self.session.off("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.off("agent_state_changed", self._on_agent_state_changed)
+
+    def _on_user_input_transcribed(self, ev) -> None:
+        # Resolve the concept while the learner is still talking
+        if not ev.is_final:
+            concept = self.retriever.spot(ev.transcript)
+            if concept:
+                self._prefetched = concept
+
+    def _on_agent_state_changed(self, ev) -> None:
+        if ev.new_state == "speaking" and self._turn_started:
+            started, prefetched = self._turn_started
+            self._turn_started = None
+            self.modes.prefetch_stats.record(prefetched, time.perf_counter() - started)
+
+    async def on_user_turn_completed(self, turn_ctx, new_message) -> None:
+        """Answer prefetched concepts in one generation instead of a tool round-trip."""
+        concept, self._prefetched = self._prefetched, None
+        if concept is not None:
+            # The learner may have changed their mind after the interim transcript
+            concept = self.retriever.spot(new_message.text_content or "") or concept
+        self._turn_started = (time.perf_counter(), concept is not None)
+        if concept is None:
+            await super().on_user_turn_completed(turn_ctx, new_message)
+            return
+        turn_ctx.add_message(
+            role="assistant",
+            content=(
+                f"The learner is asking about {concept['title']}. Explain it now using this "
+                f"summary, without calling explain_concept: {concept['summary']}"
+            ),
         )
+        logger.info(f"Prefetched concept '{concept['id']}' from interim transcript")
 
     @function_tool()
     async def explain_concept(self, context: RunContext, concept_name: str):
@@ -130,41 +330,35 @@ class LearnAgent(Agent):
         Args:
             concept_name: The name or ID of the concept to explain (e.g., 'variables', 'loops', 'functions')
         """
-        concept = None
-        concept_name_lower = concept_name.lower()
-        for c in self.content:
-            if c["id"] == concept_name_lower or c["title"].lower() == concept_name_lower:
-                concept = c
-                break
+        concept = self.retriever.lookup(concept_name)
         if concept:
             return f"Here's the explanation for {concept['title']}: {concept['summary']}"
         else:
-            available = ", ".join([c["title"] for c in self.content])
+            suggestions = self.retriever.search(concept_name) or self.content[:PREVIEW_CONCEPTS]
+            available = ", ".join([c["title"] for c in suggestions])
             return f"I don't have information about '{concept_name}'. I can teach you about: {available}"
 
     @function_tool()
     async def switch_to_quiz(self, context: RunContext):
         """Switch to quiz mode to test your knowledge."""
-        return QuizAgent(self.content), "Switching to quiz mode"
+        return await self.modes.switch(self, "quiz")
 
     @function_tool()
     async def switch_to_teach_back(self, context: RunContext):
         """Switch to teach-back mode where you explain concepts."""
-        return TeachBackAgent(self.content), "Switching to teach-back mode"
+        return await self.modes.switch(self, "teach_back")
 
 
-class QuizAgent(Agent):
+class QuizAgent(TutorAgent):
     """Quiz mode agent that asks questions using Alicia's voice."""
 
-    def __init__(self, content: list) -> None:
-        self.content = content
-        self.concepts_dict = {c["id"]: c for c in content}
-        quiz_info = "\n".join([f"- {c['title']}: {c['sample_question']}" for c in content])
-        super().__init__(
-            instructions=f"""You are an engaging quiz tutor in QUIZ mode.
+    mode = "quiz"
+    voice = "en-US-alicia"
+    include_sample_questions = True
+    instructions_template = """You are an engaging quiz tutor in QUIZ mode.
 
-            Available quiz topics and sample questions:
-            {quiz_info}
+            The quiz topics and sample questions relevant to each user message are provided
+            in the conversation just before you reply. Use the ask_question tool for any other topic.
 
             Your role:
             - Ask questions about programming concepts to test understanding
@@ -172,78 +366,119 @@ class QuizAgent(Agent):
             - Encourage the user and help them learn from mistakes
             - Ask follow-up questions to deepen understanding
             - Use the sample questions as a guide, but feel free to ask related questions
+            - If the user doesn't name a topic, call ask_question without one to get the concept that is due for review
+            - After the user answers, call record_answer with a quality score from 0 (no idea) to 5 (perfect)
 
             When the user wants to switch modes, use the appropriate switch tool."""
-        )
-
-    async def on_enter(self) -> None:
-        """Called when this agent becomes active."""
-        # Set voice to Alicia
-        self.session.tts = murf.TTS(
-            voice="en-US-alicia",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-        topics = ", ".join([c["title"] for c in self.content])
-        await self.session.generate_reply(
-            instructions=f"""You are now in QUIZ mode.
-            
-            IMPORTANT: Do NOT ask what topic they want if they just told you.
-            Continue the conversation naturally based on what they just said.
+    enter_template = """You are now in QUIZ mode. The recent conversation is above; continue from it.
             
             If they already mentioned a topic, ask a question about it immediately.
-            If they haven't mentioned a specific topic yet, briefly say you can quiz them on: {topics}.
+            If they haven't mentioned a specific topic yet, briefly say you can quiz them on topics such as: {concepts}.
             
             Be conversational and natural - don't repeat questions they already answered."""
-        )
+
+    def __init__(
+        self,
+        content: list,
+        retriever: Optional[ConceptRetriever] = None,
+        modes: Optional[TutorModes] = None,
+        learner_id: str = "default",
+        question_bank: Optional[QuestionBank] = None,
+        scheduler: Optional[ReviewScheduler] = None,
+    ) -> None:
+        self.learner_id = learner_id
+        self.scheduler = scheduler
+        self.question_bank = question_bank or get_question_bank()
+        super().__init__(content, retriever=retriever, modes=modes)
+
+    def _get_scheduler(self) -> ReviewScheduler:
+        """Load the learner's review schedule from the mastery store on first use."""
+        if self.scheduler is None:
+            database = db.Database(str(MASTERY_DB_PATH))
+            self.scheduler = ReviewScheduler.load(
+                database, self.learner_id, [c["id"] for c in self.content]
+            )
+        return self.scheduler
 
     @function_tool()
-    async def ask_question(self, context: RunContext, topic: str):
-        """Ask a quiz question about a specific topic.
+    async def ask_question(self, context: RunContext, topic: Optional[str] = None):
+        """Ask a quiz question about a specific topic, or the concept due for review if no topic is given.
 
         Args:
-            topic: The topic to ask about (e.g., 'variables', 'loops', 'functions')
+            topic: The topic to ask about (e.g., 'variables', 'loops', 'functions'). Leave empty to let the scheduler pick.
         """
-        topic_lower = topic.lower()
-        concept = None
-        for c in self.content:
-            if c["id"] == topic_lower or c["title"].lower() == topic_lower:
-                concept = c
-                break
+        if not topic:
+            concept_id = self._get_scheduler().next_concept()
+            if concept_id is None:
+                return "There are no concepts to quiz on yet."
+            topic = concept_id
+        concept = self.retriever.lookup(topic)
+        if concept and self.question_bank and self.question_bank.has(concept["id"]):
+            state = self._get_scheduler().state(concept["id"])
+            difficulty = difficulty_for_repetitions(state.repetitions if state else 0)
+            banked = self.question_bank.pick(concept["id"], difficulty)
+            if banked is not None:
+                return (
+                    f"Here's a {banked['difficulty']} question about {concept['title']}: {banked['question']}\n"
+                    f"Reference answer (for grading, do not read aloud): {banked['answer']}"
+                )
         if concept:
             return f"Here's a question about {concept['title']}: {concept['sample_question']}"
         else:
-            available = ", ".join([c["title"] for c in self.content])
+            suggestions = self.retriever.search(topic) or self.content[:PREVIEW_CONCEPTS]
+            available = ", ".join([c["title"] for c in suggestions])
             return f"I don't have questions about '{topic}'. I can quiz you on: {available}"
 
+    @function_tool()
+    async def record_answer(self, context: RunContext, topic: str, quality: int):
+        """Record how well the user answered a quiz question so it is rescheduled for review.
+
+        Args:
+            topic: The topic the question was about
+            quality: Answer quality from 0 (no idea) to 5 (perfect recall)
+        """
+        concept = self.retriever.lookup(topic)
+        if not concept:
+            return f"I don't have a topic called '{topic}'."
+        state = self._get_scheduler().review(concept["id"], quality)
+
+        database = db.Database(str(MASTERY_DB_PATH))
+        database.save_review(
+            self.learner_id,
+            concept["id"],
+            state.ease_factor,
+            state.interval_days,
+            state.repetitions,
+            state.due_at,
+        )
+        days = state.interval_days
+        return f"Recorded. {concept['title']} will come up again in {days:g} day{'s' if days != 1 else ''}."
+
     @function_tool()
     async def switch_to_coordinator(self, context: RunContext):
         """Return to the main coordinator to choose a different mode."""
-        return CoordinatorAgent(self.content), "Returning to coordinator"
+        return await self.modes.switch(self, "coordinator")
 
     @function_tool()
     async def switch_to_learn(self, context: RunContext):
         """Switch to learn mode to have concepts explained."""
-        return LearnAgent(self.content), "Switching to learn mode"
+        return await self.modes.switch(self, "learn")
 
     @function_tool()
     async def switch_to_teach_back(self, context: RunContext):
         """Switch to teach-back mode where you explain concepts."""
-        return TeachBackAgent(self.content), "Switching to teach-back mode"
+        return await self.modes.switch(self, "teach_back")
 
 
-class TeachBackAgent(Agent):
+class TeachBackAgent(TutorAgent):
     """Teach-back mode agent that listens to user explanations using Ken's voice."""
 
-    def __init__(self, content: list) -> None:
-        self.content = content
-        self.concepts_dict = {c["id"]: c for c in content}
-        concepts_list = ", ".join([c["title"] for c in content])
-        super().__init__(
-            instructions=f"""You are a supportive coach in TEACH-BACK mode.
+    mode = "teach_back"
+    voice = "en-US-ken"
+    instructions_template = """You are a supportive coach in TEACH-BACK mode.
 
-            Available concepts: {concepts_list}
+            The curriculum concepts relevant to each user message, with their reference
+            summaries, are provided in the conversation just before you reply.
 
             Your role:
             - Ask the user to explain a programming concept back to you
@@ -259,41 +494,20 @@ class TeachBackAgent(Agent):
             - Was the explanation clear and accurate?
 
             When the user wants to switch modes, use the appropriate switch tool."""
-        )
-
-    async def on_enter(self) -> None:
-        """Called when this agent becomes active."""
-        # Set voice to Ken
-        self.session.tts = murf.TTS(
-            voice="en-US-ken",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-        concepts_list = ", ".join([c["title"] for c in self.content])
-        await self.session.generate_reply(
-            instructions=f"""You are now in TEACH-BACK mode.
-            
-            IMPORTANT: Do NOT ask what concept they want to explain if they just told you.
-            Continue the conversation naturally based on what they just said.
+    enter_template = """You are now in TEACH-BACK mode. The recent conversation is above; continue from it.
             
             If they already mentioned a concept, ask them to explain it to you immediately.
-            If they haven't mentioned a specific concept yet, briefly say they can teach you about: {concepts_list}.
+            If they haven't mentioned a specific concept yet, briefly say they can teach you about topics such as: {concepts}.
             
             Be conversational and natural - don't repeat questions they already answered."""
-        )
 
     @function_tool()
     async def evaluate_explanation(self, context: RunContext, concept: str, user_explanation: str):
         """Evaluate the user's explanation of a concept and provide feedback, updating mastery stats."""
-        concept_lower = concept.lower()
-        concept_data = None
-        for c in self.content:
-            if c["id"] == concept_lower or c["title"].lower() == concept_lower:
-                concept_data = c
-                break
+        concept_data = self.retriever.lookup(concept)
         if not concept_data:
-            return f"I'm not sure about the concept '{concept}'. Let's try one of these: {', '.join([c['title'] for c in self.content])}"
+            suggestions = self.retriever.search(concept) or self.content[:PREVIEW_CONCEPTS]
+            return f"I'm not sure about the concept '{concept}'. Let's try one of these: {', '.join([c['title'] for c in suggestions])}"
         # Simple scoring based on word overlap with official summary
         summary_words = set(concept_data["summary"].lower().split())
         explanation_words = set(user_explanation.lower().split())
@@ -301,8 +515,7 @@ class TeachBackAgent(Agent):
         score = int(overlap * 100)
         
         # Update mastery stats in database
-        db_path = Path(__file__).parent.parent / "shared-data" / "mastery.db"
-        database = db.Database(str(db_path))
+        database = db.Database(str(MASTERY_DB_PATH))
         database.update_teach_back_score(concept_data["id"], score)
         
         feedback = f"Great job! You covered {int(overlap * 100)}% of the key points."
@@ -313,8 +526,7 @@ class TeachBackAgent(Agent):
         """Return the concepts with the lowest average mastery score.
         Useful for the user to ask "Which concepts am I weakest at?".
         """
-        db_path = Path(__file__).parent.parent / "shared-data" / "mastery.db"
-        database = db.Database(str(db_path))
+        database = db.Database(str(MASTERY_DB_PATH))
         weakest = database.get_weakest_concepts(limit=top_n)
         
         if not weakest:
@@ -328,92 +540,83 @@ class TeachBackAgent(Agent):
     @function_tool()
     async def switch_to_coordinator(self, context: RunContext):
         """Return to the main coordinator to choose a different mode."""
-        return CoordinatorAgent(self.content), "Returning to coordinator"
+        return await self.modes.switch(self, "coordinator")
 
     @function_tool()
     async def switch_to_learn(self, context: RunContext):
         """Switch to learn mode to have concepts explained."""
-        return LearnAgent(self.content), "Switching to learn mode"
+        return await self.modes.switch(self, "learn")
 
     @function_tool()
     async def switch_to_quiz(self, context: RunContext):
         """Switch to quiz mode to test your knowledge."""
-        return QuizAgent(self.content), "Switching to quiz mode"
+        return await self.modes.switch(self, "quiz")
 
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+MODE_AGENTS = {
+    "coordinator": CoordinatorAgent,
+    "learn": LearnAgent,
+    "quiz": QuizAgent,
+    "teach_back": TeachBackAgent,
+}
 
+SWITCH_MESSAGES = {
+    "coordinator": "Returning to coordinator",
+    "learn": "Switching to learn mode",
+    "quiz": "Switching to quiz mode",
+    "teach_back": "Switching to teach-back mode",
+}
 
-async def entrypoint(ctx: JobContext):
-    ctx.log_context_fields = {"room": ctx.room.name}
-
-    # Load learning content from JSON file
-    content_path = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
-    try:
-        with open(content_path, "r") as f:
-            learning_content = json.load(f)
-        logger.info(f"Loaded {len(learning_content)} concepts from {content_path}")
-    except Exception as e:
-        logger.error(f"Failed to load learning content: {e}")
-        learning_content = []
-
-    # Initialize database and populate concepts
-    db_path = Path(__file__).parent.parent / "shared-data" / "mastery.db"
-    database = db.Database(str(db_path))
+
+@functools.lru_cache(maxsize=None)
+def warm_tutor_data() -> None:
+    """Parse the curriculum, build its index and question bank, and sync it to the database.
+
+    Runs once per process, in prewarm when possible.
+    """
+    learning_content = shared_data.tutor_content()
+    shared_data.concept_retriever()
+    get_question_bank()
+
+    database = db.Database(str(MASTERY_DB_PATH))
     for c in learning_content:
         database.upsert_concept(c["id"], c["title"])
 
-    # Create the coordinator agent
-    agent = CoordinatorAgent(content=learning_content)
-
-    # Create agent session with voice configuration
-    session_agent = AgentSession(
-        stt=cartesia.STT(model="ink-whisper"),
-        llm=google.LLM(model="gemini-2.5-flash-lite"),
-        tts=murf.TTS(
-            voice="en-US-matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
-        preemptive_generation=True,
-    )
 
-    usage_collector = metrics.UsageCollector()
+def build_tutor_agent() -> TutorAgent:
+    """Return the coordinator for a new session."""
+    warm_tutor_data()
+    # Mode agents are built on first handoff and reused
+    modes = TutorModes(shared_data.tutor_content(), retriever=shared_data.concept_retriever())
+    return modes.get("coordinator")
 
-    @session_agent.on("metrics_collected")
-    def _on_metrics_collected(ev: MetricsCollectedEvent):
-        metrics.log_metrics(ev.metrics)
-        usage_collector.collect(ev.metrics)
 
-    async def log_usage():
-        summary = usage_collector.get_summary()
-        logger.info(f"Usage: {summary}")
+def _log_prompt_tokens(ev: MetricsCollectedEvent) -> None:
+    if isinstance(ev.metrics, metrics.LLMMetrics):
+        logger.info(f"LLM prompt tokens this turn: {ev.metrics.prompt_tokens}")
 
-    ctx.add_shutdown_callback(log_usage)
 
-    await session_agent.start(
-        agent=agent,
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
+def _log_prefetch(agent: TutorAgent) -> None:
+    logger.info(agent.modes.prefetch_stats.summary())
 
-    await ctx.connect()
 
-    shutdown_future = asyncio.Future()
+AGENT_SPEC = AgentSpec(
+    name="tutor",
+    build=build_tutor_agent,
+    warm=warm_tutor_data,
+    config=SessionConfig(voice=CoordinatorAgent.voice),
+    on_metrics=_log_prompt_tokens,
+    on_shutdown=_log_prefetch,
+)
 
-    @ctx.room.on("disconnected")
-    def on_disconnected(reason):
-        if not shutdown_future.done():
-            shutdown_future.set_result(None)
 
-    await shutdown_future
+def prewarm(proc: JobProcess):
+    session_factory.prewarm(proc, [AGENT_SPEC])
+
+
+async def entrypoint(ctx: JobContext):
+    await session_factory.run_session(ctx, AGENT_SPEC)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    session_factory.run_app(entrypoint, prewarm)
@@ -1,29 +1,22 @@
 import logging
-import asyncio
 import json
-import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
-    AgentSession,
     JobContext,
     JobProcess,
-    MetricsCollectedEvent,
-    RoomInputOptions,
-    WorkerOptions,
-    cli,
-    metrics,
-    tokenize,
     function_tool,
     RunContext,
 )
-from livekit.plugins import murf, silero, google, cartesia, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 # Add parent directory to path to enable imports
 sys.path.insert(0, str(Path(__file__).parent))
+import session_factory
+import shared_data
+from session_factory import AgentSpec, SessionConfig
+from greeting import speak_greeting
 
 logger = logging.getLogger("food-ordering-agent")
 
@@ -33,16 +26,12 @@ load_dotenv(".env.local")
 class FoodOrderingAgent(Agent):
     """Food & Grocery Ordering Voice Agent."""
 
+    voice = "en-US-matthew"
+    greeting = "Hi, welcome to QuickCart! What can I help you shop for today?"
+
     def __init__(self) -> None:
-        # Load the food catalog
-        catalog_path = Path(__file__).parent.parent / "shared-data" / "food_catalog.json"
-        try:
-            with open(catalog_path, "r") as f:
-                self.catalog = json.load(f)
-            logger.info(f"Loaded food catalog with {len(self.catalog.get('categories', {}))} categories")
-        except Exception as e:
-            logger.error(f"Failed to load food catalog: {e}")
-            self.catalog = {"categories": {}, "recipes": {}}
+        # The food catalog is parsed once per process (see shared_data)
+        self.catalog = shared_data.food_catalog()
         
         # Initialize cart
         self.cart = []
@@ -68,6 +57,10 @@ class FoodOrderingAgent(Agent):
             Ask how you can help them with their shopping today."""
         )
 
+    async def on_enter(self) -> None:
+        """Called when this agent becomes active."""
+        await speak_greeting(self.session, self.greeting, self.voice)
+
     @function_tool()
     async def search_catalog(self, context: RunContext, query: str):
         """Search the food catalog for items matching the query.
@@ -399,63 +392,21 @@ class FoodOrderingAgent(Agent):
             logger.error(f"Failed to load order history: {e}")
             return "I'm sorry, I encountered an error while loading your order history."
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
-
-
-async def entrypoint(ctx: JobContext):
-    ctx.log_context_fields = {"room": ctx.room.name}
-
-    # Create the food ordering agent
-    agent = FoodOrderingAgent()
-
-    # Create agent session
-    session_agent = AgentSession(
-        stt=cartesia.STT(model="ink-whisper"),
-        llm=google.LLM(model="gemini-2.5-flash"),
-        tts=murf.TTS(
-            voice="en-US-matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
-        preemptive_generation=True,
-    )
-
-    usage_collector = metrics.UsageCollector()
-
-    @session_agent.on("metrics_collected")
-    def _on_metrics_collected(ev: MetricsCollectedEvent):
-        metrics.log_metrics(ev.metrics)
-        usage_collector.collect(ev.metrics)
-
-    async def log_usage():
-        summary = usage_collector.get_summary()
-        logger.info(f"Usage: {summary}")
-
-    ctx.add_shutdown_callback(log_usage)
-
-    await session_agent.start(
-        agent=agent,
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
+AGENT_SPEC = AgentSpec(
+    name="food",
+    build=FoodOrderingAgent,
+    warm=shared_data.food_catalog,
+    config=SessionConfig(voice=FoodOrderingAgent.voice, llm_model="gemini-2.5-flash"),
+)
 
-    await ctx.connect()
 
-    shutdown_future = asyncio.Future()
+def prewarm(proc: JobProcess):
+    session_factory.prewarm(proc, [AGENT_SPEC])
 
-    @ctx.room.on("disconnected")
-    def on_disconnected(reason):
-        if not shutdown_future.done():
-            shutdown_future.set_result(None)
 
-    await shutdown_future
+async def entrypoint(ctx: JobContext):
+    await session_factory.run_session(ctx, AGENT_SPEC)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
+    session_factory.run_app(entrypoint, prewarm)
\ No newline at end of file
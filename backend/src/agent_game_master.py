@@ -1,51 +1,43 @@
 import logging
-import asyncio
 import json
-import os
 import sys
 import random
 import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
-    AgentSession,
     JobContext,
     JobProcess,
-    MetricsCollectedEvent,
-    RoomInputOptions,
-    WorkerOptions,
-    cli,
-    metrics,
-    tokenize,
     function_tool,
     RunContext,
 )
-from livekit.plugins import murf, silero, google, cartesia, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 # Add parent directory to path to enable imports
 sys.path.insert(0, str(Path(__file__).parent))
+import session_factory
+import shared_data
+from session_factory import AgentSpec, SessionConfig
+from greeting import speak_greeting
 
 logger = logging.getLogger("game-master-agent")
 
 load_dotenv(".env.local")
 
+SAVES_DIR = shared_data.DATA_DIR / "game_saves"
+# Recent events kept in the world state when a session over its memory budget is compacted
+KEEP_EVENTS = 100
+
 
 class GameMasterAgent(Agent):
     """D&D-style Voice Game Master Agent with full RPG mechanics."""
 
+    voice = "en-US-matthew"
+    greeting = "Welcome, {name} the {player_class}. Gather close, your adventure is about to begin."
+
     def __init__(self, universe: str = "fantasy") -> None:
-        # Load universes from JSON
-        universes_path = Path(__file__).parent.parent / "shared-data" / "game_universes.json"
-        try:
-            with open(universes_path, "r") as f:
-                self.universes = json.load(f)
-            logger.info(f"Loaded {len(self.universes)} universes from {universes_path}")
-        except Exception as e:
-            logger.error(f"Failed to load universes: {e}")
-            self.universes = {}
+        # Universes are parsed once per process (see shared_data)
+        self.universes = shared_data.game_universes()
         
         # Set current universe
         self.current_universe = universe
@@ -118,13 +110,15 @@ Remember to:
     
     async def on_enter(self) -> None:
         """Called when this agent becomes active."""
-        self.session.tts = murf.TTS(
-            voice="en-US-matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
+        # Speak the fixed welcome at once; the narrated scene follows once the LLM responds
+        await speak_greeting(
+            self.session,
+            self.greeting.format(
+                name=self.player_character["name"],
+                player_class=self.player_character["class"],
+            ),
+            self.voice,
         )
-        
         # Start the adventure with the opening scenario
         await self.session.generate_reply(
             instructions=f"""Begin the adventure by narrating the opening scene:
@@ -157,7 +151,7 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
             "role": role,
             "attitude": attitude,
             "notes": notes,
-            "met_at": len(self.world_state["events"])
+            "met_at": self.event_count()
         }
         logger.info(f"Added character: {name} ({role}, {attitude})")
         return f"Noted: {name} the {role} (attitude: {attitude})"
@@ -180,7 +174,7 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
         self.world_state["locations"][name] = {
             "description": description,
             "connections": connections,
-            "visited_at": len(self.world_state["events"])
+            "visited_at": self.event_count()
         }
         logger.info(f"Added location: {name}")
         return f"Location tracked: {name}"
@@ -194,7 +188,7 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
         """
         self.world_state["events"].append({
             "description": event,
-            "turn": len(self.world_state["events"]) + 1
+            "turn": self.event_count() + 1
         })
         logger.info(f"Event recorded: {event}")
         return f"Event recorded: {event}"
@@ -247,7 +241,20 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
             return "Current world state:\n" + "\n".join(summary)
         else:
             return "The adventure has just begun. No major events yet."
-    
+
+    def event_count(self) -> int:
+        """Events recorded this adventure, including any dropped by compact_memory."""
+        return self.world_state.get("events_dropped", 0) + len(self.world_state["events"])
+
+    def compact_memory(self) -> str:
+        """Keep only the most recent events; called by session_memory when over budget."""
+        events = self.world_state["events"]
+        dropped = max(len(events) - KEEP_EVENTS, 0)
+        if dropped:
+            self.world_state["events"] = events[dropped:]
+            self.world_state["events_dropped"] = self.world_state.get("events_dropped", 0) + dropped
+        return f"dropped {dropped} old events"
+
     # ===== CHARACTER SHEET TOOLS (Advanced Goal #2) =====
     
     @function_tool()
@@ -440,10 +447,9 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
         }
         
         # Create saves directory if it doesn't exist
-        saves_dir = Path(__file__).parent.parent / "shared-data" / "game_saves"
-        saves_dir.mkdir(exist_ok=True)
+        SAVES_DIR.mkdir(exist_ok=True)
         
-        save_file = saves_dir / f"{save_name}.json"
+        save_file = SAVES_DIR / f"{save_name}.json"
         
         try:
             with open(save_file, "w") as f:
@@ -461,8 +467,7 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
         Args:
             save_name: Name of the save file to load
         """
-        saves_dir = Path(__file__).parent.parent / "shared-data" / "game_saves"
-        save_file = saves_dir / f"{save_name}.json"
+        save_file = SAVES_DIR / f"{save_name}.json"
         
         if not save_file.exists():
             return f"Save file '{save_name}' not found."
@@ -482,63 +487,26 @@ Be dramatic and engaging. Set the mood and atmosphere. Then ask the player what
             return f"Error loading game: {e}"
 
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+def build_game_master() -> GameMasterAgent:
+    # Default to the fantasy universe
+    return GameMasterAgent(universe="fantasy")
 
 
-async def entrypoint(ctx: JobContext):
-    ctx.log_context_fields = {"room": ctx.room.name}
-
-    # Create the game master agent (default to fantasy universe)
-    agent = GameMasterAgent(universe="fantasy")
-
-    # Create agent session
-    session_agent = AgentSession(
-        stt=cartesia.STT(model="ink-whisper"),
-        llm=google.LLM(model="gemini-2.5-flash-lite"),
-        tts=murf.TTS(
-            voice="en-US-matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
-        preemptive_generation=True,
-    )
-
-    usage_collector = metrics.UsageCollector()
-
-    @session_agent.on("metrics_collected")
-    def _on_metrics_collected(ev: MetricsCollectedEvent):
-        metrics.log_metrics(ev.metrics)
-        usage_collector.collect(ev.metrics)
-
-    async def log_usage():
-        summary = usage_collector.get_summary()
-        logger.info(f"Usage: {summary}")
-
-    ctx.add_shutdown_callback(log_usage)
-
-    await session_agent.start(
-        agent=agent,
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
+AGENT_SPEC = AgentSpec(
+    name="game_master",
+    build=build_game_master,
+    config=SessionConfig(voice=GameMasterAgent.voice),
+    warm=shared_data.game_universes,
+)
 
-    await ctx.connect()
 
-    shutdown_future = asyncio.Future()
+def prewarm(proc: JobProcess):
+    session_factory.prewarm(proc, [AGENT_SPEC])
 
-    @ctx.room.on("disconnected")
-    def on_disconnected(reason):
-        if not shutdown_future.done():
-            shutdown_future.set_result(None)
 
-    await shutdown_future
+async def entrypoint(ctx: JobContext):
+    await session_factory.run_session(ctx, AGENT_SPEC)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    session_factory.run_app(entrypoint, prewarm)
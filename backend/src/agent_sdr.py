@@ -1,29 +1,22 @@
 import logging
-import asyncio
 import json
-import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
-    AgentSession,
     JobContext,
     JobProcess,
-    MetricsCollectedEvent,
-    RoomInputOptions,
-    WorkerOptions,
-    cli,
-    metrics,
-    tokenize,
     function_tool,
     RunContext,
 )
-from livekit.plugins import murf, silero, google, cartesia, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 # Add parent directory to path to enable imports
 sys.path.insert(0, str(Path(__file__).parent))
+import session_factory
+import shared_data
+from session_factory import AgentSpec, SessionConfig
+from greeting import speak_greeting
 
 logger = logging.getLogger("sdr-agent")
 
@@ -33,6 +26,10 @@ load_dotenv(".env.local")
 class SDRAgent(Agent):
     """SDR Agent for Razorpay that answers FAQs and collects lead info."""
 
+    voice = "en-IN-Anisha"  # Professional female voice
+    voice_style = "Promo"
+    greeting = "Hi, thanks for reaching out to {company}! What brings you to {company} today?"
+
     def __init__(self, company_data: dict) -> None:
         self.company_data = company_data
         self.lead_info = {}
@@ -72,17 +69,11 @@ class SDRAgent(Agent):
 
     async def on_enter(self) -> None:
         """Called when this agent becomes active."""
-        # Use a professional voice
-        self.session.tts = murf.TTS(
-            voice="en-IN-Anisha", # Professional female voice
-            style="Promo",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-        
-        await self.session.generate_reply(
-            instructions=f"""Greet the user warmly as an SDR for {self.company_data['company']}. 
-            Ask how you can help them today or what brings them to {self.company_data['company']}."""
+        await speak_greeting(
+            self.session,
+            self.greeting.format(company=self.company_data["company"]),
+            self.voice,
+            self.voice_style,
         )
 
     @function_tool()
@@ -225,73 +216,25 @@ class SDRAgent(Agent):
         return summary_text
 
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
-
-
-async def entrypoint(ctx: JobContext):
-    ctx.log_context_fields = {"room": ctx.room.name}
-
-    # Load company data
-    data_path = Path(__file__).parent.parent / "shared-data" / "company_data.json"
-    try:
-        with open(data_path, "r") as f:
-            company_data = json.load(f)
-        logger.info(f"Loaded company data for {company_data.get('company')}")
-    except Exception as e:
-        logger.error(f"Failed to load company data: {e}")
-        company_data = {"company": "Unknown", "description": "", "pricing": {}, "faqs": []}
-
-    # Create the SDR agent
-    agent = SDRAgent(company_data=company_data)
-
-    # Create agent session
-    session_agent = AgentSession(
-        stt=cartesia.STT(model="ink-whisper"),
-        llm=google.LLM(model="gemini-2.5-flash-lite"),
-        tts=murf.TTS(
-            voice="en-IN-Anisha",
-            style="Promo",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
-        preemptive_generation=True,
-    )
-
-    usage_collector = metrics.UsageCollector()
-
-    @session_agent.on("metrics_collected")
-    def _on_metrics_collected(ev: MetricsCollectedEvent):
-        metrics.log_metrics(ev.metrics)
-        usage_collector.collect(ev.metrics)
+def build_sdr_agent() -> SDRAgent:
+    return SDRAgent(company_data=shared_data.company_data())
 
-    async def log_usage():
-        summary = usage_collector.get_summary()
-        logger.info(f"Usage: {summary}")
 
-    ctx.add_shutdown_callback(log_usage)
-
-    await session_agent.start(
-        agent=agent,
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
+AGENT_SPEC = AgentSpec(
+    name="sdr",
+    build=build_sdr_agent,
+    warm=shared_data.company_data,
+    config=SessionConfig(voice=SDRAgent.voice, voice_style=SDRAgent.voice_style),
+)
 
-    await ctx.connect()
 
-    shutdown_future = asyncio.Future()
+def prewarm(proc: JobProcess):
+    session_factory.prewarm(proc, [AGENT_SPEC])
 
-    @ctx.room.on("disconnected")
-    def on_disconnected(reason):
-        if not shutdown_future.done():
-            shutdown_future.set_result(None)
 
-    await shutdown_future
+async def entrypoint(ctx: JobContext):
+    await session_factory.run_session(ctx, AGENT_SPEC)
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    session_factory.run_app(entrypoint, prewarm)
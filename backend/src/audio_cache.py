@@ -0,0 +1,246 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from livekit import rtc
+
+logger = logging.getLogger("audio-cache")
+
+DEFAULT_CACHE_DIR = Path(os.getenv("AUDIO_CACHE_DIR", Path(__file__).parent.parent / "audio-cache"))
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Each entry is a small header followed by raw 16-bit PCM
+_HEADER = struct.Struct("<4sIH")
+_MAGIC = b"PCM1"
+_SUFFIX = ".pcm"
+# Cached audio is replayed in 100 ms frames
+_FRAMES_PER_SECOND = 10
+
+
+def cache_key(voice: str, style: str, text: str) -> str:
+    """Content address for an utterance; whitespace differences map to the same audio."""
+    payload = "\x1f".join([voice, style, " ".join(text.split())]).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class CachedAudio:
+    """Decoded PCM for one utterance, replayable as LiveKit audio frames."""
+
+    def __init__(self, pcm: bytes, sample_rate: int, num_channels: int) -> None:
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (2 * self.num_channels * self.sample_rate)
+
+    def frames(self) -> List[rtc.AudioFrame]:
+        samples = self.sample_rate // _FRAMES_PER_SECOND
+        step = samples * self.num_channels * 2
+        frames = []
+        for start in range(0, len(self.pcm), step):
+            chunk = self.pcm[start : start + step]
+            frames.append(
+                rtc.AudioFrame(
+                    data=chunk,
+                    sample_rate=self.sample_rate,
+                    num_channels=self.num_channels,
+                    samples_per_channel=len(chunk) // (2 * self.num_channels),
+                )
+            )
+        return frames
+
+    async def stream(self) -> AsyncIterator[rtc.AudioFrame]:
+        for frame in self.frames():
+            yield frame
+
+
+class AudioCache:
+    """Content-addressed synthesized-audio cache on local disk with LRU eviction.
+
+    Entries are keyed by (voice, style, text). The in-memory index mirrors the
+    files on disk in least-recently-used order, so eviction never has to scan
+    the directory after startup.
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.root.glob(f"*{_SUFFIX}"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        self._unlink(self._evict())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{_SUFFIX}"
+
+    def get(self, voice: str, style: str, text: str) -> Optional[CachedAudio]:
+        """Return cached audio for an utterance, counting the lookup as a hit or miss.
+
+        Reads the file on the calling thread; on the event loop use fetch().
+        """
+        key = cache_key(voice, style, text)
+        return self._looked_up(key, self._read(key) if key in self._entries else None)
+
+    async def fetch(self, voice: str, style: str, text: str) -> Optional[CachedAudio]:
+        """get() with the file read on a worker thread, so the event loop is never blocked."""
+        key = cache_key(voice, style, text)
+        audio = await asyncio.to_thread(self._read, key) if key in self._entries else None
+        return self._looked_up(key, audio)
+
+    def put(self, voice: str, style: str, text: str, audio: CachedAudio) -> None:
+        """Store synthesized audio, evicting least recently used entries over budget."""
+        key = cache_key(voice, style, text)
+        if self._fits(text, audio):
+            size = self._write(key, audio)
+            self._unlink(self._index(key, size))
+
+    async def store(self, voice: str, style: str, text: str, audio: CachedAudio) -> None:
+        """put() with the file written and evicted entries removed on a worker thread."""
+        key = cache_key(voice, style, text)
+        if self._fits(text, audio):
+            size = await asyncio.to_thread(self._write, key, audio)
+            evicted = self._index(key, size)
+            if evicted:
+                await asyncio.to_thread(self._unlink, evicted)
+
+    # The index is only touched on the caller's thread (the event loop for
+    # fetch/store); _read, _write and _unlink do the file I/O and nothing else.
+
+    def _looked_up(self, key: str, audio: Optional[CachedAudio]) -> Optional[CachedAudio]:
+        if audio is None:
+            self._forget(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return audio
+
+    def _fits(self, text: str, audio: CachedAudio) -> bool:
+        size = _HEADER.size + len(audio.pcm)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {len(text)}-char utterance: {size} bytes exceeds budget")
+            return False
+        return True
+
+    def _read(self, key: str) -> Optional[CachedAudio]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, sample_rate, num_channels = _HEADER.unpack_from(data)
+        except (OSError, struct.error) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            self._unlink([path])
+            return None
+        if magic != _MAGIC:
+            self._unlink([path])
+            return None
+        try:
+            # Keeps LRU order across restarts, which rebuild the index from mtimes
+            os.utime(path)
+        except OSError:
+            pass
+        return CachedAudio(data[_HEADER.size :], sample_rate, num_channels)
+
+    def _write(self, key: str, audio: CachedAudio) -> int:
+        header = _HEADER.pack(_MAGIC, audio.sample_rate, audio.num_channels)
+        # A unique temporary name, since two renders of one utterance may write at once
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=key, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(audio.pcm)
+        os.replace(tmp, self._path(key))
+        return len(header) + len(audio.pcm)
+
+    def _index(self, key: str, size: int) -> List[Path]:
+        """Record a stored entry; returns the files evicted to stay within budget."""
+        self._total_bytes += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        return self._evict()
+
+    def _forget(self, key: str) -> Path:
+        self._total_bytes -= self._entries.pop(key, 0)
+        return self._path(key)
+
+    def _evict(self) -> List[Path]:
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            evicted.append(self._forget(key))
+            logger.debug(f"Evicted {key}")
+        return evicted
+
+    def _unlink(self, paths: List[Path]) -> None:
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    async def synthesize(self, tts, voice: str, style: str, text: str) -> Tuple[CachedAudio, bool]:
+        """Return audio for text from the cache, synthesizing and storing it on a miss.
+
+        The second element is True when the audio came from the cache.
+        """
+        cached = await self.fetch(voice, style, text)
+        if cached is not None:
+            return cached, True
+        return await self.render(tts, voice, style, text), False
+
+    async def render(self, tts, voice: str, style: str, text: str) -> CachedAudio:
+        """Synthesize text with the given TTS and store the result."""
+        chunks = []
+        sample_rate, num_channels = tts.sample_rate, tts.num_channels
+        async with tts.synthesize(text) as stream:
+            async for event in stream:
+                frame = event.frame
+                sample_rate, num_channels = frame.sample_rate, frame.num_channels
+                chunks.append(bytes(frame.data))
+        audio = CachedAudio(b"".join(chunks), sample_rate, num_channels)
+        if audio.pcm:
+            await self.store(voice, style, text, audio)
+        return audio
+
+    def summary(self) -> str:
+        return (
+            f"{len(self)} entries, {self._total_bytes / 1024:.0f} KiB, "
+            f"hit ratio {self.hit_ratio:.0%} ({self.hits}/{self.hits + self.misses})"
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_audio_cache() -> AudioCache:
+    """Process-wide cache shared by every session in this worker."""
+    return AudioCache()
@@ -0,0 +1,136 @@
+"""Provider clients (STT, LLM, TTS) leased to one session at a time.
+
+Every AgentActivity subscribes to the metrics_collected events of the
+providers its session uses. If two live sessions shared one instance, each
+would count the other's metrics, which would corrupt the latency histograms
+and the per-room usage. Instead a session leases its clients for its
+lifetime and returns them at shutdown. Sequential sessions in a job process
+still reuse warm instances and their connection pools, but concurrent sessions
+(thread executor, load tests) never share one.
+
+run_session opens a lease with open_lease(); get() calls made while it is
+current (the session's task and every task it starts) draw from it. Outside a
+lease, get() returns a process-wide instance meant for background work, such as
+cache renders, whose metrics no session listens to; shared() returns it
+explicitly for background tasks that may outlive the session.
+"""
+import contextvars
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger("client-pool")
+
+_LOCK = threading.Lock()
+# Held while an unleased instance is built, so two threads never both build one
+_SHARED_LOCK = threading.Lock()
+# Idle instances per key, ready for the next session
+_FREE: Dict[Hashable, List[Any]] = {}
+# Every instance created, leased or not, for reporting
+_CREATED: Dict[Hashable, int] = {}
+# Instances used outside any lease
+_UNLEASED: Dict[Hashable, Any] = {}
+
+_CURRENT: contextvars.ContextVar[Optional["Lease"]] = contextvars.ContextVar("client_lease", default=None)
+
+
+def _create(key: Hashable, factory: Callable[[], Any]) -> Any:
+    instance = factory()
+    with _LOCK:
+        _CREATED[key] = _CREATED.get(key, 0) + 1
+    logger.info(f"Created {key}, {_CREATED[key]} in this process")
+    return instance
+
+
+class Lease:
+    """The clients one session holds; each key maps to a single instance for the session."""
+
+    def __init__(self) -> None:
+        self._held: Dict[Hashable, Any] = {}
+        self.released = False
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        if self.released:
+            # A task of a finished session; never take an instance it cannot return
+            return shared(key, factory)
+        instance = self._held.get(key)
+        if instance is None:
+            with _LOCK:
+                free = _FREE.get(key)
+                instance = free.pop() if free else None
+            if instance is None:
+                instance = _create(key, factory)
+            self._held[key] = instance
+        return instance
+
+    def held(self) -> List[Hashable]:
+        return list(self._held)
+
+    def release(self) -> None:
+        """Return every client to the pool; later get() calls under this lease are unleased."""
+        with _LOCK:
+            if self.released:
+                return
+            self.released = True
+            for key, instance in self._held.items():
+                _FREE.setdefault(key, []).append(instance)
+        self._held.clear()
+
+
+def open_lease() -> Lease:
+    """Start a lease and make it current for this context and the tasks it creates."""
+    lease = Lease()
+    _CURRENT.set(lease)
+    return lease
+
+
+def current_lease() -> Optional[Lease]:
+    return _CURRENT.get()
+
+
+def get(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """The current session's client for key, or the process-wide unleased one."""
+    lease = _CURRENT.get()
+    if lease is not None:
+        return lease.get(key, factory)
+    return shared(key, factory)
+
+
+def shared(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """The process-wide instance for work outside any session, even when a lease is current."""
+    with _LOCK:
+        instance = _UNLEASED.get(key)
+    if instance is not None:
+        return instance
+    with _SHARED_LOCK:
+        with _LOCK:
+            instance = _UNLEASED.get(key)
+        if instance is None:
+            instance = _create(key, factory)
+            with _LOCK:
+                _UNLEASED[key] = instance
+    return instance
+
+
+def warm(key: Hashable, factory: Callable[[], Any]) -> None:
+    """Create an idle instance ahead of the first session, unless one is already idle."""
+    with _LOCK:
+        if _FREE.get(key):
+            return
+    instance = _create(key, factory)
+    with _LOCK:
+        _FREE.setdefault(key, []).append(instance)
+
+
+def created(kind: Optional[str] = None) -> Dict[Hashable, int]:
+    """Instances created per key; keys are tuples starting with their kind."""
+    with _LOCK:
+        return {k: n for k, n in _CREATED.items() if kind is None or k[0] == kind}
+
+
+def clear(kind: Optional[str] = None) -> None:
+    """Forget pooled instances (of one kind), e.g. after swapping a factory."""
+    with _LOCK:
+        for table in (_FREE, _CREATED, _UNLEASED):
+            for key in [k for k in table if kind is None or k[0] == kind]:
+                del table[key]
@@ -0,0 +1,374 @@
+"""Compile shared-data JSON into read-only binary bundles that are memory-mapped.
+
+Parsed JSON lives in each job process's heap, and after fork its pages are
+copied as soon as refcounts change. A bundle is one file per source that every
+process maps read-only, so the operating system keeps a single physical copy.
+Large containers are stored as offset tables; anything that encodes to at most
+RECORD_BYTES is stored as one compact JSON record. Lookups walk the tables in
+place and decode only the records they touch, as ordinary dicts and lists.
+
+    python src/data_bundle.py build        # shared-data/*.json -> shared-data/bundles/
+    python src/data_bundle.py show food_catalog
+
+Layout (little-endian): a header of magic, source size, source mtime and root
+offset, then nodes. Each node starts with a tag byte:
+
+    R  u32 length, compact JSON                  a record
+    A  u32 n, (n + 1) x u32 positions, records   a list of records, each followed by a
+                                                 comma so any run of them is one JSON array
+    L  u32 n, n x u64 child offsets              a list of tables and records
+    D  u32 n, n x u64 key offsets, n x u64 child offsets, n x u32 key order
+                                                 a dict; keys are u32 length + UTF-8,
+                                                 in source order, with their sorted
+                                                 order for binary search
+
+With SHARED_DATA_BUNDLES=1, shared_data opens a bundle while its source is
+unchanged since the build and falls back to the JSON otherwise. It is opt-in
+because tools that scan a whole collection decode every record on each call:
+mapping a 100k-item catalog saves about 80 MB of heap per process and nearly
+all of its load time, but makes search_catalog about three times slower
+(tests/benchmarks/bench_data_bundle.py).
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from collections.abc import ItemsView, Mapping, Sequence, ValuesView
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("data-bundle")
+
+SOURCES = ("food_catalog.json", "company_data.json", "day4_tutor_content.json", "game_universes.json")
+SUFFIX = ".bundle"
+# Containers that encode to more than this are split into offset tables
+RECORD_BYTES = 1024
+# Records decoded per json.loads call when iterating a packed list
+BATCH = 1024
+
+MAGIC = b"VABNDL\x00\x01"
+_HEADER = struct.Struct("<8sQqQ")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+
+class BundleError(Exception):
+    pass
+
+
+def _compact(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.out = bytearray(_HEADER.size)
+
+    def node(self, value: Any) -> int:
+        record = _compact(value)
+        if len(record) <= RECORD_BYTES or not isinstance(value, (dict, list)) or not value:
+            return self._record(record)
+        if isinstance(value, list):
+            records = [_compact(v) for v in value]
+            if all(len(r) <= RECORD_BYTES or not isinstance(v, (dict, list)) for r, v in zip(records, value)):
+                return self._packed(records)
+            children = [self.node(v) for v in value]
+            offset = len(self.out)
+            self.out += b"L" + _U32.pack(len(children))
+            self.out += struct.pack(f"<{len(children)}Q", *children)
+            return offset
+
+        keys = [str(k).encode() for k in value]
+        key_offsets = []
+        for key in keys:
+            key_offsets.append(len(self.out))
+            self.out += _U32.pack(len(key)) + key
+        children = [self.node(v) for v in value.values()]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        n = len(keys)
+        offset = len(self.out)
+        self.out += b"D" + _U32.pack(n)
+        self.out += struct.pack(f"<{n}Q{n}Q{n}I", *key_offsets, *children, *order)
+        return offset
+
+    def _packed(self, records: List[bytes]) -> int:
+        positions = [0]
+        for record in records:
+            positions.append(positions[-1] + len(record) + 1)
+        offset = len(self.out)
+        self.out += b"A" + _U32.pack(len(records))
+        self.out += struct.pack(f"<{len(positions)}I", *positions)
+        for record in records:
+            self.out += record + b","
+        return offset
+
+    def _record(self, record: bytes) -> int:
+        offset = len(self.out)
+        self.out += b"R" + _U32.pack(len(record)) + record
+        return offset
+
+
+def bundle_path(source: Path, directory: Optional[Path] = None) -> Path:
+    return Path(directory or source.parent / "bundles") / (source.stem + SUFFIX)
+
+
+def build(source: Path, target: Path) -> Tuple[int, int]:
+    """Compile one JSON file; returns (source bytes, bundle bytes)."""
+    stat = source.stat()
+    with open(source, "r", encoding="utf-8-sig") as f:
+        data = json.load(f)
+    writer = _Writer()
+    root = writer.node(data)
+    _HEADER.pack_into(writer.out, 0, MAGIC, stat.st_size, stat.st_mtime_ns, root)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(writer.out)
+    os.replace(tmp, target)
+    return stat.st_size, len(writer.out)
+
+
+def _to_python(value: Any) -> Any:
+    if isinstance(value, BundleDict):
+        return {k: _to_python(v) for k, v in value.items()}
+    if isinstance(value, BundleList):
+        return [_to_python(v) for v in value]
+    return value
+
+
+class Bundle:
+    """A memory-mapped bundle; root is a BundleDict, a BundleList or a plain record."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise BundleError(f"{self.path} is truncated")
+        magic, self.source_size, self.source_mtime_ns, root = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise BundleError(f"{self.path} is not a version {MAGIC[-1]} bundle")
+        self.root = self.node(root)
+
+    def matches(self, source: Path) -> bool:
+        """True when the source JSON is unchanged since this bundle was built."""
+        stat = source.stat()
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns
+
+    def node(self, offset: int) -> Any:
+        tag = self._map[offset]
+        if tag == 0x52:  # R
+            return json.loads(self.record(offset))
+        if tag == 0x4C or tag == 0x41:  # L, A
+            return BundleList(self, offset)
+        if tag == 0x44:  # D
+            return BundleDict(self, offset)
+        raise BundleError(f"{self.path}: bad node tag at {offset}")
+
+    def record(self, offset: int) -> bytes:
+        (length,) = _U32.unpack_from(self._map, offset + 1)
+        return self._map[offset + 5 : offset + 5 + length]
+
+    def key(self, offset: int) -> bytes:
+        (length,) = _U32.unpack_from(self._map, offset)
+        return self._map[offset + 4 : offset + 4 + length]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+class BundleList(Sequence):
+    """Read-only list over an A or L node; items are decoded on access, slices return lists."""
+
+    __slots__ = ("_bundle", "_count", "_table", "_packed", "_data")
+
+    def __init__(self, bundle: Bundle, offset: int) -> None:
+        self._bundle = bundle
+        (self._count,) = _U32.unpack_from(bundle._map, offset + 1)
+        self._table = offset + 5
+        self._packed = bundle._map[offset] == 0x41
+        # Packed records follow their n + 1 positions
+        self._data = self._table + 4 * (self._count + 1)
+
+    def _span(self, start: int, stop: int) -> bytes:
+        """Records start..stop of a packed list as one JSON array."""
+        m = self._bundle._map
+        begin, end = struct.unpack_from("<II", m, self._table + 4 * start)
+        if stop != start + 1:
+            (end,) = _U32.unpack_from(m, self._table + 4 * stop)
+        return b"[" + m[self._data + begin : self._data + end - 1] + b"]"
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if self._packed and step == 1:
+                return json.loads(self._span(start, stop)) if start < stop else []
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("bundle list index out of range")
+        if self._packed:
+            return json.loads(self._span(index, index + 1))[0]
+        return self._bundle.node(_U64.unpack_from(self._bundle._map, self._table + 8 * index)[0])
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._packed:
+            # One json.loads per batch rather than per record
+            for start in range(0, self._count, BATCH):
+                yield from json.loads(self._span(start, min(start + BATCH, self._count)))
+            return
+        offsets = struct.unpack_from(f"<{self._count}Q", self._bundle._map, self._table)
+        for offset in offsets:
+            yield self._bundle.node(offset)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, BundleList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def copy(self) -> list:
+        return _to_python(self)
+
+    def __repr__(self) -> str:
+        return f"<BundleList of {self._count} in {self._bundle.path.name}>"
+
+
+class _Items(ItemsView):
+    def __iter__(self):
+        return self._mapping._items()
+
+
+class _Values(ValuesView):
+    def __iter__(self):
+        return (value for _, value in self._mapping._items())
+
+
+class BundleDict(Mapping):
+    """Read-only dict over a D node; keys keep source order, lookups binary search."""
+
+    __slots__ = ("_bundle", "_count", "_keys", "_children", "_order")
+
+    def __init__(self, bundle: Bundle, offset: int) -> None:
+        self._bundle = bundle
+        (self._count,) = _U32.unpack_from(bundle._map, offset + 1)
+        self._keys = offset + 5
+        self._children = self._keys + 8 * self._count
+        self._order = self._children + 8 * self._count
+
+    def _key_at(self, i: int) -> bytes:
+        return self._bundle.key(_U64.unpack_from(self._bundle._map, self._keys + 8 * i)[0])
+
+    def _find(self, key: bytes) -> int:
+        m = self._bundle._map
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = _U32.unpack_from(m, self._order + 4 * mid)[0]
+            current = self._key_at(i)
+            if current == key:
+                return i
+            if current < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+    def __getitem__(self, key: str) -> Any:
+        i = self._find(key.encode()) if isinstance(key, str) else -1
+        if i < 0:
+            raise KeyError(key)
+        return self._bundle.node(_U64.unpack_from(self._bundle._map, self._children + 8 * i)[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._key_at(i).decode() for i in range(self._count))
+
+    def _items(self) -> Iterator[Tuple[str, Any]]:
+        m = self._bundle._map
+        children = struct.unpack_from(f"<{self._count}Q", m, self._children)
+        for i, child in enumerate(children):
+            yield self._key_at(i).decode(), self._bundle.node(child)
+
+    def items(self) -> ItemsView:
+        return _Items(self)
+
+    def values(self) -> ValuesView:
+        return _Values(self)
+
+    def copy(self) -> dict:
+        return _to_python(self)
+
+    def __repr__(self) -> str:
+        return f"<BundleDict of {self._count} in {self._bundle.path.name}>"
+
+
+def open_fresh(source: Path, directory: Optional[Path] = None) -> Optional[Bundle]:
+    """The bundle built from source if it exists and is current, else None."""
+    path = bundle_path(source, directory)
+    if not path.exists():
+        return None
+    try:
+        bundle = Bundle(path)
+    except (OSError, ValueError, BundleError) as e:
+        logger.warning(f"Ignoring bundle {path}: {e}")
+        return None
+    try:
+        fresh = bundle.matches(source)
+    except OSError:
+        fresh = False
+    if not fresh:
+        logger.warning(f"Bundle {path} is stale, rebuild with: python src/data_bundle.py build")
+        bundle.close()
+        return None
+    return bundle
+
+
+def main(argv=None) -> int:
+    data_dir = Path(__file__).parent.parent / "shared-data"
+    parser = argparse.ArgumentParser(description="Compile shared-data JSON into memory-mapped bundles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="compile the shared-data JSON files")
+    build_cmd.add_argument("sources", nargs="*", type=Path, help=f"default: {', '.join(SOURCES)}")
+    build_cmd.add_argument("--out", type=Path, help="output directory (default: shared-data/bundles)")
+    show_cmd = sub.add_parser("show", help="print the top level of a bundle")
+    show_cmd.add_argument("name", help="bundle path or source name, e.g. food_catalog")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for source in args.sources or [data_dir / name for name in SOURCES]:
+            if not source.exists():
+                print(f"skip {source}: not found")
+                continue
+            target = bundle_path(source, args.out)
+            size, built = build(source, target)
+            print(f"{source.name:<26}{size:>12,} B -> {built:>12,} B  {target}")
+        return 0
+
+    path = Path(args.name)
+    if not path.exists():
+        path = bundle_path(data_dir / f"{Path(args.name).stem}.json")
+    bundle = Bundle(path)
+    root = bundle.root
+    print(repr(root))
+    if isinstance(root, BundleDict):
+        for key, value in root.items():
+            print(f"  {key}: {value!r}"[:120])
+    elif isinstance(root, BundleList):
+        for i, value in enumerate(root[:20]):
+            print(f"  [{i}] {value!r}"[:120])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,17 @@ class Database:
                         score_count INTEGER DEFAULT 0
                     )
                 """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS review_schedule (
+                        learner_id TEXT,
+                        concept_id TEXT,
+                        ease_factor REAL DEFAULT 2.5,
+                        interval_days REAL DEFAULT 0.0,
+                        repetitions INTEGER DEFAULT 0,
+                        due_at REAL DEFAULT 0.0,
+                        PRIMARY KEY (learner_id, concept_id)
+                    )
+                """)
                 conn.commit()
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
@@ -121,3 +132,37 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to get all stats: {e}")
             return {}
+
+    def get_review_schedule(self, learner_id: str) -> Dict[str, Dict]:
+        """Get the spaced-repetition state of every concept a learner has reviewed."""
+        try:
+            with self._get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT concept_id, ease_factor, interval_days, repetitions, due_at
+                    FROM review_schedule WHERE learner_id = ?
+                """, (learner_id,))
+                return {row["concept_id"]: dict(row) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Failed to get review schedule for {learner_id}: {e}")
+            return {}
+
+    def save_review(self, learner_id: str, concept_id: str, ease_factor: float,
+                    interval_days: float, repetitions: int, due_at: float):
+        """Persist a concept's spaced-repetition state and count the quiz attempt."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO review_schedule
+                    (learner_id, concept_id, ease_factor, interval_days, repetitions, due_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (learner_id, concept_id, ease_factor, interval_days, repetitions, due_at))
+                cursor.execute("""
+                    UPDATE concept_mastery SET times_quizzed = times_quizzed + 1
+                    WHERE concept_id = ?
+                """, (concept_id,))
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to save review for {concept_id}: {e}")
@@ -0,0 +1,27 @@
+"""On/off switches read from environment variables.
+
+Every optional feature (tracing, profiling, recording, usage tracking, ...) is
+toggled the same way: 1/true/yes/on enables it and 0/false/no/off disables it,
+case-insensitively. An unset or empty variable gives the feature's default. Any
+other value is a typo, so it is logged and the default is kept.
+"""
+import logging
+import os
+
+logger = logging.getLogger("env-flags")
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+
+def flag(name: str, default: bool = False) -> bool:
+    """The boolean value of environment variable name."""
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    logger.warning(f"Ignoring {name}={os.getenv(name)!r}; expected one of {', '.join(_TRUE + _FALSE)}")
+    return default
@@ -0,0 +1,25 @@
+import logging
+import time
+
+from livekit.agents import llm
+
+import tts_pool
+
+logger = logging.getLogger("greeting")
+
+
+async def speak_greeting(session, text: str, voice: str, style: str = "Conversation", warm: bool = True):
+    """Speak a fixed greeting straight away, warming the LLM connection in parallel.
+
+    The greeting is replayed from the audio cache when this voice has said it
+    before, so nothing waits on an LLM round-trip before the user hears audio.
+    Warming uses the provider's prewarm(), which only opens the connection: no
+    completion is requested, so it costs no tokens and reports no metrics. It is
+    idempotent, and usually already done when the session started.
+    """
+    started = time.perf_counter()
+    if warm and isinstance(session.llm, llm.LLM):
+        session.llm.prewarm()
+    handle = await tts_pool.say_cached(session, text, voice, style)
+    logger.info(f"Greeting queued in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return handle
@@ -0,0 +1,68 @@
+import logging
+from typing import List, Tuple
+
+from livekit.agents import llm
+
+from retrieval import estimate_tokens
+
+logger = logging.getLogger("handoff")
+
+
+class HandoffPolicy:
+    """Decides which recent turns and tool results a new agent inherits on handoff.
+
+    Items are taken newest first until the token budget or item limit is reached;
+    everything older is dropped. Tool results are carried as short notes so the
+    new agent sees what was looked up without needing the original tool.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 400,
+        max_items: int = 8,
+        max_item_tokens: int = 120,
+        include_tool_results: bool = True,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.max_item_tokens = max_item_tokens
+        self.include_tool_results = include_tool_results
+
+    def _truncate(self, text: str) -> str:
+        limit = self.max_item_tokens * 4
+        if len(text) <= limit:
+            return text
+        return text[:limit].rsplit(" ", 1)[0] + "..."
+
+    def select(self, chat_ctx: llm.ChatContext) -> List[Tuple[str, str]]:
+        """Return (role, text) pairs to carry over, oldest first."""
+        selected: List[Tuple[str, str]] = []
+        budget = self.max_tokens
+        for item in reversed(chat_ctx.items):
+            if len(selected) >= self.max_items:
+                break
+            if item.type == "message" and item.role in ("user", "assistant"):
+                role, text = item.role, item.text_content or ""
+            elif item.type == "function_call_output" and self.include_tool_results:
+                role, text = "assistant", f"(result of {item.name}: {item.output})"
+            else:
+                continue
+            text = self._truncate(text.strip())
+            if not text:
+                continue
+            cost = estimate_tokens(text)
+            if cost > budget:
+                break
+            budget -= cost
+            selected.append((role, text))
+        selected.reverse()
+        return selected
+
+    def carry_over(self, chat_ctx: llm.ChatContext) -> Tuple[llm.ChatContext, int]:
+        """Build the new agent's starting chat context and its estimated token count."""
+        carried = llm.ChatContext.empty()
+        tokens = 0
+        for role, text in self.select(chat_ctx):
+            carried.add_message(role=role, content=text)
+            tokens += estimate_tokens(text)
+        return carried, tokens
@@ -0,0 +1,98 @@
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+from livekit.agents.worker import ServerEnvOption
+
+
+class ArrivalRateEstimator:
+    """Job arrival rate from a short and a long sliding window plus a decaying burst peak.
+
+    The largest of the three is used: a burst raises the estimate at once, and the
+    remembered peak keeps capacity for the next burst, fading with peak_half_life
+    seconds once bursts stop.
+    """
+
+    def __init__(
+        self,
+        short_window: float = 10.0,
+        long_window: float = 120.0,
+        peak_half_life: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.short_window = short_window
+        self.long_window = long_window
+        self.peak_half_life = peak_half_life
+        self._clock = clock
+        self._arrivals: Deque[float] = deque()
+        self._peak = 0.0
+        self._peak_at = 0.0
+
+    def record(self, at: Optional[float] = None) -> None:
+        self._arrivals.append(self._clock() if at is None else at)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Estimated arrivals per second."""
+        now = self._clock() if now is None else now
+        while self._arrivals and self._arrivals[0] < now - self.long_window:
+            self._arrivals.popleft()
+        short = sum(1 for at in self._arrivals if at >= now - self.short_window) / self.short_window
+        decay = 0.5 ** (max(now - self._peak_at, 0.0) / self.peak_half_life)
+        self._peak = max(short, self._peak * decay)
+        self._peak_at = now
+        return max(short, len(self._arrivals) / self.long_window, self._peak)
+
+
+def idle_target(rate: float, replenish_seconds: float, headroom: float, min_idle: int, max_idle: int) -> int:
+    """Idle processes needed to absorb the arrivals expected while a used one is replaced."""
+    needed = math.ceil(rate * replenish_seconds * headroom)
+    return max(min_idle, min(max_idle, needed))
+
+
+class AdaptiveIdleProcesses(ServerEnvOption):
+    """num_idle_processes that follows the observed job arrival rate.
+
+    The worker re-reads num_idle_processes on every load update and resizes its
+    warm pool to match, so exposing the target as a live value is enough to make
+    the pool adaptive. The pool never grows past the value read at startup,
+    which is therefore max_idle. The defaults come from
+    tests/benchmarks/bench_idle_pool.py: against a fixed pool of 4 they had fewer
+    cold starts on every burst pattern tried, and fewer idle processes when
+    traffic is quiet.
+    """
+
+    def __init__(
+        self,
+        estimator: Optional[ArrivalRateEstimator] = None,
+        min_idle: int = 3,
+        max_idle: int = 8,
+        replenish_seconds: float = 5.0,
+        headroom: float = 3.0,
+        dev_idle: int = 0,
+    ) -> None:
+        # ServerEnvOption is a frozen dataclass; this subclass keeps its own state
+        object.__setattr__(self, "estimator", estimator or ArrivalRateEstimator())
+        object.__setattr__(self, "min_idle", min_idle)
+        object.__setattr__(self, "max_idle", max_idle)
+        object.__setattr__(self, "replenish_seconds", replenish_seconds)
+        object.__setattr__(self, "headroom", headroom)
+        object.__setattr__(self, "dev_idle", dev_idle)
+        object.__setattr__(self, "_started", False)
+
+    def record_arrival(self) -> None:
+        self.estimator.record()
+
+    @property
+    def dev_default(self) -> int:
+        return self.dev_idle
+
+    @property
+    def prod_default(self) -> int:
+        if not self._started:
+            # The first read sizes the pool's ceiling
+            object.__setattr__(self, "_started", True)
+            return self.max_idle
+        return idle_target(
+            self.estimator.rate(), self.replenish_seconds, self.headroom, self.min_idle, self.max_idle
+        )
@@ -0,0 +1,103 @@
+"""Report the heaviest imports of an agent module, using `python -X importtime`.
+
+    python src/import_profile.py                 # the combined worker
+    python src/import_profile.py agent_sdr --top 10
+    python src/import_profile.py worker --json
+
+The module is imported in a fresh interpreter, so results reflect a cold
+worker or job process start.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SRC_DIR = Path(__file__).parent
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse `-X importtime` output into records with self and cumulative microseconds."""
+    records = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        records.append(
+            {
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                # importtime indents nested imports by two spaces per level
+                "depth": (len(indent) - 1) // 2,
+            }
+        )
+    return records
+
+
+def top_level_packages(records: List[Dict]) -> Dict[str, int]:
+    """Total self time per top-level package, e.g. all of livekit.plugins.* under livekit."""
+    totals: Dict[str, int] = {}
+    for record in records:
+        package = record["module"].split(".")[0]
+        totals[package] = totals.get(package, 0) + record["self_us"]
+    return totals
+
+
+def profile(module: str) -> Dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    records = parse_importtime(result.stderr)
+    return {"module": module, "wall_s": wall, "records": records}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile agent module import time")
+    parser.add_argument("module", nargs="?", default="worker")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    result = profile(args.module)
+    records = result["records"]
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    total_us = sum(r["self_us"] for r in records)
+    print(
+        f"import {args.module}: {result['wall_s']:.2f}s wall, "
+        f"{total_us / 1e6:.2f}s in {len(records)} module imports"
+    )
+
+    print(f"\nHeaviest imports (cumulative, top {args.top}):")
+    for r in sorted(records, key=lambda r: -r["cumulative_us"])[: args.top]:
+        print(f"  {r['cumulative_us'] / 1000:9.1f} ms  {r['module']}")
+
+    print(f"\nHeaviest modules (self time, top {args.top}):")
+    for r in sorted(records, key=lambda r: -r["self_us"])[: args.top]:
+        print(f"  {r['self_us'] / 1000:9.1f} ms  {r['module']}")
+
+    print("\nBy top-level package (self time):")
+    packages = sorted(top_level_packages(records).items(), key=lambda item: -item[1])
+    for package, us in packages[: args.top]:
+        print(f"  {us / 1000:9.1f} ms  {package}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""Per-agent, per-model latency histograms served as Prometheus text.
+
+Each job process records end-of-utterance delay, LLM time to first token and
+TTS time to first byte from MetricsCollectedEvent into in-memory histograms,
+along with per-session memory when session_memory is enabled, and
+periodically writes a snapshot to LATENCY_METRICS_DIR. The worker's main
+process serves the merged snapshots at http://127.0.0.1:9464/metrics. Set
+LATENCY_METRICS=1 to turn this on and LATENCY_METRICS_PORT to change the port
+(0 also turns it off).
+
+    python src/latency_metrics.py        # print p50/p95/p99 from the snapshots
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import env_flags
+
+logger = logging.getLogger("latency-metrics")
+
+METRICS_DIR = Path(os.getenv("LATENCY_METRICS_DIR", Path(__file__).parent.parent / "latency-metrics"))
+DEFAULT_PORT = 9464
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Upper bounds in seconds; voice latencies of interest sit between 50 ms and a few seconds
+BUCKETS: Tuple[float, ...] = (
+    0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.6, 0.75,
+    1.0, 1.25, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 7.5, 10.0,
+)
+
+METRICS = {
+    "eou_delay": "End of user speech to the end-of-turn decision",
+    "llm_ttft": "LLM request to first token",
+    "tts_ttfb": "TTS request to first audio byte",
+}
+
+# Sizes in bytes, recorded by session_memory; buckets from 1 MB to 1 GB
+SIZE_METRICS = {
+    "session_memory": "Python heap allocated by a session, sampled while it runs",
+    "session_memory_peak": "Peak Python heap allocated by a session",
+}
+MEMORY_BUCKETS: Tuple[float, ...] = tuple(
+    mb * 1024 * 1024 for mb in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+
+Key = Tuple[str, str, str]  # (metric, agent, model)
+
+
+def configured_port() -> int:
+    return int(os.getenv("LATENCY_METRICS_PORT", DEFAULT_PORT))
+
+
+def enabled() -> bool:
+    """Whether sessions record and snapshot histograms and the worker serves them."""
+    return env_flags.flag("LATENCY_METRICS") and configured_port() != 0
+
+
+def _bounds(metric: str) -> Tuple[float, ...]:
+    return MEMORY_BUCKETS if metric in SIZE_METRICS else BUCKETS
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three increments, with no lock.
+
+    Histograms are only written from the job's event loop thread. Under the
+    thread executor two jobs may rarely race on an increment and lose a count,
+    which is acceptable for latency distributions.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = BUCKETS) -> None:
+        self.bounds = bounds
+        # One slot per bound plus the +Inf overflow
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    # Overflow bucket has no upper bound; report its lower edge
+                    return lower
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def merge(self, other: "Histogram") -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.sum += other.sum
+        self.count += other.count
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "sum": self.sum, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data: dict, bounds: Tuple[float, ...] = BUCKETS) -> "Histogram":
+        histogram = cls(bounds)
+        histogram.counts = list(data["counts"])
+        histogram.sum = data["sum"]
+        histogram.count = data["count"]
+        return histogram
+
+
+_HISTOGRAMS: Dict[Key, Histogram] = {}
+
+
+def record(metric: str, agent: str, model: str, value: float) -> None:
+    key = (metric, agent, model)
+    histogram = _HISTOGRAMS.get(key)
+    if histogram is None:
+        histogram = _HISTOGRAMS.setdefault(key, Histogram(_bounds(metric)))
+    histogram.observe(value)
+
+
+def _model_name(m, default: str) -> str:
+    metadata = getattr(m, "metadata", None)
+    name = getattr(metadata, "model_name", None) if metadata is not None else None
+    return name or getattr(m, "label", None) or default
+
+
+def observe(agent: str, m) -> None:
+    """Record the latencies carried by one AgentMetrics from a MetricsCollectedEvent."""
+    kind = getattr(m, "type", None)
+    if kind == "eou_metrics":
+        record("eou_delay", agent, _model_name(m, "turn-detector"), m.end_of_utterance_delay)
+    elif kind == "llm_metrics":
+        # ttft is -1 when the request produced no tokens
+        if m.ttft >= 0 and not m.cancelled:
+            record("llm_ttft", agent, _model_name(m, "unknown"), m.ttft)
+    elif kind == "tts_metrics":
+        if m.ttfb >= 0 and not m.cancelled:
+            record("tts_ttfb", agent, _model_name(m, "unknown"), m.ttfb)
+
+
+def histograms() -> Dict[Key, Histogram]:
+    return _HISTOGRAMS
+
+
+def reset() -> None:
+    _HISTOGRAMS.clear()
+
+
+def _snapshot_path(directory: Path, pid: int) -> Path:
+    return directory / f"{pid}.json"
+
+
+def flush(directory: Optional[Path] = None) -> None:
+    """Write this process's histograms to its snapshot file, replacing the previous one."""
+    if not _HISTOGRAMS:
+        return
+    directory = Path(directory or METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    data = [
+        {"metric": metric, "agent": agent, "model": model, **h.to_dict()}
+        for (metric, agent, model), h in list(_HISTOGRAMS.items())
+    ]
+    path = _snapshot_path(directory, os.getpid())
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+async def flush_periodically(interval: float = 10.0, directory: Optional[Path] = None) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            flush(directory)
+        except OSError as e:
+            logger.warning(f"Could not write latency snapshot: {e}")
+
+
+def collect(directory: Optional[Path] = None) -> Dict[Key, Histogram]:
+    """Merge every process's snapshot, using live values for this process."""
+    directory = Path(directory or METRICS_DIR)
+    merged: Dict[Key, Histogram] = {}
+
+    def add(key: Key, histogram: Histogram) -> None:
+        merged.setdefault(key, Histogram(_bounds(key[0]))).merge(histogram)
+
+    own = _snapshot_path(directory, os.getpid())
+    if directory.exists():
+        for path in directory.glob("*.json"):
+            if path == own:
+                continue
+            try:
+                with open(path, "r") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                # A process may be replacing its file right now
+                continue
+            for entry in entries:
+                key = (entry["metric"], entry["agent"], entry["model"])
+                add(key, Histogram.from_dict(entry, _bounds(key[0])))
+    for key, histogram in list(_HISTOGRAMS.items()):
+        add(key, histogram)
+    return merged
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(merged: Dict[Key, Histogram]) -> str:
+    lines = []
+    described = [(m, text, "seconds") for m, text in METRICS.items()]
+    described += [(m, text, "bytes") for m, text in SIZE_METRICS.items()]
+    for metric, help_text, unit in described:
+        series = sorted((k, h) for k, h in merged.items() if k[0] == metric)
+        if not series:
+            continue
+        name = f"voice_agent_{metric}_{unit}"
+        lines.append(f"# HELP {name} {help_text}.")
+        lines.append(f"# TYPE {name} histogram")
+        for (_, agent, model), h in series:
+            labels = f'agent="{_label(agent)}",model="{_label(model)}"'
+            cumulative = 0
+            for bound, n in zip(h.bounds, h.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+            lines.append(f"{name}_sum{{{labels}}} {h.sum}")
+            lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+        quantile_name = f"voice_agent_{metric}_quantile_{unit}"
+        lines.append(f"# HELP {quantile_name} {help_text}, estimated from the histogram.")
+        lines.append(f"# TYPE {quantile_name} gauge")
+        for (_, agent, model), h in series:
+            labels = f'agent="{_label(agent)}",model="{_label(model)}"'
+            for q in QUANTILES:
+                value = f"{h.quantile(q):.4f}" if unit == "seconds" else f"{h.quantile(q):.0f}"
+                lines.append(f'{quantile_name}{{{labels},quantile="{q}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    directory: Path = METRICS_DIR
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus(collect(self.directory)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(
+    port: Optional[int] = None, host: str = "127.0.0.1", directory: Optional[Path] = None
+) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread; snapshots from a previous run are cleared.
+
+    Without an explicit port, does nothing unless enabled().
+    """
+    if port is None:
+        if not enabled():
+            return None
+        port = configured_port()
+    directory = Path(directory or METRICS_DIR)
+    if directory.exists():
+        for path in directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    handler = type("MetricsHandler", (_MetricsHandler,), {"directory": directory})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.warning(f"Latency metrics endpoint disabled, cannot bind {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="latency-metrics", daemon=True).start()
+    logger.info(f"Serving latency metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def summary_rows(merged: Dict[Key, Histogram]) -> Iterable[Tuple[str, str, str, int, float, float, float]]:
+    for (metric, agent, model), h in sorted(merged.items()):
+        yield metric, agent, model, h.count, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99)
+
+
+def main() -> int:
+    merged = collect()
+    if not merged:
+        print(f"No latency snapshots in {METRICS_DIR}")
+        return 1
+    print(f"{'metric':<20}{'agent':<13}{'model':<26}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for metric, agent, model, n, *quantiles in summary_rows(merged):
+        # Latencies in milliseconds, sizes in megabytes
+        scale, unit = (1 / (1024 * 1024), "MB") if metric in SIZE_METRICS else (1000, "ms")
+        values = "".join(f"{q * scale:>7.0f}{unit}" for q in quantiles)
+        print(f"{metric:<20}{agent:<13}{model:<26}{n:>7}{values}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
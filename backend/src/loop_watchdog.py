@@ -0,0 +1,173 @@
+"""Event loop lag watchdog that names the call blocking the loop.
+
+A heartbeat task on the session's loop records when it last ran. A watchdog
+thread checks the heartbeat and, once the loop has been stuck for longer
+than the threshold, captures the loop thread's stack. The innermost frame in
+our own code (not the standard library or an installed package) is reported
+as the blocking call site, per room.
+
+    LOOP_WATCHDOG=1       enable (off by default)
+    LOOP_STALL_MS=100     stall threshold in milliseconds
+"""
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import env_flags
+from latency_metrics import Histogram
+
+logger = logging.getLogger("loop-watchdog")
+
+# Lag buckets in seconds, from scheduling jitter to multi-second stalls
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_LIBRARY_PATHS = tuple(
+    os.path.realpath(p)
+    for p in {sysconfig.get_paths()[k] for k in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+
+def enabled() -> bool:
+    return env_flags.flag("LOOP_WATCHDOG")
+
+
+def stall_threshold() -> float:
+    return float(os.getenv("LOOP_STALL_MS", "100")) / 1000
+
+
+def _is_library(filename: str) -> bool:
+    return os.path.realpath(filename).startswith(_LIBRARY_PATHS)
+
+
+def blocking_site(stack: List[traceback.FrameSummary]) -> traceback.FrameSummary:
+    """The innermost application frame, or the innermost frame when all are library code."""
+    for frame in reversed(stack):
+        if not _is_library(frame.filename):
+            return frame
+    return stack[-1]
+
+
+@dataclass
+class Stall:
+    room: str
+    function: str
+    location: str
+    stack: List[str]
+    duration: float = 0.0
+
+
+@dataclass
+class SiteStats:
+    count: int = 0
+    total: float = 0.0
+    worst: float = 0.0
+    stack: List[str] = field(default_factory=list)
+
+
+class LoopWatchdog:
+    """Samples event loop lag for one session and attributes stalls to call sites."""
+
+    def __init__(
+        self,
+        room: str,
+        agent: str = "",
+        threshold: Optional[float] = None,
+        interval: float = 0.05,
+    ) -> None:
+        self.room = room
+        self.agent = agent
+        self.threshold = stall_threshold() if threshold is None else threshold
+        self.interval = interval
+        self.lag = Histogram(LAG_BUCKETS)
+        self.sites: Dict[Tuple[str, str], SiteStats] = {}
+        self.stalls: List[Stall] = []
+        self._last_beat = time.perf_counter()
+        self._pending: Optional[Stall] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start watching the running loop; call from a coroutine on that loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name=f"loop-watchdog-{self.room}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(now - expected, 0.0)
+            self._last_beat = now
+            self.lag.observe(lag)
+            stall, self._pending = self._pending, None
+            if stall is not None:
+                self._finish(stall, lag)
+
+    def _watch(self) -> None:
+        check_every = max(self.threshold / 2, 0.005)
+        while not self._stop.wait(check_every):
+            if self._pending is not None:
+                continue
+            stuck_for = time.perf_counter() - self._last_beat - self.interval
+            if stuck_for > self.threshold:
+                stall = self.capture()
+                if stall is not None:
+                    self._pending = stall
+
+    def capture(self) -> Optional[Stall]:
+        """Snapshot what the loop thread is running right now."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame)
+        site = blocking_site(stack)
+        return Stall(
+            room=self.room,
+            function=site.name,
+            location=f"{os.path.basename(site.filename)}:{site.lineno}",
+            stack=[f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in stack[-8:]],
+        )
+
+    def _finish(self, stall: Stall, lag: float) -> None:
+        stall.duration = lag
+        self.stalls.append(stall)
+        stats = self.sites.setdefault((stall.function, stall.location), SiteStats())
+        stats.count += 1
+        stats.total += lag
+        if lag >= stats.worst:
+            stats.worst = lag
+            stats.stack = stall.stack
+        logger.warning(
+            f"Event loop blocked {lag * 1000:.0f} ms in room {self.room} by "
+            f"{stall.function} ({stall.location}); stack: {' <- '.join(reversed(stall.stack))}"
+        )
+
+    def summary(self) -> str:
+        parts = [
+            f"lag p50 {self.lag.quantile(0.5) * 1000:.1f} ms, p99 {self.lag.quantile(0.99) * 1000:.1f} ms, "
+            f"{len(self.stalls)} stalls over {self.threshold * 1000:.0f} ms"
+        ]
+        ranked = sorted(self.sites.items(), key=lambda item: -item[1].total)
+        for (function, location), stats in ranked[:5]:
+            parts.append(
+                f"{function} ({location}) x{stats.count}, {stats.total * 1000:.0f} ms total, "
+                f"worst {stats.worst * 1000:.0f} ms"
+            )
+        return "; ".join(parts)
@@ -0,0 +1,271 @@
+"""Pre-generated quiz question bank and the offline batch builder that produces it.
+
+Build the bank once per curriculum version:
+
+    python src/question_bank.py --llm google
+    python src/question_bank.py --llm stub   # local stand-in, no network
+"""
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+import shared_data
+from retrieval import content_version
+
+logger = logging.getLogger("question-bank")
+
+BANK_FORMAT = 1
+DIFFICULTIES = ("easy", "medium", "hard")
+DEFAULT_BANK_PATH = Path(__file__).parent.parent / "shared-data" / "question_bank.json"
+DEFAULT_CONTENT_PATH = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
+
+PROMPT_TEMPLATE = """Write {count} {difficulty} quiz questions for a beginner programming course.
+
+Concept: {title}
+Summary: {summary}
+Example question: {sample_question}
+
+Each question must be answerable in one or two spoken sentences.
+Respond with only a JSON array of objects with "question" and "answer" keys."""
+
+
+def difficulty_for_repetitions(repetitions: int) -> str:
+    """Harder questions as a concept is successfully reviewed more often."""
+    if repetitions <= 0:
+        return "easy"
+    if repetitions <= 2:
+        return "medium"
+    return "hard"
+
+
+def parse_questions(text: str) -> List[Dict[str, str]]:
+    """Extract question/answer pairs from an LLM response, tolerating code fences."""
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not match:
+        return []
+    try:
+        items = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return []
+    return [
+        {"question": str(item["question"]).strip(), "answer": str(item["answer"]).strip()}
+        for item in items
+        if isinstance(item, dict) and item.get("question") and item.get("answer")
+    ]
+
+
+class StubLLM:
+    """Local stand-in LLM that answers the builder prompt deterministically."""
+
+    async def complete(self, prompt: str) -> str:
+        count = int(re.search(r"Write (\d+)", prompt).group(1))
+        difficulty = re.search(r"Write \d+ (\w+)", prompt).group(1)
+        title = re.search(r"Concept: (.*)", prompt).group(1).strip()
+        summary = re.search(r"Summary: (.*)", prompt).group(1).strip()
+        first_sentence = summary.split(". ")[0].rstrip(".") + "."
+        items = [
+            {
+                "question": f"({difficulty} {i + 1}) In your own words, what do you know about {title.lower()}?",
+                "answer": first_sentence,
+            }
+            for i in range(count)
+        ]
+        return json.dumps(items)
+
+
+class LiveKitLLM:
+    """Adapts a LiveKit LLM plugin to the builder's single-prompt interface."""
+
+    def __init__(self, llm) -> None:
+        self.llm = llm
+
+    async def complete(self, prompt: str) -> str:
+        from livekit.agents import llm as lk_llm
+
+        chat_ctx = lk_llm.ChatContext.empty()
+        chat_ctx.add_message(role="user", content=prompt)
+        parts = []
+        async with self.llm.chat(chat_ctx=chat_ctx) as stream:
+            async for chunk in stream:
+                if chunk.delta and chunk.delta.content:
+                    parts.append(chunk.delta.content)
+        return "".join(parts)
+
+
+async def build_question_bank(
+    content: list,
+    complete: Callable[[str], Awaitable[str]],
+    per_difficulty: int = 3,
+    difficulties=DIFFICULTIES,
+    concurrency: int = 4,
+) -> dict:
+    """Generate questions for every concept and difficulty and index them."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate(concept: dict, difficulty: str) -> List[Dict[str, str]]:
+        prompt = PROMPT_TEMPLATE.format(
+            count=per_difficulty,
+            difficulty=difficulty,
+            title=concept["title"],
+            summary=concept["summary"],
+            sample_question=concept["sample_question"],
+        )
+        async with semaphore:
+            try:
+                questions = parse_questions(await complete(prompt))
+            except Exception as e:
+                logger.error(f"Failed to generate {difficulty} questions for {concept['id']}: {e}")
+                questions = []
+        if not questions:
+            logger.warning(f"No {difficulty} questions for {concept['id']}, using sample question")
+            questions = [{"question": concept["sample_question"], "answer": concept["summary"]}]
+        return questions[:per_difficulty]
+
+    jobs = [(c, d) for c in content for d in difficulties]
+    results = await asyncio.gather(*(generate(c, d) for c, d in jobs))
+
+    questions = []
+    index: Dict[str, Dict[str, List[int]]] = {}
+    for (concept, difficulty), generated in zip(jobs, results):
+        slots = index.setdefault(concept["id"], {}).setdefault(difficulty, [])
+        for q in generated:
+            slots.append(len(questions))
+            questions.append([q["question"], q["answer"]])
+
+    return {
+        "format": BANK_FORMAT,
+        "version": content_version(content),
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "difficulties": list(difficulties),
+        "questions": questions,
+        "index": index,
+    }
+
+
+def write_question_bank(bank: dict, path: Path) -> None:
+    with open(path, "w") as f:
+        json.dump(bank, f, separators=(",", ":"))
+    # The next get_question_bank() call reads the new file
+    _BANKS.pop(Path(path), None)
+
+
+class QuestionBank:
+    """Read-only view over a built bank with O(1) lookups by concept and difficulty."""
+
+    def __init__(self, bank: dict) -> None:
+        self.version = bank["version"]
+        self.difficulties = bank["difficulties"]
+        self._questions = bank["questions"]
+        self._index = bank["index"]
+        self._cursors: Dict[tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def has(self, concept_id: str) -> bool:
+        return concept_id in self._index
+
+    def pick(self, concept_id: str, difficulty: str = "easy") -> Optional[Dict[str, str]]:
+        """Return the next question for a concept, rotating through the bank."""
+        by_difficulty = self._index.get(concept_id)
+        if not by_difficulty:
+            return None
+        if not by_difficulty.get(difficulty):
+            # Fall back to the first difficulty that has questions, and report that one
+            difficulty = next((d for d, slots in by_difficulty.items() if slots), difficulty)
+        slots = by_difficulty.get(difficulty)
+        if not slots:
+            return None
+        key = (concept_id, difficulty)
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        question, answer = self._questions[slots[cursor % len(slots)]]
+        return {"question": question, "answer": answer, "difficulty": difficulty}
+
+    @classmethod
+    def load(cls, path: Path, content: Optional[list] = None) -> Optional["QuestionBank"]:
+        """Load a bank file; None if it is missing or was built for a different curriculum."""
+        try:
+            with open(path, "r") as f:
+                bank = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to load question bank from {path}: {e}")
+            return None
+        if bank.get("format") != BANK_FORMAT:
+            logger.warning(f"Ignoring question bank with unsupported format {bank.get('format')}")
+            return None
+        if content is not None and bank["version"] != content_version(content):
+            logger.warning(
+                f"Question bank version {bank['version']} does not match the curriculum; "
+                "rebuild it with `python src/question_bank.py`; generating questions live until then"
+            )
+            return None
+        logger.info(f"Loaded {len(bank['questions'])} banked questions from {path}")
+        return cls(bank)
+
+
+# Banks loaded in this process, by path; a missing or stale bank is not kept
+_BANKS: Dict[Path, QuestionBank] = {}
+
+
+def get_question_bank(path: Path = DEFAULT_BANK_PATH) -> Optional[QuestionBank]:
+    """Process-wide bank instance, or None if it has not been built for the current curriculum.
+
+    Only a loaded bank is cached, so one built after a miss is picked up by the next call.
+    """
+    path = Path(path)
+    bank = _BANKS.get(path)
+    if bank is None:
+        bank = QuestionBank.load(path, shared_data.tutor_content())
+        if bank is not None:
+            _BANKS[path] = bank
+    return bank
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the quiz question bank")
+    parser.add_argument("--content", type=Path, default=DEFAULT_CONTENT_PATH)
+    parser.add_argument("--out", type=Path, default=DEFAULT_BANK_PATH)
+    parser.add_argument("--llm", choices=["google", "stub"], default="google")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    parser.add_argument("--per-difficulty", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.content, "r") as f:
+        content = json.load(f)
+
+    if args.llm == "stub":
+        llm = StubLLM()
+    else:
+        from dotenv import load_dotenv
+        from livekit.plugins import google
+
+        load_dotenv(".env.local")
+        llm = LiveKitLLM(google.LLM(model=args.model))
+
+    bank = asyncio.run(
+        build_question_bank(
+            content,
+            llm.complete,
+            per_difficulty=args.per_difficulty,
+            concurrency=args.concurrency,
+        )
+    )
+    write_question_bank(bank, args.out)
+    logger.info(f"Wrote {len(bank['questions'])} questions (version {bank['version']}) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
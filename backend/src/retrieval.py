@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import math
+import re
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger("retrieval")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no signal about which concept the learner means
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "does",
+    "explain", "for", "from", "how", "i", "in", "is", "it", "like", "me", "my",
+    "of", "on", "or", "please", "quiz", "so", "teach", "tell", "that", "the",
+    "them", "they", "this", "to", "want", "what", "when", "which", "why", "with",
+    "you", "your", "about", "would", "could", "let", "lets", "learn", "know",
+}
+
+# Matches in the id or title count more than matches in the summary
+_TITLE_WEIGHT = 3.0
+_BODY_WEIGHT = 1.0
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        # Fold simple plurals so "loop" matches "loops"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def content_version(content: list) -> str:
+    """Stable hash of the curriculum, used to key caches and detect stale artifacts."""
+    # Bundled content (see data_bundle) is made of read-only Mapping and Sequence views
+    payload = json.dumps(
+        content, sort_keys=True, separators=(",", ":"),
+        default=lambda o: dict(o) if isinstance(o, Mapping) else list(o),
+    ).encode()
+    return hashlib.sha256(payload).hexdigest()[:12]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+class ConceptRetriever:
+    """Keyword index over tutor concepts that returns the top-k matches for a turn."""
+
+    def __init__(self, content: list, top_k: int = 3) -> None:
+        self.content = content
+        self.top_k = top_k
+        self.version = content_version(content)
+        # Positions rather than concepts, so bundled content is not copied into the index
+        self._by_name: Dict[str, int] = {}
+        self._index: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._title_index: Dict[str, Set[int]] = defaultdict(set)
+
+        for i, concept in enumerate(content):
+            self._by_name[concept["id"].lower()] = i
+            self._by_name[concept["title"].lower()] = i
+
+            weights: Dict[str, float] = defaultdict(float)
+            for token in tokenize(concept["id"].replace("_", " ") + " " + concept["title"]):
+                weights[token] += _TITLE_WEIGHT
+                self._title_index[token].add(i)
+            body = concept.get("summary", "") + " " + concept.get("sample_question", "")
+            for token in tokenize(body):
+                weights[token] += _BODY_WEIGHT
+            for token, weight in weights.items():
+                self._index[token][i] = weight
+
+        # Inverse document frequency so common words rank below distinctive ones
+        n = len(content) or 1
+        self._idf = {
+            token: math.log(1 + n / len(postings)) for token, postings in self._index.items()
+        }
+
+    def lookup(self, name: str) -> Optional[dict]:
+        """Return the concept whose id or title matches exactly, if any."""
+        i = self._by_name.get(name.strip().lower())
+        return None if i is None else self.content[i]
+
+    def search(self, query: str, top_k: Optional[int] = None) -> List[dict]:
+        """Return up to top_k concepts ranked by relevance to the query."""
+        limit = self.top_k if top_k is None else top_k
+        exact = self.lookup(query) if query else None
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query or "")):
+            postings = self._index.get(token)
+            if not postings:
+                continue
+            idf = self._idf[token]
+            for i, weight in postings.items():
+                scores[i] += weight * idf
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results = [self.content[i] for i, _ in ranked[:limit]]
+        if exact is not None and exact not in results:
+            results = [exact] + results[: max(limit - 1, 0)]
+        return results
+
+    def spot(self, text: str) -> Optional[dict]:
+        """Cheap keyword spotter for partial transcripts: match concept id/title words only."""
+        hits: Dict[int, int] = defaultdict(int)
+        for token in tokenize(text or ""):
+            for i in self._title_index.get(token, ()):
+                hits[i] += 1
+        if not hits:
+            return None
+        best = max(hits.items(), key=lambda item: (item[1], -item[0]))
+        return self.content[best[0]]
+
+    def titles(self, limit: Optional[int] = None) -> List[str]:
+        """Concept titles in curriculum order, optionally truncated."""
+        concepts = self.content if limit is None else self.content[:limit]
+        return [c["title"] for c in concepts]
+
+    def render_context(self, concepts: List[dict], include_question: bool = False) -> str:
+        """Format retrieved concepts for injection into the chat context."""
+        lines = ["Curriculum concepts relevant to the learner's last message:"]
+        for c in concepts:
+            line = f"- {c['title']} (id: {c['id']}): {c['summary']}"
+            if include_question:
+                line += f" Sample question: {c['sample_question']}"
+            lines.append(line)
+        return "\n".join(lines)
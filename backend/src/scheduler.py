@@ -0,0 +1,113 @@
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("scheduler")
+
+DAY_SECONDS = 86400.0
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+
+@dataclass
+class ReviewState:
+    """SM-2 state for one concept of one learner."""
+
+    concept_id: str
+    ease_factor: float = DEFAULT_EASE
+    interval_days: float = 0.0
+    repetitions: int = 0
+    due_at: float = 0.0
+
+
+def sm2_update(state: ReviewState, quality: int, now: float) -> ReviewState:
+    """Apply one SM-2 review with answer quality 0 (blackout) to 5 (perfect)."""
+    quality = max(0, min(5, quality))
+    if quality < 3:
+        repetitions = 0
+        interval = 1.0
+    else:
+        repetitions = state.repetitions + 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = round(state.interval_days * state.ease_factor, 2)
+    ease = state.ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return ReviewState(
+        concept_id=state.concept_id,
+        ease_factor=max(MIN_EASE, ease),
+        interval_days=interval,
+        repetitions=repetitions,
+        due_at=now + interval * DAY_SECONDS,
+    )
+
+
+class ReviewScheduler:
+    """Picks the next concept to quiz from a priority heap of due dates.
+
+    Concepts are ordered by due date, then by ease factor so weaker concepts come
+    first, then by curriculum order. Updates push a new heap entry and leave the old
+    one to be skipped lazily, so both picking and reviewing are O(log n).
+    """
+
+    def __init__(self, concept_ids: Iterable[str], states: Optional[Dict[str, Dict]] = None) -> None:
+        states = states or {}
+        self._states: Dict[str, ReviewState] = {}
+        self._order: Dict[str, int] = {}
+        self._heap: List[Tuple[float, float, int, str]] = []
+        for i, concept_id in enumerate(concept_ids):
+            self._order[concept_id] = i
+            saved = states.get(concept_id)
+            if saved:
+                state = ReviewState(
+                    concept_id=concept_id,
+                    ease_factor=saved["ease_factor"],
+                    interval_days=saved["interval_days"],
+                    repetitions=saved["repetitions"],
+                    due_at=saved["due_at"],
+                )
+            else:
+                state = ReviewState(concept_id=concept_id)
+            self._states[concept_id] = state
+            self._heap.append(self._entry(state))
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _entry(self, state: ReviewState) -> Tuple[float, float, int, str]:
+        return (state.due_at, state.ease_factor, self._order[state.concept_id], state.concept_id)
+
+    def _is_current(self, entry: Tuple[float, float, int, str]) -> bool:
+        state = self._states[entry[3]]
+        return entry[0] == state.due_at and entry[1] == state.ease_factor
+
+    def state(self, concept_id: str) -> Optional[ReviewState]:
+        return self._states.get(concept_id)
+
+    def next_concept(self) -> Optional[str]:
+        """Return the most overdue (or soonest due) concept without removing it."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        # Rebuild once stale entries dominate so the heap stays O(n)
+        if len(self._heap) > 2 * len(self._states) + 64:
+            self._heap = [self._entry(s) for s in self._states.values()]
+            heapq.heapify(self._heap)
+        return self._heap[0][3] if self._heap else None
+
+    def review(self, concept_id: str, quality: int, now: Optional[float] = None) -> ReviewState:
+        """Record an answer and reschedule the concept."""
+        now = time.time() if now is None else now
+        state = sm2_update(self._states[concept_id], quality, now)
+        self._states[concept_id] = state
+        heapq.heappush(self._heap, self._entry(state))
+        return state
+
+    @classmethod
+    def load(cls, database, learner_id: str, concept_ids: Iterable[str]) -> "ReviewScheduler":
+        """Build a scheduler from the review state persisted in the mastery store."""
+        return cls(concept_ids, database.get_review_schedule(learner_id))
@@ -0,0 +1,125 @@
+import re
+from typing import List, Optional
+
+from livekit.agents import tokenize
+from livekit.agents.tokenize import TokenData
+from livekit.agents.utils import shortuuid
+
+# Sentence-ending punctuation followed by whitespace
+_SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*\s")
+# Clause punctuation followed by whitespace; dashes count only when spaced
+_CLAUSE_END_RE = re.compile(r"(?:[,;:]|\s[-–—])\s")
+_WORD_RE = re.compile(r"\S+\s")
+
+# Words ending in "." that do not end a sentence
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "no", "approx"}
+
+
+class FirstChunkSegmenter(tokenize.SentenceTokenizer):
+    """Sentence tokenizer for TTS that releases a short first chunk as early as possible.
+
+    The first chunk of each segment ends at the first sentence end, the first
+    clause break after a few words, or a hard word limit, whichever comes first.
+    Everything after it is split into whole sentences exactly like
+    tokenize.basic.SentenceTokenizer so later audio keeps natural prosody.
+    """
+
+    def __init__(
+        self,
+        min_clause_words: int = 3,
+        max_first_words: int = 8,
+        min_sentence_len: int = 2,
+    ) -> None:
+        self.min_clause_words = min_clause_words
+        self.max_first_words = max_first_words
+        self.min_sentence_len = min_sentence_len
+        self._sentences = tokenize.basic.SentenceTokenizer(min_sentence_len=min_sentence_len)
+
+    def tokenize(self, text: str, *, language: Optional[str] = None) -> List[str]:
+        return self._sentences.tokenize(text)
+
+    def stream(self, *, language: Optional[str] = None) -> "FirstChunkStream":
+        return FirstChunkStream(self)
+
+
+def first_chunk_end(text: str, min_clause_words: int, max_first_words: int) -> int:
+    """Index just past the early first chunk in text, or 0 if it is not complete yet."""
+    for match in _SENTENCE_END_RE.finditer(text):
+        head = text[: match.start()].split()
+        if head and head[-1].lower().rstrip(".") in _ABBREVIATIONS:
+            continue
+        if head and len(head[-1]) == 1 and text[match.start()] == ".":
+            continue
+        sentence_end = match.end()
+        break
+    else:
+        sentence_end = 0
+
+    clause_end = 0
+    for match in _CLAUSE_END_RE.finditer(text):
+        if len(text[: match.start()].split()) >= min_clause_words:
+            clause_end = match.end()
+            break
+
+    word_end = 0
+    words = list(_WORD_RE.finditer(text))
+    if len(words) >= max_first_words:
+        word_end = words[max_first_words - 1].end()
+
+    candidates = [end for end in (sentence_end, clause_end, word_end) if end]
+    return min(candidates) if candidates else 0
+
+
+class FirstChunkStream(tokenize.SentenceStream):
+    def __init__(self, segmenter: FirstChunkSegmenter) -> None:
+        super().__init__()
+        self._segmenter = segmenter
+        self._segment_id = shortuuid()
+        self._first_sent = False
+        self._in_buf = ""
+
+    def _emit(self, text: str) -> None:
+        text = text.strip()
+        if text:
+            self._event_ch.send_nowait(TokenData(token=text, segment_id=self._segment_id))
+
+    def push_text(self, text: str) -> None:
+        self._check_not_closed()
+        if not text:
+            return
+        self._in_buf += text
+
+        if not self._first_sent:
+            end = first_chunk_end(
+                self._in_buf, self._segmenter.min_clause_words, self._segmenter.max_first_words
+            )
+            if not end:
+                return
+            self._emit(self._in_buf[:end])
+            self._in_buf = self._in_buf[end:].lstrip()
+            self._first_sent = True
+
+        # Same rule as the basic buffered stream: a sentence is complete once the next one starts
+        while True:
+            sentences = self._segmenter.tokenize(self._in_buf)
+            if len(sentences) <= 1:
+                break
+            sentence = sentences[0]
+            self._emit(sentence)
+            index = max(self._in_buf.find(sentence), 0)
+            self._in_buf = self._in_buf[index + len(sentence) :].lstrip()
+
+    def flush(self) -> None:
+        self._check_not_closed()
+        for sentence in self._segmenter.tokenize(self._in_buf):
+            self._emit(sentence)
+        self._in_buf = ""
+        self._first_sent = False
+        self._segment_id = shortuuid()
+
+    def end_input(self) -> None:
+        self.flush()
+        self._do_close()
+
+    async def aclose(self) -> None:
+        self._do_close()
@@ -0,0 +1,377 @@
+import asyncio
+import importlib
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, replace
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional
+
+from livekit.agents import (
+    Agent,
+    AgentSession,
+    JobContext,
+    JobProcess,
+    MetricsCollectedEvent,
+    RoomInputOptions,
+    WorkerOptions,
+    cli,
+    llm,
+    metrics,
+    stt,
+)
+import client_pool
+import latency_metrics
+import loop_watchdog
+import session_memory
+import session_recording
+import tool_profiler
+import tts_pool
+import turn_tracing
+import usage_metrics
+from timing import StageTimer, export_job_timings
+from audio_cache import get_audio_cache
+
+if TYPE_CHECKING:
+    from livekit.plugins import silero
+
+logger = logging.getLogger("session-factory")
+
+# Provider plugins are imported where they are first used, so the worker's main
+# process, which only routes jobs, never loads the LLM, STT or TTS SDKs. Job
+# processes get them from the forkserver, which imports these once for all jobs.
+JOB_PLUGINS: List[str] = [
+    "livekit.plugins.google",
+    "livekit.plugins.cartesia",
+    "livekit.plugins.murf",
+    "livekit.plugins.noise_cancellation",
+]
+
+
+def register_plugins() -> None:
+    """Import the plugins the worker's main process needs; call before cli.run_app.
+
+    Plugins register on import and only on the main thread. The VAD and turn
+    detector must be registered in the main process for download-files and for
+    the shared turn detector inference process.
+    """
+    from livekit.plugins import silero  # noqa: F401
+    from livekit.plugins.turn_detector import multilingual  # noqa: F401
+
+    if sys.platform.startswith("win"):
+        # Jobs run on threads of this process on Windows, where importing a plugin
+        # from prewarm would fail to register it
+        for package in JOB_PLUGINS:
+            importlib.import_module(package)
+
+
+def run_app(entrypoint: Callable, prewarm: Callable[[JobProcess], None], **options) -> None:
+    """Run a worker with the shared plugin setup and the local latency metrics endpoint."""
+    register_plugins()
+    latency_metrics.start_server()
+    cli.run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            preload_modules=JOB_PLUGINS,
+            **options,
+        )
+    )
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    """Per-agent provider choices; everything else is shared by all agents."""
+
+    llm_model: str = "gemini-2.5-flash-lite"
+    stt_model: str = "ink-whisper"
+    voice: str = "en-US-matthew"
+    voice_style: str = "Conversation"
+    preemptive_generation: bool = True
+
+    def override(self, **changes) -> "SessionConfig":
+        return replace(self, **changes)
+
+
+DEFAULT_CONFIG = SessionConfig()
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """How to start one kind of agent: its builder, provider config and hooks."""
+
+    name: str
+    build: Callable[[], Agent]
+    config: SessionConfig = DEFAULT_CONFIG
+    # Loads the agent's shared data and indices; called from prewarm
+    warm: Optional[Callable[[], Any]] = None
+    on_metrics: Optional[Callable[[MetricsCollectedEvent], None]] = None
+    on_shutdown: Optional[Callable[[Agent], None]] = None
+    # Per-session heap budget when SESSION_MEMORY is on; SESSION_MEMORY_BUDGET_MB when unset
+    memory_budget_mb: Optional[float] = None
+
+
+def _cartesia_stt(model: str) -> stt.STT:
+    from livekit.plugins import cartesia
+
+    return cartesia.STT(model=model)
+
+
+def _google_llm(model: str) -> llm.LLM:
+    from livekit.plugins import google
+
+    return google.LLM(model=model)
+
+
+# Provider clients are leased to one session at a time and reused by the next
+# session in the process, so their connection pools stay warm between jobs
+# without concurrent sessions receiving each other's metrics (see client_pool).
+def get_stt(model: str) -> stt.STT:
+    return client_pool.get(("stt", model), lambda: _cartesia_stt(model))
+
+
+def get_llm(model: str) -> llm.LLM:
+    return client_pool.get(("llm", model), lambda: _google_llm(model))
+
+
+def warm_clients(config: SessionConfig) -> None:
+    """Create idle clients for a config ahead of the first job."""
+    try:
+        client_pool.warm(("stt", config.stt_model), lambda: _cartesia_stt(config.stt_model))
+        client_pool.warm(("llm", config.llm_model), lambda: _google_llm(config.llm_model))
+        tts_pool.warm_tts(config.voice, style=config.voice_style)
+    except Exception as e:
+        # Missing credentials surface again, with context, when a job builds its session
+        logger.warning(f"Could not prewarm provider clients for {config}: {e}")
+
+
+def warm_vad(vad: "silero.VAD") -> None:
+    """Run the VAD once on silence so ONNX runtime initialization is not paid on the first turn."""
+    import numpy as np
+    from livekit.plugins.silero import onnx_model
+
+    model = onnx_model.OnnxModel(onnx_session=vad._onnx_session, sample_rate=vad._opts.sample_rate)
+    model(np.zeros(model.window_size_samples, dtype=np.float32))
+
+
+def prewarm(proc: JobProcess, specs: Iterable[AgentSpec]) -> None:
+    """Load models, provider clients and every agent's data before a job is assigned.
+
+    The turn detector needs no warm-up here: its model runs in the worker's shared
+    inference process, which loads it once at worker startup.
+    """
+    from livekit.plugins import noise_cancellation, silero
+
+    timer = StageTimer()
+    vad = silero.VAD.load()
+    proc.userdata["vad"] = vad
+    timer.mark("vad_load")
+    try:
+        warm_vad(vad)
+    except Exception as e:
+        logger.warning(f"VAD warm-up failed: {e}")
+    timer.mark("vad_inference")
+    proc.userdata["noise_cancellation"] = noise_cancellation.BVC()
+    timer.mark("noise_cancellation")
+    # Indexes the cache directory here rather than on the event loop at the first greeting
+    get_audio_cache()
+    timer.mark("audio_cache")
+
+    specs = list(specs)
+    for config in {spec.config for spec in specs}:
+        warm_clients(config)
+    timer.mark("provider_clients")
+    for spec in specs:
+        if spec.warm is not None:
+            spec.warm()
+            timer.mark(f"data_{spec.name}")
+
+    proc.userdata["prewarm_timings"] = timer.as_dict()
+    logger.info(f"Prewarm {timer.summary()}")
+
+
+def create_session(proc: JobProcess, config: SessionConfig = DEFAULT_CONFIG) -> AgentSession:
+    """Build a per-session AgentSession from the process-wide clients."""
+    from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+    return AgentSession(
+        stt=get_stt(config.stt_model),
+        llm=get_llm(config.llm_model),
+        tts=tts_pool.get_tts(config.voice, style=config.voice_style),
+        # The turn detector binds to the job's inference executor, so it is per session
+        turn_detection=MultilingualModel(),
+        vad=proc.userdata["vad"],
+        preemptive_generation=config.preemptive_generation,
+    )
+
+
+async def run_session(ctx: JobContext, spec: AgentSpec) -> None:
+    """Common job entrypoint: build the agent and session, start, connect and wait.
+
+    Startup is timed stage by stage here so every agent reports it the same way.
+    """
+    ctx.log_context_fields = {"room": ctx.room.name}
+    timer = StageTimer()
+    job = {"job_id": ctx.job.id, "room": ctx.room.name, "agent": spec.name, "pid": os.getpid()}
+    watchdog = None
+    if loop_watchdog.enabled():
+        # Started first so synchronous work during startup is attributed too
+        watchdog = loop_watchdog.LoopWatchdog(ctx.room.name, spec.name)
+        watchdog.start()
+    memory = None
+    if session_memory.enabled():
+        # Started before the agent is built so its construction is counted
+        memory = session_memory.SessionMemory(ctx.room.name, spec.name, spec.memory_budget_mb)
+        if not memory.start():
+            memory = None
+
+    # Agents and the session take their provider clients from this session's lease
+    lease = client_pool.open_lease()
+
+    try:
+        # Cheap when prewarm already loaded the data; shows the cost when it did not
+        if spec.warm is not None:
+            spec.warm()
+        timer.mark("data")
+        if tool_profiler.enabled():
+            # Tools are collected when an agent is constructed, so wrap them first
+            tool_profiler.instrument_agents()
+        agent = spec.build()
+        timer.mark("agent")
+        session = create_session(ctx.proc, spec.config)
+        timer.mark("session")
+
+        latency = latency_metrics.enabled()
+        usage_collector = metrics.UsageCollector()
+        usage = usage_metrics.UsageRecorder(ctx.room.name, spec.name) if usage_metrics.enabled() else None
+        tracer = turn_tracing.TurnTracer(
+            ctx.room.name, spec.name, turn_tracing.get_exporter() if turn_tracing.enabled() else None
+        )
+
+        @session.on("metrics_collected")
+        def _on_metrics_collected(ev: MetricsCollectedEvent):
+            metrics.log_metrics(ev.metrics)
+            usage_collector.collect(ev.metrics)
+            if usage is not None:
+                usage.observe(ev.metrics)
+            if latency:
+                latency_metrics.observe(spec.name, ev.metrics)
+            tracer.on_metrics(ev.metrics)
+            if spec.on_metrics is not None:
+                spec.on_metrics(ev)
+
+        @session.on("function_tools_executed")
+        def _on_function_tools_executed(ev):
+            tracer.on_tools_executed(ev)
+
+        recorder = None
+        if session_recording.enabled():
+            recorder = session_recording.SessionRecorder(ctx.room.name, spec.name)
+            recorder.attach(session)
+
+        if memory is not None:
+            memory.watch(session)
+
+        flusher = asyncio.create_task(latency_metrics.flush_periodically()) if latency else None
+        usage_flusher = asyncio.create_task(usage.flush_periodically()) if usage is not None else None
+
+        async def log_usage():
+            if memory is not None:
+                memory.stop()
+                logger.info(f"Session memory: {memory.summary()}")
+            if flusher is not None:
+                flusher.cancel()
+                try:
+                    latency_metrics.flush()
+                except OSError as e:
+                    logger.warning(f"Could not write latency snapshot: {e}")
+            summary = usage_collector.get_summary()
+            logger.info(f"Usage: {summary}")
+            if usage is not None:
+                usage_flusher.cancel()
+                try:
+                    await usage.store()
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning(f"Could not write usage to {usage.path}: {e}")
+            lease.release()
+            logger.info(f"TTS pool size {tts_pool.pool_size()}: {', '.join(tts_pool.pooled_voices())}")
+            logger.info(f"Audio cache: {get_audio_cache().summary()}")
+            if spec.on_shutdown is not None:
+                spec.on_shutdown(agent)
+            if tool_profiler.enabled():
+                logger.info(f"Tool profile:\n{tool_profiler.report()}")
+            if watchdog is not None:
+                watchdog.stop()
+                logger.info(f"Event loop: {watchdog.summary()}")
+            if tracer.exporter is not None:
+                # Spans are written by a background thread; wait for this session's
+                await asyncio.get_running_loop().run_in_executor(None, tracer.exporter.flush)
+            if recorder is not None:
+                try:
+                    path = await asyncio.get_running_loop().run_in_executor(None, recorder.save)
+                    logger.info(f"Session recorded to {path}")
+                except OSError as e:
+                    logger.warning(f"Could not save session recording: {e}")
+
+        ctx.add_shutdown_callback(log_usage)
+    except BaseException:
+        # log_usage is not registered yet, so nothing else would release these
+        lease.release()
+        if memory is not None:
+            memory.stop()
+        if watchdog is not None:
+            watchdog.stop()
+        raise
+
+    def export_timings() -> None:
+        if job.get("exported"):
+            return
+        job["exported"] = True
+        export_job_timings(
+            {
+                "at": round(time.time(), 3),
+                **{k: v for k, v in job.items() if k != "exported"},
+                "stages_ms": timer.as_dict(),
+                "startup_ms": round(timer.total * 1000, 2),
+                "prewarm_ms": ctx.proc.userdata.get("prewarm_timings"),
+            }
+        )
+
+    @session.on("agent_state_changed")
+    def _on_agent_state_changed(ev):
+        if ev.new_state == "speaking" and "first_audio_ms" not in job:
+            job["first_audio_ms"] = round(timer.elapsed() * 1000, 2)
+            if "connect" in timer.as_dict():
+                export_timings()
+
+    async def flush_timings():
+        export_timings()
+
+    ctx.add_shutdown_callback(flush_timings)
+
+    from livekit.plugins import noise_cancellation
+
+    await session.start(
+        agent=agent,
+        room=ctx.room,
+        room_input_options=RoomInputOptions(
+            noise_cancellation=ctx.proc.userdata.get("noise_cancellation") or noise_cancellation.BVC(),
+        ),
+    )
+    timer.mark("start")
+
+    await ctx.connect()
+    timer.mark("connect")
+    logger.info(f"{spec.name} startup {timer.summary()}")
+    if "first_audio_ms" in job:
+        export_timings()
+
+    shutdown_future = asyncio.Future()
+
+    @ctx.room.on("disconnected")
+    def on_disconnected(reason):
+        if not shutdown_future.done():
+            shutdown_future.set_result(None)
+
+    await shutdown_future
@@ -0,0 +1,165 @@
+"""Per-session memory accounting with tracemalloc, and budgets that compact or warn.
+
+Job processes run one session each, so the Python heap allocated since the
+session started, as traced by tracemalloc, is what that session costs. It is
+sampled into the session_memory histogram served with the latency metrics,
+and the session's peak is recorded when it ends. tracemalloc cannot tell
+sessions apart, so this needs one session per process: a second session that
+starts while another is measured, e.g. under the thread executor, logs a warning
+and runs unmeasured.
+
+Agents share the process-wide catalog, universes, curriculum and company data
+(see shared_data), so what grows is per-session state: chat history, carts and
+the game master's world state. When a session goes over its budget, the active
+agent's compact_memory() is called if it has one and the chat history is cut
+to its most recent items. If that is not enough, a warning names the largest
+allocation sites. Compaction and the warning then wait until the heap grows
+another 25%, so a session stuck over budget is not compacted every sample.
+
+    SESSION_MEMORY=1             enable (tracemalloc slows allocation-heavy code)
+    SESSION_MEMORY_BUDGET_MB=64  default per-session budget
+    SESSION_MEMORY_INTERVAL=15   seconds between samples
+"""
+import asyncio
+import gc
+import logging
+import os
+import threading
+import tracemalloc
+from typing import Optional
+
+import env_flags
+import latency_metrics
+
+logger = logging.getLogger("session-memory")
+
+# Chat items kept when a session over budget is compacted
+KEEP_CHAT_ITEMS = 40
+# Compact or warn again only after the heap grows this much past the last time
+REGROWTH = 1.25
+
+_LOCK = threading.Lock()
+# The session being measured; tracemalloc covers the whole process
+_ACTIVE: Optional["SessionMemory"] = None
+
+
+def enabled() -> bool:
+    return env_flags.flag("SESSION_MEMORY")
+
+
+def default_budget_mb() -> float:
+    return float(os.getenv("SESSION_MEMORY_BUDGET_MB", "64"))
+
+
+def top_allocations(limit: int = 3) -> str:
+    """The largest live allocation sites, as file:line and size."""
+    stats = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    ).statistics("lineno")
+    return ", ".join(
+        f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno} {s.size / 1024:.0f} KiB"
+        for s in stats[:limit]
+    )
+
+
+class SessionMemory:
+    """Samples one session's heap, enforcing its budget; start() before building the agent."""
+
+    def __init__(
+        self,
+        room: str,
+        agent: str,
+        budget_mb: Optional[float] = None,
+        interval: Optional[float] = None,
+    ) -> None:
+        self.room = room
+        self.agent = agent
+        self.budget = int((default_budget_mb() if budget_mb is None else budget_mb) * 1024 * 1024)
+        self.interval = float(os.getenv("SESSION_MEMORY_INTERVAL", "15")) if interval is None else interval
+        self.baseline = 0
+        self.compactions = 0
+        self.warnings = 0
+        self._compact_above = self.budget
+        self._warn_above = self.budget
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> bool:
+        """Begin measuring; False, with a warning, if another session in this process is measured."""
+        global _ACTIVE
+        with _LOCK:
+            if _ACTIVE is not None and _ACTIVE is not self:
+                logger.warning(
+                    f"Not measuring memory for room {self.room}: SESSION_MEMORY covers the whole process "
+                    f"heap and room {_ACTIVE.room} is already measured; use one session per process"
+                )
+                return False
+            _ACTIVE = self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        return True
+
+    def used(self) -> int:
+        return max(tracemalloc.get_traced_memory()[0] - self.baseline, 0)
+
+    def peak(self) -> int:
+        return max(tracemalloc.get_traced_memory()[1] - self.baseline, 0)
+
+    def watch(self, session) -> None:
+        """Sample periodically on the session's loop."""
+        self._task = asyncio.create_task(self._run(session))
+
+    async def _run(self, session) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check(session)
+
+    async def check(self, session) -> int:
+        used = self.used()
+        latency_metrics.record("session_memory", self.agent, "tracemalloc", used)
+        if used <= self._compact_above:
+            return used
+        await self.compact(session)
+        after = self.used()
+        self._compact_above = max(self.budget, int(after * REGROWTH))
+        logger.info(
+            f"Session in room {self.room} over its {self.budget >> 20} MB budget: "
+            f"compacted {used >> 20} MB -> {after >> 20} MB"
+        )
+        if after > self._warn_above:
+            self.warnings += 1
+            self._warn_above = int(after * REGROWTH)
+            logger.warning(
+                f"Session in room {self.room} ({self.agent}) uses {after >> 20} MB, "
+                f"budget {self.budget >> 20} MB; largest sites: {top_allocations()}"
+            )
+        return after
+
+    async def compact(self, session) -> None:
+        self.compactions += 1
+        agent = session.current_agent
+        compact = getattr(agent, "compact_memory", None)
+        if compact is not None:
+            logger.info(f"{type(agent).__name__}.compact_memory: {compact()}")
+        chat_ctx = agent.chat_ctx.copy()
+        if len(chat_ctx.items) > KEEP_CHAT_ITEMS:
+            chat_ctx.truncate(max_items=KEEP_CHAT_ITEMS)
+            await agent.update_chat_ctx(chat_ctx)
+        session.history.truncate(max_items=KEEP_CHAT_ITEMS)
+        gc.collect()
+
+    def stop(self) -> None:
+        global _ACTIVE
+        if self._task is not None:
+            self._task.cancel()
+        latency_metrics.record("session_memory_peak", self.agent, "tracemalloc", self.peak())
+        with _LOCK:
+            if _ACTIVE is self:
+                _ACTIVE = None
+
+    def summary(self) -> str:
+        return (
+            f"{self.used() / (1024 * 1024):.1f} MB now, peak {self.peak() / (1024 * 1024):.1f} MB, "
+            f"budget {self.budget >> 20} MB, {self.compactions} compactions, {self.warnings} warnings"
+        )
@@ -0,0 +1,332 @@
+"""Record sessions to compact files and replay their tool calls as regression tests.
+
+With SESSION_RECORDING=1 each session writes its transcript, the LLM's replies,
+every tool call with its arguments and result, handoffs and stage timings to
+SESSION_RECORDINGS_DIR/<agent>-<room>-<time>.jsonl.gz. The first line is a
+header; each event after it carries "t", milliseconds since the session started.
+
+Replaying rebuilds the agent from the current code and runs the recorded tool
+calls against it in order, following handoffs, with no session, LLM or
+network. Each call is timed (median of --repeat runs) and its peak allocation
+measured with tracemalloc, then compared with the baseline next to the
+recording. Baselines store times relative to timing.reference_seconds(), so
+they are committed and checked on any machine; a recording without one fails
+until it is created with --update-baseline. Tools that write to shared-data are
+skipped unless --include-writes.
+
+    python src/session_recording.py replay session-recordings/*.jsonl.gz
+    python src/session_recording.py replay rec.jsonl.gz --update-baseline
+    python src/session_recording.py show rec.jsonl.gz
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import env_flags
+import timing
+
+logger = logging.getLogger("session-recording")
+
+RECORDINGS_DIR = Path(os.getenv("SESSION_RECORDINGS_DIR", Path(__file__).parent.parent / "session-recordings"))
+FORMAT_VERSION = 1
+# Tool results are kept for reading back, not for replay, so long ones are cut
+MAX_OUTPUT_CHARS = 1000
+
+# Tools that write orders, leads, saves or mastery scores under shared-data
+WRITE_TOOLS = {
+    "place_order",
+    "save_lead_info",
+    "end_call_and_summarize",
+    "save_game",
+    "record_answer",
+    "evaluate_explanation",
+}
+
+
+def enabled() -> bool:
+    return env_flags.flag("SESSION_RECORDING")
+
+
+class SessionRecorder:
+    """Collects one session's events in memory; save() writes them at shutdown."""
+
+    def __init__(self, room: str, agent: str, directory: Path = RECORDINGS_DIR) -> None:
+        self.room = room
+        self.agent = agent
+        self.directory = Path(directory)
+        self.started = time.time()
+        self.events: List[dict] = []
+
+    def _event(self, kind: str, at: Optional[float] = None, **fields) -> None:
+        at = time.time() if at is None else at
+        self.events.append({"t": round((at - self.started) * 1000, 1), "k": kind, **fields})
+
+    def attach(self, session) -> None:
+        session.on("conversation_item_added", lambda ev: self.on_item(ev.item, ev.created_at))
+        session.on("function_tools_executed", self.on_tools_executed)
+        session.on("metrics_collected", lambda ev: self.on_metrics(ev.metrics))
+
+    def on_item(self, item, at: Optional[float] = None) -> None:
+        if item.type == "message":
+            fields = {"role": item.role, "text": item.text_content or ""}
+            if getattr(item, "interrupted", False):
+                fields["interrupted"] = True
+            self._event("msg", at, **fields)
+        elif item.type == "agent_handoff":
+            self._event("handoff", at, to=item.new_agent_id, **{"from": item.old_agent_id})
+
+    def on_tools_executed(self, ev) -> None:
+        outputs = {out.call_id: out for out in ev.function_call_outputs if out is not None}
+        for call in ev.function_calls:
+            try:
+                arguments = json.loads(call.arguments or "{}")
+            except ValueError:
+                arguments = {"_raw": call.arguments}
+            out = outputs.get(call.call_id)
+            end = out.created_at if out is not None else ev.created_at
+            self._event(
+                "tool",
+                call.created_at,
+                name=call.name,
+                args=arguments,
+                out=(out.output[:MAX_OUTPUT_CHARS] if out is not None else None),
+                err=bool(out is not None and out.is_error),
+                ms=round((end - call.created_at) * 1000, 2),
+            )
+
+    def on_metrics(self, m) -> None:
+        kind = getattr(m, "type", None)
+        if kind == "eou_metrics":
+            self._event(
+                "eou", m.timestamp,
+                eou=round(m.end_of_utterance_delay, 4), stt=round(m.transcription_delay, 4),
+            )
+        elif kind == "llm_metrics":
+            self._event(
+                "llm", m.timestamp,
+                ttft=round(m.ttft, 4), dur=round(m.duration, 4), tok=m.completion_tokens,
+                model=m.metadata.model_name if m.metadata else m.label,
+            )
+        elif kind == "tts_metrics":
+            self._event(
+                "tts", m.timestamp,
+                ttfb=round(m.ttfb, 4), dur=round(m.duration, 4), chars=m.characters_count,
+            )
+
+    def save(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = self.directory / f"{self.agent}-{self.room}-{stamp}.jsonl.gz"
+        header = {"v": FORMAT_VERSION, "agent": self.agent, "room": self.room, "started": round(self.started, 3)}
+        lines = [header] + self.events
+        data = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(data)
+        return path
+
+
+def load(path: Path) -> Tuple[dict, List[dict]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("v") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} session recording")
+    return lines[0], lines[1:]
+
+
+# --- Replay ------------------------------------------------------------------------
+
+
+@dataclass
+class CallResult:
+    name: str
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    skipped: bool = False
+    error: Optional[str] = None
+
+
+def _next_agent(result, agent):
+    """Handoff tools return the new agent, alone or with a message."""
+    from livekit.agents import Agent
+
+    if isinstance(result, tuple) and result and isinstance(result[0], Agent):
+        return result[0]
+    if isinstance(result, Agent):
+        return result
+    return agent
+
+
+async def _run_calls(build, calls: List[dict], include_writes: bool, measure_memory: bool) -> List[CallResult]:
+    agent = build()
+    results = []
+    for call in calls:
+        result = CallResult(call["name"])
+        results.append(result)
+        if call["name"] in WRITE_TOOLS and not include_writes:
+            result.skipped = True
+            continue
+        tool = getattr(agent, call["name"], None)
+        if tool is None or not hasattr(tool, "info"):
+            result.error = f"{type(agent).__name__} has no tool {call['name']}"
+            continue
+        if measure_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            output = await tool(None, **call["args"])
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            continue
+        result.seconds = time.perf_counter() - started
+        if measure_memory:
+            result.peak_bytes = max(tracemalloc.get_traced_memory()[1] - before, 0)
+        agent = _next_agent(output, agent)
+    return results
+
+
+async def replay(agent_name: str, calls: List[dict], repeat: int = 5, include_writes: bool = False) -> List[CallResult]:
+    """Median time and peak allocation of each recorded call against the current agent code."""
+    from worker import AGENTS
+
+    spec = AGENTS[agent_name]
+    # Agents build their TTS clients up front; replay never speaks, so any key will do
+    os.environ.setdefault("MURF_API_KEY", "replay")
+    if spec.warm is not None:
+        spec.warm()
+    # An untimed first run so imports and lazily built indices are not charged to a call
+    await _run_calls(spec.build, calls, include_writes, measure_memory=False)
+    runs = [await _run_calls(spec.build, calls, include_writes, measure_memory=False) for _ in range(repeat)]
+    tracemalloc.start()
+    try:
+        memory = await _run_calls(spec.build, calls, include_writes, measure_memory=True)
+    finally:
+        tracemalloc.stop()
+    results = memory
+    for i, result in enumerate(results):
+        result.seconds = statistics.median(run[i].seconds for run in runs)
+    return results
+
+
+def baseline_path(recording: Path) -> Path:
+    return recording.with_name(recording.name.replace(".jsonl.gz", "") + ".baseline.json")
+
+
+def baseline_record(results: List[CallResult], reference: float) -> dict:
+    """A portable baseline: call times as multiples of this machine's reference time."""
+    calls = []
+    for r in results:
+        call = asdict(r)
+        call["relative"] = round(call.pop("seconds") / reference, 6)
+        calls.append(call)
+    return {"reference_seconds": round(reference, 6), "calls": calls}
+
+
+def compare(
+    results: List[CallResult],
+    baseline: dict,
+    reference: float,
+    latency_ratio: float = 1.5,
+    alloc_ratio: float = 1.25,
+    min_seconds: float = 0.0005,
+    min_bytes: int = 8192,
+) -> List[str]:
+    """Regressions against the baseline, scaled to this machine by its reference time.
+
+    Differences below the floors are noise.
+    """
+    if not isinstance(baseline, dict) or "calls" not in baseline:
+        return ["baseline predates machine-relative times; rerun with --update-baseline"]
+    calls = baseline["calls"]
+    if [r.name for r in results] != [b["name"] for b in calls]:
+        return ["recorded calls no longer match the baseline; rerun with --update-baseline"]
+    problems = []
+    for i, (now, then) in enumerate(zip(results, calls)):
+        label = f"call {i} {now.name}"
+        if now.error and not then.get("error"):
+            problems.append(f"{label} failed: {now.error}")
+            continue
+        if now.skipped or then.get("skipped"):
+            continue
+        expected = then["relative"] * reference
+        if now.seconds > expected * latency_ratio and now.seconds - expected > min_seconds:
+            problems.append(f"{label} took {now.seconds * 1000:.2f} ms, baseline {expected * 1000:.2f} ms on this machine")
+        if now.peak_bytes > then["peak_bytes"] * alloc_ratio and now.peak_bytes - then["peak_bytes"] > min_bytes:
+            problems.append(
+                f"{label} allocated {now.peak_bytes / 1024:.1f} KiB, baseline {then['peak_bytes'] / 1024:.1f} KiB"
+            )
+    return problems
+
+
+def _replay_one(path: Path, args) -> bool:
+    header, events = load(path)
+    calls = [e for e in events if e["k"] == "tool"]
+    results = asyncio.run(replay(header["agent"], calls, args.repeat, args.include_writes))
+    reference = timing.reference_seconds()
+    print(f"{path.name}: {header['agent']}, {len(calls)} tool calls, reference {reference * 1000:.1f} ms")
+    for i, r in enumerate(results):
+        status = "skipped (writes)" if r.skipped else (r.error or f"{r.seconds * 1000:8.3f} ms {r.peak_bytes / 1024:8.1f} KiB")
+        print(f"  {i:3} {r.name:<28} {status}")
+
+    base_file = baseline_path(path)
+    if args.update_baseline:
+        base_file.write_text(json.dumps(baseline_record(results, reference), indent=1) + "\n")
+        print(f"  baseline written to {base_file}")
+        return True
+    if not base_file.exists():
+        print(f"  MISSING baseline {base_file}; run with --update-baseline to record it")
+        return False
+    problems = compare(results, json.loads(base_file.read_text()), reference, args.latency_ratio, args.alloc_ratio)
+    for problem in problems:
+        print(f"  REGRESSION {problem}")
+    return not problems
+
+
+def show(path: Path) -> None:
+    header, events = load(path)
+    print(f"{header['agent']} in {header['room']}, {len(events)} events")
+    for e in events:
+        if e["k"] == "msg":
+            print(f"{e['t']:>9.0f} {e['role']:>9}: {e['text'][:100]}")
+        elif e["k"] == "tool":
+            print(f"{e['t']:>9.0f}      tool: {e['name']}({json.dumps(e['args'])[:80]}) {e['ms']:.1f} ms")
+        elif e["k"] == "handoff":
+            print(f"{e['t']:>9.0f}   handoff: {e['from']} -> {e['to']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and replay recorded sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show_parser = commands.add_parser("show", help="print a recording")
+    show_parser.add_argument("recording", type=Path)
+    replay_parser = commands.add_parser("replay", help="re-run recorded tool calls and compare to the baseline")
+    replay_parser.add_argument("recordings", type=Path, nargs="+")
+    replay_parser.add_argument("--repeat", type=int, default=5)
+    replay_parser.add_argument("--latency-ratio", type=float, default=1.5, help="fail above this multiple of the baseline time")
+    replay_parser.add_argument("--alloc-ratio", type=float, default=1.25, help="fail above this multiple of the baseline allocation")
+    replay_parser.add_argument("--include-writes", action="store_true", help="also run tools that write shared-data")
+    replay_parser.add_argument("--update-baseline", action="store_true", help="write baselines instead of checking them")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.command == "show":
+        show(args.recording)
+        return 0
+    ok = True
+    for path in args.recordings:
+        ok = _replay_one(path, args) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import functools
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import data_bundle
+import env_flags
+from retrieval import ConceptRetriever
+
+logger = logging.getLogger("shared-data")
+
+DATA_DIR = Path(__file__).parent.parent / "shared-data"
+
+
+def bundles_enabled() -> bool:
+    return env_flags.flag("SHARED_DATA_BUNDLES")
+
+
+def _load_json(name: str, default: Any) -> Any:
+    path = DATA_DIR / name
+    if bundles_enabled():
+        # Memory-mapped, so every job process reads the same physical pages
+        bundle = data_bundle.open_fresh(path)
+        if bundle is not None:
+            logger.info(f"Mapped {bundle.path.name} for {name}")
+            return bundle.root
+    try:
+        # utf-8-sig also accepts files saved with a byte order mark
+        with open(path, "r", encoding="utf-8-sig") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load {path}: {e}")
+        return default
+
+
+# Parsed once per process and shared read-only by every session in it
+@functools.lru_cache(maxsize=None)
+def tutor_content() -> list:
+    content = _load_json("day4_tutor_content.json", [])
+    logger.info(f"Loaded {len(content)} concepts")
+    return content
+
+
+@functools.lru_cache(maxsize=None)
+def concept_retriever() -> ConceptRetriever:
+    return ConceptRetriever(tutor_content())
+
+
+@functools.lru_cache(maxsize=None)
+def company_data() -> dict:
+    data = _load_json(
+        "company_data.json",
+        {"company": "Unknown", "description": "", "pricing": {}, "faqs": []},
+    )
+    logger.info(f"Loaded company data for {data.get('company')}")
+    return data
+
+
+@functools.lru_cache(maxsize=None)
+def food_catalog() -> dict:
+    catalog = _load_json("food_catalog.json", {"categories": {}, "recipes": {}})
+    logger.info(f"Loaded food catalog with {len(catalog.get('categories', {}))} categories")
+    return catalog
+
+
+@functools.lru_cache(maxsize=None)
+def game_universes() -> dict:
+    universes = _load_json("game_universes.json", {})
+    logger.info(f"Loaded {len(universes)} universes")
+    return universes
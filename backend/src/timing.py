@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("timing")
+
+# One JSON line per job with its startup stage timings
+JOB_TIMINGS_PATH = Path(
+    os.environ.get("JOB_TIMINGS_PATH", Path(__file__).parent.parent / "job-timings.jsonl")
+)
+
+
+class StageTimer:
+    """Records how long each named stage of a startup path takes."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages: List[Tuple[str, float]] = []
+
+    def elapsed(self) -> float:
+        """Seconds since the timer started, without closing a stage."""
+        return time.perf_counter() - self.started
+
+    def mark(self, stage: str) -> float:
+        """Close the current stage and return its duration in seconds."""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.stages.append((stage, elapsed))
+        self._last = now
+        return elapsed
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations in milliseconds, in the order they ran."""
+        return {stage: round(seconds * 1000, 2) for stage, seconds in self.stages}
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in self.stages)
+        return f"{self.total * 1000:.0f} ms ({stages})"
+
+
+def export_job_timings(record: dict, path: Optional[Path] = None) -> None:
+    """Append one job's timing record to the JSON lines log."""
+    path = path or JOB_TIMINGS_PATH
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not export job timings to {path}: {e}")
+
+
+def _reference_workload() -> int:
+    # Dict building, JSON, sorting and string matching, like the function tools
+    rows = [{"id": f"item_{i}", "name": f"Item {i % 997}", "price": (i * 37) % 1000 / 100} for i in range(5000)]
+    rows = json.loads(json.dumps(rows))
+    rows.sort(key=lambda row: (row["name"], row["price"]))
+    return sum(1 for row in rows if "9" in row["name"].lower())
+
+
+def reference_seconds(repeat: int = 7) -> float:
+    """Best time of a fixed pure-Python workload on this machine, in seconds.
+
+    Committed benchmark baselines store times divided by this, measured in the
+    same process, so a baseline recorded on one machine can be checked on another.
+    """
+    _reference_workload()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _reference_workload()
+        times.append(time.perf_counter() - started)
+    # The minimum is the least disturbed by other load, as with timeit
+    return min(times)
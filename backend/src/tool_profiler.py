@@ -0,0 +1,188 @@
+"""Opt-in profiler for every @function_tool on every agent class.
+
+Enable with TOOL_PROFILE=1. Each call records its wall time, split into the
+time it held the event loop (CPU work and any blocking file or database
+call) and the time it was suspended awaiting I/O, plus the size of its
+arguments and result and any exception. The session logs a report sorted by
+total wall time at shutdown.
+"""
+import functools
+import types
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+
+from livekit.agents import Agent
+from livekit.agents.llm import FunctionTool, RawFunctionTool
+
+import env_flags
+from latency_metrics import Histogram
+
+# Tools range from dictionary lookups to LLM calls, so buckets start at 100 us
+TIME_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_MARKER = "__tool_profiler__"
+
+
+def enabled() -> bool:
+    return env_flags.flag("TOOL_PROFILE")
+
+
+class ToolStats:
+    __slots__ = ("name", "wall", "loop", "io", "arg_chars", "result_chars", "max_result_chars", "errors")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wall = Histogram(TIME_BUCKETS)
+        # Time spent running on the event loop, during which nothing else could
+        self.loop = Histogram(TIME_BUCKETS)
+        # Time suspended awaiting network or other I/O
+        self.io = Histogram(TIME_BUCKETS)
+        # Characters exchanged with the LLM, totalled over all calls
+        self.arg_chars = 0
+        self.result_chars = 0
+        self.max_result_chars = 0
+        self.errors: Dict[str, int] = {}
+
+    @property
+    def calls(self) -> int:
+        return self.wall.count
+
+
+_STATS: Dict[str, ToolStats] = {}
+# Raw samples appended by the hot path and folded into _STATS when read, so a
+# call costs one list append instead of three histogram updates
+_PENDING: List[tuple] = []
+_FOLD_EVERY = 256
+
+
+def _fold() -> None:
+    while _PENDING:
+        samples = _PENDING[:]
+        del _PENDING[: len(samples)]
+        for name, wall, loop_time, arg_chars, result_chars, error in samples:
+            tool_stats = _STATS.get(name)
+            if tool_stats is None:
+                tool_stats = _STATS[name] = ToolStats(name)
+            tool_stats.wall.observe(wall)
+            tool_stats.loop.observe(loop_time)
+            tool_stats.io.observe(max(wall - loop_time, 0.0))
+            tool_stats.arg_chars += arg_chars
+            tool_stats.result_chars += result_chars
+            if result_chars > tool_stats.max_result_chars:
+                tool_stats.max_result_chars = result_chars
+            if error is not None:
+                tool_stats.errors[error] = tool_stats.errors.get(error, 0) + 1
+
+
+def stats() -> Dict[str, ToolStats]:
+    _fold()
+    return _STATS
+
+
+def reset() -> None:
+    _PENDING.clear()
+    _STATS.clear()
+
+
+def _size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    return len(str(value))
+
+
+@types.coroutine
+def _drive(coro, timing: List[float]):
+    """Await coro step by step, adding the time each step runs on the loop to timing[0]."""
+    send = coro.send
+    value, error = None, None
+    while True:
+        started = perf_counter()
+        try:
+            future = send(value) if error is None else coro.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            timing[0] += perf_counter() - started
+        try:
+            value, error = (yield future), None
+        except BaseException as e:
+            value, error = None, e
+
+
+def profile_tool(name: str, func):
+    """Wrap an async tool implementation; the wrapper keeps func's signature."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        # Only the LLM-supplied (keyword) arguments count, not self or the RunContext
+        arg_chars = 0
+        for value in kwargs.values():
+            arg_chars += _size(value)
+        timing = [0.0]
+        started = perf_counter()
+        try:
+            result = await _drive(func(*args, **kwargs), timing)
+        except BaseException as e:
+            _PENDING.append((name, perf_counter() - started, timing[0], arg_chars, 0, type(e).__name__))
+            raise
+        _PENDING.append((name, perf_counter() - started, timing[0], arg_chars, _size(result), None))
+        if len(_PENDING) >= _FOLD_EVERY:
+            _fold()
+        return result
+
+    setattr(wrapper, _MARKER, True)
+    return wrapper
+
+
+def instrument(cls: type) -> int:
+    """Replace the function tools defined on cls with profiled copies; returns how many."""
+    count = 0
+    for attr, member in list(vars(cls).items()):
+        if not isinstance(member, (FunctionTool, RawFunctionTool)):
+            continue
+        func = member._func
+        if getattr(func, _MARKER, False):
+            continue
+        name = f"{cls.__name__}.{member.info.name}"
+        setattr(cls, attr, member.__class__(profile_tool(name, func), member.info))
+        count += 1
+    return count
+
+
+def _subclasses(cls: type) -> Iterable[type]:
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+def instrument_agents() -> int:
+    """Instrument every imported Agent subclass; safe to call more than once."""
+    return sum(instrument(cls) for cls in set(_subclasses(Agent)))
+
+
+def report(limit: Optional[int] = None) -> str:
+    rows = sorted(stats().values(), key=lambda s: -s.wall.sum)
+    rows = [s for s in rows if s.calls][:limit]
+    if not rows:
+        return "No tool calls recorded"
+    lines = [
+        f"{'tool':<44}{'calls':>6}{'err':>5}{'total s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'loop p95':>10}{'io p95':>9}{'args':>7}{'result':>8}{'max':>8}"
+    ]
+    for s in rows:
+        lines.append(
+            f"{s.name[:43]:<44}{s.calls:>6}{sum(s.errors.values()):>5}{s.wall.sum:>9.3f}"
+            f"{s.wall.quantile(0.5) * 1000:>9.1f}{s.wall.quantile(0.95) * 1000:>9.1f}"
+            f"{s.wall.quantile(0.99) * 1000:>9.1f}{s.loop.quantile(0.95) * 1000:>10.1f}"
+            f"{s.io.quantile(0.95) * 1000:>9.1f}{s.arg_chars / s.calls:>7.0f}"
+            f"{s.result_chars / s.calls:>8.0f}{s.max_result_chars:>8}"
+        )
+        if s.errors:
+            errors = ", ".join(f"{kind} x{n}" for kind, n in sorted(s.errors.items()))
+            lines.append(f"    errors: {errors}")
+    return "\n".join(lines)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Callable, Set
+
+from livekit.agents import tts
+
+import client_pool
+from audio_cache import get_audio_cache
+from segmenter import FirstChunkSegmenter
+
+logger = logging.getLogger("tts-pool")
+
+# Background cache fills, referenced so they are not garbage collected mid-render
+_RENDERS: Set[asyncio.Task] = set()
+
+
+def murf_tts(voice: str, style: str, text_pacing: bool) -> tts.TTS:
+    from livekit.plugins import murf
+
+    return murf.TTS(
+        voice=voice,
+        style=style,
+        tokenizer=FirstChunkSegmenter(),
+        text_pacing=text_pacing,
+    )
+
+
+_FACTORY: Callable[[str, str, bool], tts.TTS] = murf_tts
+
+
+def set_factory(factory: Callable[[str, str, bool], tts.TTS]) -> None:
+    """Build pooled voices with another TTS (e.g. offline stand-ins); empties the pool."""
+    global _FACTORY
+    _FACTORY = factory
+    client_pool.clear("tts")
+
+
+def get_tts(voice: str, style: str = "Conversation", text_pacing: bool = True) -> tts.TTS:
+    """The current session's TTS for a voice, leased from the pool (see client_pool).
+
+    Each Murf client keeps its websocket connection pool, so a voice reused by
+    a later session in this process starts warm.
+    """
+    return client_pool.get(("tts", voice, style, text_pacing), lambda: _FACTORY(voice, style, text_pacing))
+
+
+def background_tts(voice: str, style: str = "Conversation", text_pacing: bool = True) -> tts.TTS:
+    """A TTS outside any session's lease, for renders that may outlive the session."""
+    return client_pool.shared(("tts", voice, style, text_pacing), lambda: _FACTORY(voice, style, text_pacing))
+
+
+def warm_tts(voice: str, style: str = "Conversation", text_pacing: bool = True) -> None:
+    client_pool.warm(("tts", voice, style, text_pacing), lambda: _FACTORY(voice, style, text_pacing))
+
+
+def pool_size() -> int:
+    return sum(client_pool.created("tts").values())
+
+
+def pooled_voices() -> list:
+    return [f"{voice}/{style}" for _, voice, style, _ in client_pool.created("tts")]
+
+
+async def say_cached(session, text: str, voice: str, style: str = "Conversation"):
+    """Speak fixed text, replaying cached audio when this voice has said it before.
+
+    On a miss the text is streamed through the live TTS as usual and the cache is
+    filled in the background, so the first speaker never waits for a full render.
+    """
+    cache = get_audio_cache()
+    audio = await cache.fetch(voice, style, text)
+    if audio is not None:
+        return session.say(text, audio=audio.stream())
+    task = asyncio.create_task(cache.render(background_tts(voice, style), voice, style, text))
+    _RENDERS.add(task)
+    task.add_done_callback(_render_done)
+    return session.say(text)
+
+
+def _render_done(task: asyncio.Task) -> None:
+    _RENDERS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Failed to cache audio: {task.exception()}")
@@ -0,0 +1,269 @@
+"""Per-turn trace spans, exported to rotating JSONL files and rendered as waterfalls.
+
+A turn is one user utterance and the agent's reply, identified by the speech
+id LiveKit puts on its metrics. Spans are rebuilt from the session's metrics
+and tool events, so they cost nothing on the audio path:
+
+    vad_endpointing  end of user speech to the end-of-turn decision
+    stt_final        end of user speech to the final transcript
+    on_user_turn_completed  the agent's own turn-completed hook
+    llm_first_token / llm   request to first token / to the end of the stream
+    tool:<name>      a function tool call
+    tts_first_byte / tts    synthesis request to first audio / to the end
+
+Spans are queued and written by a background thread to
+TURN_TRACES_DIR/turns-<pid>.jsonl when TURN_TRACING=1 (off by default).
+
+    python src/turn_tracing.py --slowest 10
+"""
+import argparse
+import functools
+import glob
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import env_flags
+
+logger = logging.getLogger("turn-tracing")
+
+TRACES_DIR = Path(os.getenv("TURN_TRACES_DIR", Path(__file__).parent.parent / "turn-traces"))
+
+
+def enabled() -> bool:
+    return env_flags.flag("TURN_TRACING")
+
+
+class SpanExporter:
+    """Writes span dicts as JSON lines from a daemon thread, rotating by size.
+
+    export() only puts on a queue, so no file I/O runs on the event loop.
+    Each process writes its own file; old files beyond max_files are pruned.
+    """
+
+    def __init__(
+        self,
+        directory: Path = TRACES_DIR,
+        max_bytes: int = 20 * 1024 * 1024,
+        backups: int = 3,
+        max_files: int = 200,
+        batch_size: int = 256,
+        interval: float = 2.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.path = self.directory / f"turns-{os.getpid()}.jsonl"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_files = max_files
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="turn-tracing", daemon=True)
+        self._thread.start()
+
+    def export(self, span: dict) -> None:
+        self._queue.put(span)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything exported so far is on disk."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        self._prune()
+        while True:
+            batch, markers = [], []
+            try:
+                item = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            while True:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except (OSError, TypeError, ValueError) as e:
+                    logger.warning(f"Dropped {len(batch)} trace spans: {e}")
+            for marker in markers:
+                marker.set()
+
+    def _write(self, batch: List[dict]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(span, separators=(",", ":")) + "\n" for span in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            size = f.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def _prune(self) -> None:
+        files = sorted(trace_files(self.directory), key=lambda p: p.stat().st_mtime)
+        for path in files[: max(len(files) - self.max_files, 0)]:
+            path.unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=None)
+def get_exporter() -> SpanExporter:
+    return SpanExporter()
+
+
+class TurnTracer:
+    """Builds spans for one session's turns from MetricsCollectedEvent and tool events."""
+
+    def __init__(self, room: str, agent: str, exporter: Optional[SpanExporter] = None) -> None:
+        self.room = room
+        self.agent = agent
+        self.exporter = exporter
+        # Tool events carry no speech id; they belong to the turn the LLM is answering
+        self.current_turn: Optional[str] = None
+
+    def _span(self, turn: Optional[str], name: str, start: float, end: float, **attrs) -> None:
+        if self.exporter is None:
+            return
+        span = {
+            "room": self.room,
+            "agent": self.agent,
+            "turn": turn or self.current_turn or "unknown",
+            "span": name,
+            "start": round(start, 4),
+            "end": round(end, 4),
+        }
+        if attrs:
+            span["attrs"] = attrs
+        self.exporter.export(span)
+
+    def on_metrics(self, m) -> None:
+        kind = getattr(m, "type", None)
+        turn = getattr(m, "speech_id", None)
+        if kind == "eou_metrics":
+            self.current_turn = turn or self.current_turn
+            decided = m.timestamp - m.on_user_turn_completed_delay
+            speech_end = decided - m.end_of_utterance_delay
+            self._span(turn, "vad_endpointing", speech_end, decided)
+            self._span(turn, "stt_final", speech_end, speech_end + m.transcription_delay)
+            if m.on_user_turn_completed_delay > 0:
+                self._span(turn, "on_user_turn_completed", decided, m.timestamp)
+        elif kind == "llm_metrics":
+            self.current_turn = turn or self.current_turn
+            start = m.timestamp - m.duration
+            model = m.metadata.model_name if m.metadata else m.label
+            if m.ttft >= 0:
+                self._span(turn, "llm_first_token", start, start + m.ttft, model=model)
+            self._span(
+                turn, "llm", start, m.timestamp, model=model,
+                tokens=m.completion_tokens, cancelled=m.cancelled,
+            )
+        elif kind == "tts_metrics":
+            start = m.timestamp - m.duration
+            model = m.metadata.model_name if m.metadata else m.label
+            if m.ttfb >= 0:
+                self._span(turn, "tts_first_byte", start, start + m.ttfb, model=model)
+            self._span(
+                turn, "tts", start, m.timestamp, model=model,
+                characters=m.characters_count, cancelled=m.cancelled,
+            )
+
+    def on_tools_executed(self, ev) -> None:
+        outputs = {out.call_id: out for out in ev.function_call_outputs if out is not None}
+        for call in ev.function_calls:
+            out = outputs.get(call.call_id)
+            end = out.created_at if out is not None else ev.created_at
+            self._span(
+                None, f"tool:{call.name}", call.created_at, end,
+                error=bool(out is not None and out.is_error),
+            )
+
+
+# --- Reading traces back ---------------------------------------------------------
+
+
+def trace_files(directory: Path) -> List[Path]:
+    return [Path(p) for p in glob.glob(str(Path(directory) / "turns-*.jsonl*"))]
+
+
+def load_turns(paths: Iterable[Path]) -> Dict[Tuple[str, str], List[dict]]:
+    turns: Dict[Tuple[str, str], List[dict]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                turns.setdefault((span["room"], span["turn"]), []).append(span)
+    return turns
+
+
+def turn_latency(spans: List[dict]) -> float:
+    """End of user speech to the first audio byte, or the turn's full extent without both."""
+    speech_end = min((s["start"] for s in spans if s["span"] == "vad_endpointing"), default=None)
+    first_audio = min((s["end"] for s in spans if s["span"] == "tts_first_byte"), default=None)
+    if speech_end is not None and first_audio is not None:
+        return first_audio - speech_end
+    return max(s["end"] for s in spans) - min(s["start"] for s in spans)
+
+
+def slowest_turns(turns: Dict[Tuple[str, str], List[dict]], n: int) -> List[Tuple[Tuple[str, str], List[dict]]]:
+    return sorted(turns.items(), key=lambda item: -turn_latency(item[1]))[:n]
+
+
+def render_waterfall(room: str, turn: str, spans: List[dict], width: int = 50) -> str:
+    spans = sorted(spans, key=lambda s: (s["start"], s["end"]))
+    origin = spans[0]["start"]
+    total = max(max(s["end"] for s in spans) - origin, 1e-6)
+    lines = [f"{room} turn {turn} ({spans[0].get('agent', '?')}): {turn_latency(spans) * 1000:.0f} ms to first audio"]
+    for s in spans:
+        left = int((s["start"] - origin) / total * width)
+        length = max(int((s["end"] - s["start"]) / total * width), 1)
+        bar = " " * left + "#" * min(length, width - left)
+        start_ms = (s["start"] - origin) * 1000
+        duration_ms = (s["end"] - s["start"]) * 1000
+        lines.append(f"  {s['span'][:24]:<24}|{bar:<{width}}| {start_ms:7.0f} +{duration_ms:6.0f} ms")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render the slowest turns as waterfalls")
+    parser.add_argument("--slowest", type=int, default=10)
+    parser.add_argument("--dir", type=Path, default=TRACES_DIR)
+    parser.add_argument("--room", help="only turns from this room")
+    parser.add_argument("--width", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    turns = load_turns(trace_files(args.dir))
+    if args.room:
+        turns = {key: spans for key, spans in turns.items() if key[0] == args.room}
+    if not turns:
+        print(f"No turn traces in {args.dir}")
+        return 1
+    print(f"{len(turns)} turns, slowest {min(args.slowest, len(turns))}:\n")
+    for (room, turn), spans in slowest_turns(turns, args.slowest):
+        print(render_waterfall(room, turn, spans, args.width))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
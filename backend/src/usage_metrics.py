@@ -0,0 +1,263 @@
+"""Per-session LLM, TTS and STT usage, flushed periodically to a local SQLite time series.
+
+Each metrics event only adds to in-memory counters keyed by kind and model.
+Every USAGE_FLUSH_INTERVAL seconds (30 by default) and at shutdown, the
+session's counters since the last flush are written as one batch of rows
+tagged with the room and agent, each with its cost in USD from RATES. A crashed job therefore loses at most one
+interval. Counters are taken on the event loop and the rows written on a
+worker thread; a failed write puts them back for the next flush. Rows go to
+USAGE_DB_PATH (backend/usage.db by default). Set USAGE_TRACKING=1 to turn
+this on.
+
+    python src/usage_metrics.py                     # totals by agent and model
+    python src/usage_metrics.py --by hour,agent --since 24
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import env_flags
+
+logger = logging.getLogger("usage-metrics")
+
+DB_PATH = Path(os.getenv("USAGE_DB_PATH", Path(__file__).parent.parent / "usage.db"))
+
+# Counter order in the pending lists and in the table
+COUNTERS = ("requests", "input_tokens", "cached_tokens", "output_tokens", "characters", "audio_seconds")
+GROUPS = {
+    "agent": "agent",
+    "model": "kind || ':' || model",
+    "room": "room",
+    "hour": "strftime('%Y-%m-%d %H:00', at, 'unixepoch')",
+    "day": "strftime('%Y-%m-%d', at, 'unixepoch')",
+}
+
+Key = Tuple[str, str, str]  # (kind, model, provider)
+
+# USD per unit at list prices when written; edit to match your plan. Cached
+# input tokens are charged at their own rate instead of the input rate, and
+# models not listed cost 0.
+RATES: Dict[Tuple[str, str], Dict[str, float]] = {
+    ("llm", "gemini-2.5-flash"): {"input_tokens": 0.30e-6, "cached_tokens": 0.03e-6, "output_tokens": 2.50e-6},
+    ("llm", "gemini-2.5-flash-lite"): {"input_tokens": 0.10e-6, "cached_tokens": 0.01e-6, "output_tokens": 0.40e-6},
+    ("tts", "FALCON"): {"audio_seconds": 0.01 / 60},
+    ("stt", "ink-whisper"): {"audio_seconds": 0.13 / 3600},
+}
+
+
+def cost(kind: str, model: str, counters: Sequence[float]) -> float:
+    """USD for one row's counters, in COUNTERS order."""
+    rates = RATES.get((kind, model))
+    if not rates:
+        return 0.0
+    amounts = dict(zip(COUNTERS, counters))
+    amounts["input_tokens"] -= amounts["cached_tokens"]
+    return sum(amounts[name] * rate for name, rate in rates.items())
+
+
+def enabled() -> bool:
+    return env_flags.flag("USAGE_TRACKING")
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Every job process writes to the same file
+    conn = sqlite3.connect(path, timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS usage (
+            at REAL NOT NULL,
+            room TEXT NOT NULL,
+            agent TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            model TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            requests INTEGER NOT NULL,
+            input_tokens INTEGER NOT NULL,
+            cached_tokens INTEGER NOT NULL,
+            output_tokens INTEGER NOT NULL,
+            characters INTEGER NOT NULL,
+            audio_seconds REAL NOT NULL,
+            cost REAL NOT NULL DEFAULT 0
+        )
+        """
+    )
+    # Files written before costs were recorded
+    if "cost" not in {row[1] for row in conn.execute("PRAGMA table_info(usage)")}:
+        conn.execute("ALTER TABLE usage ADD COLUMN cost REAL NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS usage_at ON usage (at)")
+    return conn
+
+
+def _model(m) -> Tuple[str, str]:
+    metadata = getattr(m, "metadata", None)
+    model = getattr(metadata, "model_name", None) or getattr(m, "label", None) or "unknown"
+    provider = getattr(metadata, "model_provider", None) or ""
+    return model, provider
+
+
+class UsageRecorder:
+    """Accumulates one session's usage and writes it in batches."""
+
+    def __init__(self, room: str, agent: str, path: Optional[Path] = None) -> None:
+        self.room = room
+        self.agent = agent
+        self.path = Path(path or DB_PATH)
+        self._pending: Dict[Key, List[float]] = {}
+        self.rows_written = 0
+
+    def _counters(self, kind: str, m) -> List[float]:
+        key = (kind, *_model(m))
+        counters = self._pending.get(key)
+        if counters is None:
+            counters = self._pending[key] = [0] * len(COUNTERS)
+        counters[0] += 1
+        return counters
+
+    def observe(self, m) -> None:
+        """Add the usage carried by one AgentMetrics from a MetricsCollectedEvent."""
+        kind = getattr(m, "type", None)
+        if kind == "llm_metrics":
+            c = self._counters("llm", m)
+            c[1] += m.prompt_tokens
+            c[2] += m.prompt_cached_tokens
+            c[3] += m.completion_tokens
+        elif kind == "realtime_model_metrics":
+            c = self._counters("llm", m)
+            c[1] += m.input_tokens
+            c[2] += m.input_token_details.cached_tokens
+            c[3] += m.output_tokens
+        elif kind == "tts_metrics":
+            c = self._counters("tts", m)
+            c[4] += m.characters_count
+            c[5] += m.audio_duration
+        elif kind == "stt_metrics":
+            c = self._counters("stt", m)
+            c[1] += m.input_tokens
+            c[3] += m.output_tokens
+            c[5] += m.audio_duration
+
+    def take(self) -> List[tuple]:
+        """Rows for the usage since the last call, which then starts from zero."""
+        pending, self._pending = self._pending, {}
+        at = time.time()
+        return [
+            (at, self.room, self.agent, *key, *counters, cost(key[0], key[1], counters))
+            for key, counters in pending.items()
+        ]
+
+    def _restore(self, rows: List[tuple]) -> None:
+        """Add rows that could not be written back into the pending counters."""
+        for row in rows:
+            counters = self._pending.setdefault(tuple(row[3:6]), [0] * len(COUNTERS))
+            for i, value in enumerate(row[6 : 6 + len(COUNTERS)]):
+                counters[i] += value
+
+    def _write(self, rows: List[tuple]) -> None:
+        # Only touches the database, so it can run on a worker thread
+        conn = _connect(self.path)
+        try:
+            with conn:
+                conn.executemany(f"INSERT INTO usage VALUES ({', '.join('?' * 13)})", rows)
+        finally:
+            conn.close()
+
+    def flush(self) -> int:
+        """Write pending usage in one transaction; on failure it stays pending.
+
+        Writes on the calling thread; on the event loop use store().
+        """
+        rows = self.take()
+        if not rows:
+            return 0
+        try:
+            self._write(rows)
+        except Exception:
+            self._restore(rows)
+            raise
+        self.rows_written += len(rows)
+        return len(rows)
+
+    async def store(self) -> int:
+        """flush() with the rows written on a worker thread; call it on the session's loop."""
+        rows = self.take()
+        if not rows:
+            return 0
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception:
+            self._restore(rows)
+            raise
+        self.rows_written += len(rows)
+        return len(rows)
+
+    async def flush_periodically(self, interval: Optional[float] = None) -> None:
+        if interval is None:
+            interval = float(os.getenv("USAGE_FLUSH_INTERVAL", "30"))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.store()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Could not write usage to {self.path}: {e}")
+
+
+def rollup(by: Sequence[str], since: Optional[float] = None, path: Optional[Path] = None) -> List[tuple]:
+    """Usage summed per group, e.g. by=("agent", "model"); since is a unix time."""
+    columns = [GROUPS[name] for name in by]
+    sums = ", ".join(f"SUM({c})" for c in (*COUNTERS, "cost"))
+    where, params = ("WHERE at >= ?", (since,)) if since is not None else ("", ())
+    group = f"GROUP BY {', '.join(columns)} ORDER BY {', '.join(columns)}" if columns else ""
+    select = ", ".join(columns + [sums])
+    conn = _connect(Path(path or DB_PATH))
+    try:
+        return conn.execute(f"SELECT {select} FROM usage {where} {group}", params).fetchall()
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Roll up recorded LLM, TTS and STT usage")
+    parser.add_argument("--by", default="agent,model", help=f"comma-separated from: {', '.join(GROUPS)}")
+    parser.add_argument("--since", type=float, help="only the last N hours")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    by = [name for name in args.by.split(",") if name]
+    unknown = [name for name in by if name not in GROUPS]
+    if unknown:
+        parser.error(f"unknown grouping: {', '.join(unknown)}")
+    if not args.db.exists():
+        print(f"No usage recorded in {args.db}")
+        return 1
+    since = time.time() - args.since * 3600 if args.since is not None else None
+    rows = rollup(by, since, args.db)
+    if not rows or rows[0][len(by)] is None:
+        print("No usage in that period")
+        return 1
+
+    widths = [max(len(name), *(len(str(r[i])) for r in rows)) + 2 for i, name in enumerate(by)]
+    header = "".join(f"{name:<{w}}" for name, w in zip(by, widths))
+    print(
+        f"{header}{'requests':>10}{'input tok':>12}{'cached tok':>12}{'output tok':>12}"
+        f"{'tts chars':>11}{'audio s':>10}{'cost $':>10}"
+    )
+    for row in rows:
+        groups = "".join(f"{str(v):<{w}}" for v, w in zip(row, widths))
+        requests, input_tokens, cached, output, characters, audio, spent = row[len(by):]
+        print(
+            f"{groups}{requests:>10}{input_tokens:>12}{cached:>12}{output:>12}"
+            f"{characters:>11}{audio:>10.1f}{spent:>10.4f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Single worker for every agent, routed per job by dispatch or room metadata.
+
+    python src/worker.py dev
+
+A job picks its agent from, in order: the dispatch metadata, the room
+metadata, then the room name prefix. Metadata may be a bare agent name
+("sdr") or JSON with an "agent" key ({"agent": "game_master"}).
+"""
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from livekit.agents import JobContext, JobProcess, JobRequest
+
+sys.path.insert(0, str(Path(__file__).parent))
+import session_factory
+from idle_pool import AdaptiveIdleProcesses
+from session_factory import AgentSpec
+import agent as tutor
+import agent_food_ordering
+import agent_game_master
+import agent_sdr
+
+logger = logging.getLogger("worker")
+
+load_dotenv(".env.local")
+
+DEFAULT_AGENT = "tutor"
+
+AGENTS: Dict[str, AgentSpec] = {
+    "tutor": tutor.AGENT_SPEC,
+    "food": agent_food_ordering.AGENT_SPEC,
+    "game_master": agent_game_master.AGENT_SPEC,
+    "sdr": agent_sdr.AGENT_SPEC,
+}
+
+ALIASES = {
+    "coordinator": "tutor",
+    "food_ordering": "food",
+    "grocery": "food",
+    "gm": "game_master",
+    "game": "game_master",
+}
+
+
+def _normalize(name: str) -> Optional[str]:
+    name = name.strip().lower().replace("-", "_")
+    name = ALIASES.get(name, name)
+    return name if name in AGENTS else None
+
+
+def agent_from_metadata(metadata: str) -> Optional[str]:
+    """Agent name from metadata that is either a bare name or JSON with an "agent" key."""
+    if not metadata or not metadata.strip():
+        return None
+    try:
+        data = json.loads(metadata)
+    except json.JSONDecodeError:
+        return _normalize(metadata)
+    if isinstance(data, dict) and isinstance(data.get("agent"), str):
+        return _normalize(data["agent"])
+    if isinstance(data, str):
+        return _normalize(data)
+    return None
+
+
+def agent_from_room_name(room_name: str) -> Optional[str]:
+    """Agent name from a room name prefix such as "sdr-1234" or "game-master_abc"."""
+    normalized = room_name.lower().replace("-", "_")
+    for name in sorted([*AGENTS, *ALIASES], key=len, reverse=True):
+        if normalized.startswith(name + "_") or normalized == name:
+            return _normalize(name)
+    return None
+
+
+def route(job_metadata: str = "", room_metadata: str = "", room_name: str = "") -> str:
+    return (
+        agent_from_metadata(job_metadata)
+        or agent_from_metadata(room_metadata)
+        or agent_from_room_name(room_name)
+        or DEFAULT_AGENT
+    )
+
+
+# Warm processes kept idle, sized from the job arrival rate seen by this worker
+IDLE_PROCESSES = AdaptiveIdleProcesses()
+
+
+async def request_fnc(req: JobRequest):
+    # Runs in the worker's main process for every dispatched job
+    IDLE_PROCESSES.record_arrival()
+    await req.accept()
+
+
+def prewarm(proc: JobProcess):
+    # One warm process can serve any agent, so warm every agent's clients and data
+    session_factory.prewarm(proc, AGENTS.values())
+
+
+async def entrypoint(ctx: JobContext):
+    name = route(ctx.job.metadata, ctx.job.room.metadata, ctx.job.room.name)
+    logger.info(f"Routing room {ctx.job.room.name} to {name}")
+    await session_factory.run_session(ctx, AGENTS[name])
+
+
+if __name__ == "__main__":
+    session_factory.run_app(
+        entrypoint,
+        prewarm,
+        request_fnc=request_fnc,
+        num_idle_processes=IDLE_PROCESSES,
+    )
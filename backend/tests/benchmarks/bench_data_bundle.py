@@ -0,0 +1,111 @@
+"""Compare parsed JSON with memory-mapped bundles across forked job processes.
+
+Writes the synthetic 100k-item catalog to a temporary directory, compiles it,
+then forks --processes children that each load the catalog, as prewarm does in
+every job process, by parsing the JSON or by mapping the bundle, and run
+search_catalog. Reports how much each child's anonymous memory grew (Linux
+/proc smaps_rollup), its load time and the search time. Mapped bundle pages are
+file-backed page cache shared by every process, so they are not counted:
+
+    python tests/benchmarks/bench_data_bundle.py --processes 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+import data_bundle
+from agent_food_ordering import FoodOrderingAgent
+
+sys.path.insert(0, str(Path(__file__).parent))
+import synthetic_data
+
+
+def memory_kb() -> int:
+    """Anonymous resident memory of this process in KiB: its heap, including copied-on-write pages."""
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Anonymous:"):
+                return int(line.split()[1])
+    return 0
+
+
+def search_seconds(agent, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        asyncio.run(agent.search_catalog(None, query="milk"))
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def load(mode: str, source: Path):
+    if mode == "json":
+        with open(source) as f:
+            return json.load(f)
+    return data_bundle.Bundle(data_bundle.bundle_path(source)).root
+
+
+def run(mode: str, source: Path, processes: int, repeat: int) -> dict:
+    children = []
+    for _ in range(processes):
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            before = memory_kb()
+            started = time.perf_counter()
+            agent = FoodOrderingAgent()
+            agent.catalog = load(mode, source)
+            loaded = time.perf_counter() - started
+            seconds = search_seconds(agent, repeat)
+            after = memory_kb()
+            with os.fdopen(write, "w") as f:
+                json.dump({"load": loaded, "seconds": seconds, "heap": after - before}, f)
+            os._exit(0)
+        os.close(write)
+        children.append((pid, read))
+    results = []
+    for pid, read in children:
+        with os.fdopen(read) as f:
+            results.append(json.load(f))
+        os.waitpid(pid, 0)
+    return {
+        "mode": mode,
+        "heap_mb": statistics.mean(r["heap"] for r in results) / 1024,
+        "load_ms": statistics.median(r["load"] for r in results) * 1000,
+        "search_ms": statistics.median(r["seconds"] for r in results) * 1000,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Parsed JSON vs memory-mapped bundles across forked processes")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench-bundle-") as workdir:
+        source = Path(workdir) / "food_catalog.json"
+        source.write_text(json.dumps(synthetic_data.food_catalog(args.items)))
+        size, built = data_bundle.build(source, data_bundle.bundle_path(source))
+        print(f"source {size / 1e6:.1f} MB, bundle {built / 1e6:.1f} MB, {args.processes} processes")
+
+        rows = [run(mode, source, args.processes, args.repeat) for mode in ("json", "bundle")]
+
+    print(f"{'mode':<8}{'+heap/process':>14}{'load':>12}{'search':>12}")
+    for row in rows:
+        print(
+            f"{row['mode']:<8}{row['heap_mb']:>11.1f} MB{row['load_ms']:>9.1f} ms{row['search_ms']:>9.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Simulate job arrival bursts against fixed and adaptive idle-process pools.
+
+The pool model mirrors the worker: each job takes one warm process if one is
+idle, otherwise it waits for a process to be spawned and prewarmed. Used
+processes are replaced up to the current idle target, which is re-read every
+load update just like num_idle_processes. The adaptive policy uses the floor,
+ceiling and headroom of worker.IDLE_PROCESSES unless overridden.
+
+    python tests/benchmarks/bench_idle_pool.py
+    python tests/benchmarks/bench_idle_pool.py --job-timings job-timings.jsonl --burst-rate 1.5
+    python tests/benchmarks/bench_idle_pool.py --min-idle 2 --max-idle 6 --sizes 2,4,6
+
+With --job-timings, the warm start and prewarm durations come from real jobs
+exported by the session factory instead of the defaults.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from idle_pool import ArrivalRateEstimator, idle_target
+from worker import IDLE_PROCESSES
+
+# Matches the worker's load update interval
+UPDATE_INTERVAL = 0.5
+STEP = 0.05
+
+
+def arrivals(duration: float, base_rate: float, burst_rate: float, burst_every: float, burst_length: float, seed: int) -> List[float]:
+    """Poisson arrivals at base_rate, with periodic bursts at burst_rate (jobs per second)."""
+    rng = random.Random(seed)
+    times = []
+    now = 0.0
+    while now < duration:
+        in_burst = (now % burst_every) < burst_length and now >= burst_every / 2
+        rate = burst_rate if in_burst else base_rate
+        now += rng.expovariate(rate)
+        times.append(now)
+    return [t for t in times if t < duration]
+
+
+def fixed(size: int) -> Callable[[float, ArrivalRateEstimator], int]:
+    return lambda now, estimator: size
+
+
+def simulate(jobs: List[float], duration: float, policy, warm_start: float, prewarm: float) -> Dict[str, float]:
+    """Run one policy; policy(now, estimator) returns the idle target."""
+    estimator = ArrivalRateEstimator(clock=lambda: 0.0)
+    idle = policy(0.0, estimator)
+    spawning: List[float] = []  # ready times of processes being prewarmed
+    waiting: List[float] = []  # arrival times of jobs with no process yet
+    latencies = []
+    cold = 0
+    idle_seconds = 0.0
+    target = idle
+    next_update = 0.0
+    job_index = 0
+
+    now = 0.0
+    while now < duration:
+        if now >= next_update:
+            target = policy(now, estimator)
+            next_update += UPDATE_INTERVAL
+
+        ready = [t for t in spawning if t <= now]
+        spawning = [t for t in spawning if t > now]
+        idle += len(ready)
+
+        while job_index < len(jobs) and jobs[job_index] <= now:
+            estimator.record(jobs[job_index])
+            waiting.append(jobs[job_index])
+            job_index += 1
+
+        while waiting and idle > 0:
+            arrived = waiting.pop(0)
+            idle -= 1
+            waited = now - arrived
+            latencies.append(waited + warm_start)
+            # Anything beyond one simulation step means the job waited for a spawn
+            if waited > 2 * STEP:
+                cold += 1
+
+        # Spawn for waiting jobs immediately, and refill towards the idle target
+        wanted = max(target, len(waiting))
+        for _ in range(wanted - idle - len(spawning)):
+            spawning.append(now + prewarm)
+
+        idle_seconds += idle * STEP
+        now += STEP
+
+    latencies.sort()
+    return {
+        "jobs": len(latencies),
+        "cold_start_pct": 100.0 * cold / max(len(latencies), 1),
+        "p50_start_s": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p95_start_s": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        "mean_idle": idle_seconds / duration,
+    }
+
+
+def load_job_timings(path: Path) -> Optional[Dict[str, float]]:
+    """Median warm start and prewarm durations (seconds) from exported job timings."""
+    startups, prewarms = [], []
+    with open(path, "r") as f:
+        for line in f:
+            record = json.loads(line)
+            startups.append(record["startup_ms"] / 1000)
+            if record.get("prewarm_ms"):
+                prewarms.append(sum(record["prewarm_ms"].values()) / 1000)
+    if not startups:
+        return None
+    result = {"warm_start": statistics.median(startups)}
+    if prewarms:
+        result["prewarm"] = statistics.median(prewarms)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate idle-process pool sizing under bursts")
+    parser.add_argument("--duration", type=float, default=1800.0)
+    parser.add_argument("--base-rate", type=float, default=0.05, help="jobs per second between bursts")
+    parser.add_argument("--burst-rate", type=float, default=1.0, help="jobs per second during bursts")
+    parser.add_argument("--burst-every", type=float, default=300.0)
+    parser.add_argument("--burst-length", type=float, default=20.0)
+    parser.add_argument("--warm-start", type=float, default=0.4, help="seconds to start a job on a warm process")
+    parser.add_argument("--prewarm", type=float, default=4.0, help="seconds to spawn and prewarm a process")
+    parser.add_argument("--min-idle", type=int, default=IDLE_PROCESSES.min_idle, help="adaptive floor")
+    parser.add_argument("--max-idle", type=int, default=IDLE_PROCESSES.max_idle, help="adaptive ceiling")
+    parser.add_argument("--headroom", type=float, default=IDLE_PROCESSES.headroom)
+    parser.add_argument("--sizes", default="1,2,4", help="comma-separated fixed pool sizes to compare")
+    parser.add_argument("--job-timings", type=Path)
+    parser.add_argument("--seed", type=int, default=39)
+    args = parser.parse_args(argv)
+
+    warm_start, prewarm = args.warm_start, args.prewarm
+    if args.job_timings:
+        measured = load_job_timings(args.job_timings) or {}
+        warm_start = measured.get("warm_start", warm_start)
+        prewarm = measured.get("prewarm", prewarm)
+
+    jobs = arrivals(args.duration, args.base_rate, args.burst_rate, args.burst_every, args.burst_length, args.seed)
+
+    def adaptive(now, estimator):
+        return idle_target(estimator.rate(now), prewarm, args.headroom, args.min_idle, args.max_idle)
+
+    sizes = sorted({int(n) for n in args.sizes.split(",") if n} | {args.max_idle})
+    policies = {f"fixed {n}": fixed(n) for n in sizes}
+    policies["adaptive"] = adaptive
+
+    print(f"{len(jobs)} jobs over {args.duration:.0f}s, warm start {warm_start:.2f}s, prewarm {prewarm:.2f}s")
+    print(f"{'policy':<12}{'cold %':>8}{'p50 s':>8}{'p95 s':>8}{'mean idle':>11}")
+    for name, policy in policies.items():
+        r = simulate(jobs, args.duration, policy, warm_start, prewarm)
+        print(
+            f"{name:<12}{r['cold_start_pct']:>8.1f}{r['p50_start_s']:>8.2f}"
+            f"{r['p95_start_s']:>8.2f}{r['mean_idle']:>11.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Compare first-chunk latency of TTS text segmenters on recorded LLM token streams.
+
+Each stream is a list of [delay_ms, text] pairs as they arrived from the LLM.
+Streams are replayed on a simulated clock, so results are deterministic and
+the run takes milliseconds:
+
+    python tests/benchmarks/bench_segmenter.py
+    python tests/benchmarks/bench_segmenter.py --streams my_recordings.json --json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from livekit.agents import tokenize
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from segmenter import FirstChunkSegmenter
+
+DEFAULT_STREAMS = Path(__file__).parent / "data" / "llm_token_streams.json"
+
+SEGMENTERS = {
+    "basic": lambda: tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+    "first-chunk": FirstChunkSegmenter,
+}
+
+
+async def replay(tokenizer, tokens: List[list]) -> Dict[str, float]:
+    """Push a recorded stream through a tokenizer and time each emitted chunk."""
+    stream = tokenizer.stream()
+    now = 0.0
+    chunks = []
+
+    async def drain() -> None:
+        # Let the consumer pick up everything emitted by the last push
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    async def consume() -> None:
+        async for data in stream:
+            chunks.append((now, data.token))
+
+    consumer = asyncio.create_task(consume())
+    for delay, text in tokens:
+        now += delay
+        stream.push_text(text)
+        await drain()
+    stream.end_input()
+    await consumer
+
+    first_token_at = tokens[0][0]
+    first_at, first_text = chunks[0]
+    return {
+        "first_chunk_ms": first_at,
+        "after_first_token_ms": first_at - first_token_at,
+        "first_chunk_words": len(first_text.split()),
+        "chunks": len(chunks),
+        "mean_chunk_words": statistics.mean(len(text.split()) for _, text in chunks),
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run(streams: List[dict]) -> Dict[str, dict]:
+    results = {}
+    for name, factory in SEGMENTERS.items():
+        per_stream = {}
+        for recorded in streams:
+            per_stream[recorded["name"]] = await replay(factory(), recorded["tokens"])
+        waits = [r["after_first_token_ms"] for r in per_stream.values()]
+        results[name] = {
+            "streams": per_stream,
+            "p50_after_first_token_ms": percentile(waits, 50),
+            "p95_after_first_token_ms": percentile(waits, 95),
+        }
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark TTS text segmenters")
+    parser.add_argument("--streams", type=Path, default=DEFAULT_STREAMS)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.streams, "r") as f:
+        streams = json.load(f)["streams"]
+    results = asyncio.run(run(streams))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'stream':<22}" + "".join(f"{name:>26}" for name in SEGMENTERS))
+    for recorded in streams:
+        row = f"{recorded['name']:<22}"
+        for name in SEGMENTERS:
+            r = results[name]["streams"][recorded["name"]]
+            cell = f"{r['after_first_token_ms']:.0f} ms / {r['first_chunk_words']} words"
+            row += f"{cell:>26}"
+        print(row)
+    for stat in ("p50", "p95"):
+        row = f"{stat + ' wait':<22}"
+        for name in SEGMENTERS:
+            row += f"{results[name][f'{stat}_after_first_token_ms']:>23.0f} ms"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
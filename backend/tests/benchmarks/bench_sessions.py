@@ -0,0 +1,261 @@
+"""Load test: run many concurrent agent sessions against offline providers.
+
+Every session uses the real agent, its shared data and its function tools,
+with a fake STT, a scripted LLM and a silent TTS standing in for the
+providers (see offline_providers.py). Each scripted user turn is pushed into
+the session's audio input as one utterance; the session's STT transcribes it
+and ends the turn, then the LLM calls the turn's tools and speaks the reply. No
+network or API keys are needed:
+
+    python tests/benchmarks/bench_sessions.py --sessions 50
+    python tests/benchmarks/bench_sessions.py --agents food,sdr --sessions 200 --llm-ttft 600 --json
+
+Reports sessions/sec, CPU use, peak RSS and turn latency percentiles, measured
+from the end of user speech to the first audio frame and to the end of the reply,
+so they include STT and endpointing delays.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Keep the silent greetings out of the real audio cache; read when audio_cache is imported
+CACHE_DIR = tempfile.mkdtemp(prefix="bench-audio-cache-")
+os.environ["AUDIO_CACHE_DIR"] = CACHE_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from livekit import rtc  # noqa: E402
+from livekit.agents import AgentSession  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+import client_pool  # noqa: E402
+import tts_pool  # noqa: E402
+from session_factory import AgentSpec  # noqa: E402
+from session_recording import SessionRecorder  # noqa: E402
+from worker import AGENTS  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).parent))
+from offline_providers import (  # noqa: E402
+    FakeSTT,
+    Latencies,
+    NullAudioOutput,
+    QueuedAudioInput,
+    ScriptedLLM,
+    ScriptedTurn,
+    SilentTTS,
+    offline_tts_factory,
+    script_responder,
+    turns_from_script,
+)
+
+DEFAULT_SCRIPTS = Path(__file__).parent / "data" / "session_scripts.json"
+# A turn whose reply has not been spoken by then counts as a failed session
+TURN_TIMEOUT = 30.0
+
+# What the microphone sends for each turn; the fake STT ignores the audio
+UTTERANCE = rtc.AudioFrame(b"\x00\x00" * 1600, sample_rate=16000, num_channels=1, samples_per_channel=1600)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_session(
+    spec: AgentSpec,
+    turns: List[ScriptedTurn],
+    latencies: Latencies,
+    results: Dict,
+    recorder: Optional[SessionRecorder] = None,
+) -> None:
+    """One scripted conversation; appends per-turn latencies and tool counts to results."""
+    stt = FakeSTT(latencies)
+    model = ScriptedLLM(script_responder(turns), latencies)
+    microphone = QueuedAudioInput()
+    output = NullAudioOutput()
+    replies: "asyncio.Queue[str]" = asyncio.Queue()
+    session = AgentSession(
+        stt=stt,
+        vad=None,
+        llm=model,
+        tts=SilentTTS(latencies),
+        turn_handling={"turn_detection": "stt", "endpointing": {"min_delay": latencies.endpointing}},
+    )
+
+    @session.on("conversation_item_added")
+    def _on_item(ev):
+        if getattr(ev.item, "role", None) == "assistant":
+            replies.put_nowait(ev.item.text_content)
+
+    @session.on("function_tools_executed")
+    def _on_tools(ev):
+        results["tool_calls"] += len(ev.function_call_outputs)
+        results["tool_errors"] += sum(int(out.is_error) for out in ev.function_call_outputs)
+
+    async with session:
+        session.input.audio = microphone
+        session.output.audio = output
+        if recorder is not None:
+            recorder.attach(session)
+        await session.start(spec.build())
+        for turn in turns:
+            if session.current_speech is not None:
+                await session.current_speech.wait_for_playout()
+            while not replies.empty():
+                replies.get_nowait()
+            stt.queue(turn.user)
+            output.first_frame_at = None
+            speech_end = time.perf_counter()
+            microphone.push(UTTERANCE)
+            while await asyncio.wait_for(replies.get(), TURN_TIMEOUT) != turn.reply:
+                pass
+            done = time.perf_counter()
+            if output.first_frame_at is not None:
+                results["first_audio"].append(output.first_frame_at - speech_end)
+            results["turn"].append(done - speech_end)
+
+
+async def run_load(
+    specs: Dict[str, AgentSpec],
+    scripts: Dict[str, List[ScriptedTurn]],
+    sessions: int,
+    concurrency: int,
+    latencies: Latencies,
+    record: Optional[Path] = None,
+) -> Dict:
+    results = {
+        name: {"sessions": 0, "failed": 0, "first_audio": [], "turn": [], "tool_calls": 0, "tool_errors": 0}
+        for name in specs
+    }
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(name: str, index: int) -> None:
+        async with limit:
+            recorder = SessionRecorder(f"bench-{index}", name, record) if record is not None else None
+            # Each simulated session leases its own provider clients, as run_session does in a job
+            lease = client_pool.open_lease()
+            try:
+                await run_session(specs[name], scripts[name], latencies, results[name], recorder)
+                results[name]["sessions"] += 1
+                if recorder is not None:
+                    recorder.save()
+            except Exception as e:
+                results[name]["failed"] += 1
+                logging.getLogger("bench-sessions").warning(f"{name} session failed: {e!r}")
+            finally:
+                lease.release()
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(one(name, i) for i in range(sessions) for name in specs))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    completed = sum(r["sessions"] for r in results.values())
+    return {
+        "wall_s": wall,
+        "sessions": completed,
+        "failed": sum(r["failed"] for r in results.values()),
+        "sessions_per_s": completed / wall,
+        "cpu_pct": 100.0 * cpu / wall,
+        "cpu_ms_per_session": 1000.0 * cpu / max(completed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "agents": {
+            name: {
+                "sessions": r["sessions"],
+                "failed": r["failed"],
+                "turns": len(r["turn"]),
+                "tool_calls": r["tool_calls"],
+                "tool_errors": r["tool_errors"],
+                **{f"first_audio_p{int(q * 100)}_ms": 1000 * percentile(r["first_audio"], q) for q in (0.5, 0.95, 0.99)},
+                **{f"turn_p{int(q * 100)}_ms": 1000 * percentile(r["turn"], q) for q in (0.5, 0.95, 0.99)},
+            }
+            for name, r in results.items()
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run concurrent agent sessions against offline providers")
+    parser.add_argument("--agents", default=",".join(AGENTS), help="comma-separated agent names")
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per agent")
+    parser.add_argument("--concurrency", type=int, default=0, help="sessions in flight at once (default: all)")
+    parser.add_argument("--scripts", type=Path, default=DEFAULT_SCRIPTS)
+    parser.add_argument("--stt", type=float, default=150.0, help="STT latency in ms")
+    parser.add_argument("--endpointing", type=float, default=500.0, help="end-of-turn delay after the transcript in ms")
+    parser.add_argument("--llm-ttft", type=float, default=350.0, help="LLM time to first token in ms")
+    parser.add_argument("--llm-chunk", type=float, default=20.0, help="delay between LLM chunks in ms")
+    parser.add_argument("--tts-ttfb", type=float, default=120.0, help="TTS time to first byte in ms")
+    parser.add_argument("--record", type=Path, help="save each session's recording to this directory")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    names = [name.strip() for name in args.agents.split(",") if name.strip()]
+    with open(args.scripts, "r") as f:
+        scripts = turns_from_script(json.load(f))
+    missing = [name for name in names if name not in AGENTS or name not in scripts]
+    if missing:
+        print(f"No agent or script for: {', '.join(missing)}")
+        return 1
+
+    latencies = Latencies(
+        stt=args.stt / 1000,
+        endpointing=args.endpointing / 1000,
+        llm_ttft=args.llm_ttft / 1000,
+        llm_per_chunk=args.llm_chunk / 1000,
+        tts_ttfb=args.tts_ttfb / 1000,
+    )
+    specs = {name: AGENTS[name] for name in names}
+    for spec in specs.values():
+        if spec.warm is not None:
+            spec.warm()
+    tts_pool.set_factory(offline_tts_factory(latencies))
+
+    total = args.sessions * len(specs)
+    try:
+        report = asyncio.run(run_load(specs, scripts, args.sessions, args.concurrency or total, latencies, args.record))
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(
+        f"{report['sessions']} sessions ({report['failed']} failed) in {report['wall_s']:.1f} s: "
+        f"{report['sessions_per_s']:.1f} sessions/s, CPU {report['cpu_pct']:.0f}% "
+        f"({report['cpu_ms_per_session']:.1f} ms/session), peak RSS {report['peak_rss_mb']:.0f} MB\n"
+    )
+    print(f"{'agent':<12} {'turns':>6} {'tools':>6} {'audio p50':>10} {'p95':>7} {'p99':>7} {'turn p50':>9} {'p95':>7} {'p99':>7}")
+    for name, r in report["agents"].items():
+        print(
+            f"{name:<12} {r['turns']:>6} {r['tool_calls']:>6} "
+            f"{r['first_audio_p50_ms']:>8.0f}ms {r['first_audio_p95_ms']:>5.0f}ms {r['first_audio_p99_ms']:>5.0f}ms "
+            f"{r['turn_p50_ms']:>7.0f}ms {r['turn_p95_ms']:>5.0f}ms {r['turn_p99_ms']:>5.0f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
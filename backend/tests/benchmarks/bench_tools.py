@@ -0,0 +1,212 @@
+"""Time every heavy function tool and db.Database call on synthetic scaled data.
+
+Datasets come from synthetic_data.py at full scale by default: a 100k-item
+catalog, 10k FAQs, 5k concepts and a game world with 5k events. Saves and the
+mastery database go to a temporary directory. Results are compared with the
+committed baseline in data/tool_baselines.json for the same scale. Baselines
+store times relative to timing.reference_seconds(), measured in this process,
+so they hold on any machine:
+
+    python tests/benchmarks/bench_tools.py
+    python tests/benchmarks/bench_tools.py --scale 0.1 --filter catalog
+    python tests/benchmarks/bench_tools.py --update-baseline
+
+Exits non-zero when a benchmark is slower than --fail-above times its baseline
+or has no baseline. --update-baseline records the benchmarks that ran, keeping
+the others.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+import agent as tutor
+import agent_game_master
+import db
+import timing
+from agent_food_ordering import FoodOrderingAgent
+from agent_game_master import GameMasterAgent
+from agent_sdr import SDRAgent
+from retrieval import ConceptRetriever
+
+sys.path.insert(0, str(Path(__file__).parent))
+import synthetic_data
+
+# Agents build their Murf client on construction; nothing here speaks
+os.environ.setdefault("MURF_API_KEY", "offline")
+
+DEFAULT_BASELINE = Path(__file__).parent / "data" / "tool_baselines.json"
+
+Bench = Callable[[], Awaitable]
+
+
+async def call(agent, tool: str, **arguments):
+    """Invoke a function tool the way the session does; tools here ignore the run context."""
+    return await getattr(agent, tool)(None, **arguments)
+
+
+def build(scale: float, workdir: Path) -> List[Tuple[str, Bench]]:
+    """Construct agents over the synthetic datasets; returns (name, bench) pairs."""
+
+    def size(n: int) -> int:
+        return max(int(n * scale), 10)
+
+    food = FoodOrderingAgent()
+    food.catalog = synthetic_data.food_catalog(size(100_000))
+    last_item = food.catalog["categories"]["frozen"][-1]
+
+    sdr = SDRAgent(synthetic_data.company_data(size(10_000)))
+
+    content = synthetic_data.curriculum(size(5_000))
+    tutor.MASTERY_DB_PATH = workdir / "mastery.db"
+    database = db.Database(str(tutor.MASTERY_DB_PATH))
+    with database._get_connection() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO concept_mastery (concept_id, title, avg_score, score_count) VALUES (?, ?, ?, ?)",
+            [(c["id"], c["title"], (i * 37) % 100, 1 + i % 5) for i, c in enumerate(content)],
+        )
+    teach_back = tutor.TeachBackAgent(content, retriever=ConceptRetriever(content))
+    concept = content[len(content) // 2]
+
+    agent_game_master.SAVES_DIR = workdir / "game_saves"
+    game = GameMasterAgent()
+    game.world_state = synthetic_data.world_state(size(5_000), size(500), size(300), size(200))
+
+    return [
+        ("search_catalog hit", lambda: call(food, "search_catalog", query="milk")),
+        ("search_catalog miss", lambda: call(food, "search_catalog", query="caviar")),
+        ("add_to_cart by id", lambda: call(food, "add_to_cart", item_id=last_item["id"])),
+        ("add_to_cart by name", lambda: call(food, "add_to_cart", item_id=last_item["name"].lower())),
+        ("answer_faq", lambda: call(sdr, "answer_faq", query="how do refunds work with international cards")),
+        (
+            "evaluate_explanation",
+            lambda: call(
+                teach_back, "evaluate_explanation",
+                concept=concept["title"], user_explanation=concept["summary"][:200],
+            ),
+        ),
+        ("view_world_state", lambda: call(game, "view_world_state")),
+        ("save_game", lambda: call(game, "save_game", save_name="bench")),
+        ("load_game", lambda: call(game, "load_game", save_name="bench")),
+        ("db.upsert_concept", _sync(lambda: database.upsert_concept(concept["id"], concept["title"]))),
+        ("db.update_teach_back_score", _sync(lambda: database.update_teach_back_score(concept["id"], 80))),
+        ("db.get_weakest_concepts", _sync(lambda: database.get_weakest_concepts(limit=3))),
+        ("db.get_all_stats", _sync(lambda: database.get_all_stats())),
+        ("db.save_review", _sync(lambda: database.save_review("bench", concept["id"], 2.5, 1.0, 1, time.time()))),
+        ("db.get_review_schedule", _sync(lambda: database.get_review_schedule("bench"))),
+    ]
+
+
+def _sync(fn: Callable) -> Bench:
+    async def run():
+        return fn()
+
+    return run
+
+
+async def measure(bench: Bench, repeat: int, min_time: float) -> float:
+    """Median seconds per call over `repeat` batches, each sized to run for about min_time."""
+    await bench()
+    number, elapsed = 1, 0.0
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            await bench()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 10_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(int(min_time / elapsed) + 1, 10))
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            await bench()
+        times.append((time.perf_counter() - started) / number)
+    return statistics.median(times)
+
+
+async def run(benches: List[Tuple[str, Bench]], repeat: int, min_time: float) -> Dict[str, float]:
+    return {name: await measure(bench, repeat, min_time) for name, bench in benches}
+
+
+def load_baselines(path: Path) -> Dict[str, dict]:
+    """Baselines per scale; files from before machine-relative times count as none."""
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text())
+    return data.get("scales", {})
+
+
+def save_baseline(path: Path, scale: float, results: Dict[str, float], reference: float) -> None:
+    baselines = load_baselines(path)
+    entry = baselines.setdefault(str(scale), {"reference_seconds": 0.0, "relative": {}})
+    entry["reference_seconds"] = round(reference, 6)
+    entry["relative"].update({name: round(seconds / reference, 6) for name, seconds in results.items()})
+    path.write_text(json.dumps({"scales": baselines}, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark function tools on synthetic scaled datasets")
+    parser.add_argument("--scale", type=float, default=1.0, help="dataset size relative to the defaults")
+    parser.add_argument("--filter", default="", help="only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed batch")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline", "--save-baseline", action="store_true", help="record these results as the baseline"
+    )
+    parser.add_argument("--fail-above", type=float, default=1.5, help="slowdown ratio that fails the run")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    # The tools log every call at INFO
+    logging.basicConfig(level=logging.WARNING)
+    # Timed before and after the benchmarks; the faster run is the less disturbed one
+    reference = timing.reference_seconds()
+    with tempfile.TemporaryDirectory(prefix="bench-tools-") as workdir:
+        benches = [(name, b) for name, b in build(args.scale, Path(workdir)) if args.filter in name]
+        results = asyncio.run(run(benches, args.repeat, args.min_time))
+    reference = min(reference, timing.reference_seconds())
+
+    if args.update_baseline:
+        save_baseline(args.baseline, args.scale, results, reference)
+    relative = load_baselines(args.baseline).get(str(args.scale), {}).get("relative", {})
+    # This machine's expected time for each benchmark
+    baseline = {name: relative[name] * reference for name in results if name in relative}
+    if args.json:
+        print(
+            json.dumps(
+                {"scale": args.scale, "reference_seconds": reference, "seconds": results, "baseline": baseline},
+                indent=2,
+            )
+        )
+
+    slower = [name for name in results if name in baseline and results[name] / baseline[name] > args.fail_above]
+    missing = [name for name in results if name not in baseline]
+    if not args.json:
+        print(f"reference workload {reference * 1e3:.1f} ms\n")
+        print(f"{'benchmark':<28} {'per call':>12} {'baseline':>12} {'ratio':>7}")
+        for name, seconds in results.items():
+            before = baseline.get(name)
+            base_text = f"{before * 1e6:10.1f}us" if before else f"{'-':>12}"
+            ratio_text = f"{seconds / before:6.2f}x" if before else f"{'-':>7}"
+            print(f"{name:<28} {seconds * 1e6:10.1f}us {base_text} {ratio_text}")
+    if args.update_baseline:
+        print(f"\nBaseline saved to {args.baseline}")
+    if missing:
+        print(f"\nNo baseline at scale {args.scale} for: {', '.join(missing)}; run with --update-baseline to record one")
+    if slower:
+        print(f"\nSlower than {args.fail_above}x baseline: {', '.join(slower)}")
+    return 1 if slower or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""Local stand-ins for the STT, LLM and TTS providers, with configurable latencies.
+
+They let real agents and their function tools run in an AgentSession with no
+network or API keys, for load tests and replayed sessions:
+
+    FakeSTT       streaming STT that ends a user turn with the next queued
+                  transcript, after a recognition delay, when audio arrives
+    ScriptedLLM   answers from a script: tool calls first, then the reply text
+    SilentTTS     synthesizes silence proportional to the text length
+    QueuedAudioInput  a microphone the caller pushes utterances into
+    NullAudioOutput  an audio sink that plays instantly and discards frames
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from livekit import rtc
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    APIConnectOptions,
+    NOT_GIVEN,
+    llm,
+    stt,
+    tts,
+    utils,
+)
+from livekit.agents.voice import io
+
+
+@dataclass
+class Latencies:
+    """Simulated provider latencies in seconds."""
+
+    stt: float = 0.15
+    # The session's end-of-turn delay after the final transcript
+    endpointing: float = 0.5
+    llm_ttft: float = 0.35
+    llm_per_chunk: float = 0.02
+    tts_ttfb: float = 0.12
+
+
+@dataclass
+class ScriptedTurn:
+    user: str
+    reply: str
+    # (tool name, arguments) the LLM calls before replying
+    tools: List[Tuple[str, dict]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScriptedTurn":
+        return cls(
+            user=data["user"],
+            reply=data["reply"],
+            tools=[(call["name"], call.get("arguments", {})) for call in data.get("tools", [])],
+        )
+
+
+class FakeSTT(stt.STT):
+    """STT that returns the next queued transcript after a fixed delay.
+
+    As a session's streaming STT (with turn_detection="stt"), audio arriving
+    while a transcript is queued is one whole utterance: after the delay the
+    stream reports start of speech, the final transcript and end of speech.
+    Audio with nothing queued is treated as silence.
+    """
+
+    def __init__(self, latencies: Optional[Latencies] = None) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=False))
+        self.latencies = latencies or Latencies()
+        self._transcripts: Deque[str] = deque()
+
+    @property
+    def model(self) -> str:
+        return "fake-stt"
+
+    @property
+    def provider(self) -> str:
+        return "offline"
+
+    def queue(self, text: str) -> None:
+        self._transcripts.append(text)
+
+    def _final(self, text: str) -> stt.SpeechEvent:
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            request_id=utils.shortuuid("stt_"),
+            alternatives=[stt.SpeechData(language="en", text=text, confidence=1.0)],
+        )
+
+    async def _recognize_impl(self, buffer, *, language=NOT_GIVEN, conn_options: APIConnectOptions) -> stt.SpeechEvent:
+        await asyncio.sleep(self.latencies.stt)
+        return self._final(self._transcripts.popleft() if self._transcripts else "")
+
+    def stream(self, *, language=NOT_GIVEN, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> stt.RecognizeStream:
+        return _FakeSpeechStream(stt=self, conn_options=conn_options)
+
+
+class _FakeSpeechStream(stt.RecognizeStream):
+    async def _run(self) -> None:
+        fake: FakeSTT = self._stt
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel) or not fake._transcripts:
+                continue
+            text = fake._transcripts.popleft()
+            self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH))
+            await asyncio.sleep(fake.latencies.stt)
+            final = fake._final(text)
+            self._event_ch.send_nowait(final)
+            self._event_ch.send_nowait(
+                stt.SpeechEvent(
+                    type=stt.SpeechEventType.RECOGNITION_USAGE,
+                    request_id=final.request_id,
+                    recognition_usage=stt.RecognitionUsage(audio_duration=frame.duration),
+                )
+            )
+            self._event_ch.send_nowait(
+                stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH, speech_end_time=time.time())
+            )
+
+
+Responder = Callable[[llm.ChatContext], Tuple[List[Tuple[str, dict]], str]]
+
+
+def script_responder(turns: List[ScriptedTurn], fallback: str = "Okay.") -> Responder:
+    """Respond by looking up the latest user message in a script.
+
+    Tool calls are returned until tool outputs or system messages (such as a
+    handoff's new instructions) follow the user message; then the reply is
+    returned instead. Assistant messages in between, such as context an agent
+    injects in on_user_turn_completed, do not count as an answer.
+    """
+    by_user = {turn.user: turn for turn in turns}
+
+    def respond(chat_ctx: llm.ChatContext) -> Tuple[List[Tuple[str, dict]], str]:
+        user_text, answered = None, False
+        for item in reversed(chat_ctx.items):
+            if item.type == "message" and item.role == "user":
+                user_text = item.text_content
+                break
+            answered = answered or item.type == "function_call_output" or getattr(item, "role", None) == "system"
+        turn = by_user.get(user_text or "")
+        if turn is None:
+            return [], fallback
+        if turn.tools and not answered:
+            return turn.tools, ""
+        return [], turn.reply
+
+    return respond
+
+
+class ScriptedLLM(llm.LLM):
+    def __init__(self, responder: Responder, latencies: Optional[Latencies] = None, words_per_chunk: int = 4) -> None:
+        super().__init__()
+        self.responder = responder
+        self.latencies = latencies or Latencies()
+        self.words_per_chunk = words_per_chunk
+        self.requests = 0
+
+    @property
+    def model(self) -> str:
+        return "scripted-llm"
+
+    @property
+    def provider(self) -> str:
+        return "offline"
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools=None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls=NOT_GIVEN,
+        tool_choice=NOT_GIVEN,
+        extra_kwargs=NOT_GIVEN,
+    ) -> llm.LLMStream:
+        self.requests += 1
+        return _ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class _ScriptedStream(llm.LLMStream):
+    async def _run(self) -> None:
+        scripted: ScriptedLLM = self._llm
+        calls, reply = scripted.responder(self._chat_ctx)
+        request_id = utils.shortuuid("llm_")
+        await asyncio.sleep(scripted.latencies.llm_ttft)
+        if calls:
+            self._event_ch.send_nowait(
+                llm.ChatChunk(
+                    id=request_id,
+                    delta=llm.ChoiceDelta(
+                        role="assistant",
+                        tool_calls=[
+                            llm.FunctionToolCall(
+                                name=name, arguments=json.dumps(arguments), call_id=utils.shortuuid("call_")
+                            )
+                            for name, arguments in calls
+                        ],
+                    ),
+                )
+            )
+        words = reply.split(" ")
+        for i in range(0, len(words), scripted.words_per_chunk):
+            if i:
+                await asyncio.sleep(scripted.latencies.llm_per_chunk)
+            text = " ".join(words[i : i + scripted.words_per_chunk])
+            content = text if i == 0 else " " + text
+            self._event_ch.send_nowait(
+                llm.ChatChunk(id=request_id, delta=llm.ChoiceDelta(role="assistant", content=content))
+            )
+        self._event_ch.send_nowait(
+            llm.ChatChunk(
+                id=request_id,
+                usage=llm.CompletionUsage(
+                    completion_tokens=len(words), prompt_tokens=len(self._chat_ctx.items) * 50, total_tokens=0
+                ),
+            )
+        )
+
+
+class SilentTTS(tts.TTS):
+    """Synthesizes silence, 60 ms per character, after a time-to-first-byte delay."""
+
+    def __init__(self, latencies: Optional[Latencies] = None, sample_rate: int = 24000) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False), sample_rate=sample_rate, num_channels=1
+        )
+        self.latencies = latencies or Latencies()
+        self.characters = 0
+
+    @property
+    def model(self) -> str:
+        return "silent-tts"
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> tts.ChunkedStream:
+        self.characters += len(text)
+        return _SilentStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class _SilentStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        silent: SilentTTS = self._tts
+        await asyncio.sleep(silent.latencies.tts_ttfb)
+        output_emitter.initialize(
+            request_id=utils.shortuuid("tts_"),
+            sample_rate=silent.sample_rate,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+        samples = int(silent.sample_rate * 0.06 * max(len(self._input_text), 1))
+        output_emitter.push(b"\x00\x00" * samples)
+        output_emitter.flush()
+
+
+class QueuedAudioInput(io.AudioInput):
+    """Audio input that yields the frames pushed into it, as a room's microphone track would."""
+
+    def __init__(self) -> None:
+        super().__init__(label="QueuedAudioInput")
+        self._frames: "asyncio.Queue[rtc.AudioFrame]" = asyncio.Queue()
+
+    def push(self, frame: rtc.AudioFrame) -> None:
+        self._frames.put_nowait(frame)
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        return await self._frames.get()
+
+
+class NullAudioOutput(io.AudioOutput):
+    """Audio sink that treats every segment as played the moment it is flushed."""
+
+    def __init__(self) -> None:
+        # Pausing is a no-op, but advertising it keeps false-interruption handling on
+        super().__init__(label="NullAudioOutput", capabilities=io.AudioOutputCapabilities(pause=True))
+        self.frames = 0
+        self.audio_seconds = 0.0
+        # perf_counter() of the first frame since the caller last reset it to None
+        self.first_frame_at: Optional[float] = None
+        self._segment_seconds = 0.0
+        self._capturing = False
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+        self.frames += 1
+        self._capturing = True
+        self._segment_seconds += frame.duration
+
+    def flush(self) -> None:
+        super().flush()
+        if not self._capturing:
+            # Nothing was captured since the last flush, so there is no segment to finish
+            return
+        self._capturing = False
+        duration, self._segment_seconds = self._segment_seconds, 0.0
+        self.audio_seconds += duration
+        self.on_playback_started(created_at=time.time())
+        self.on_playback_finished(playback_position=duration, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        self._segment_seconds = 0.0
+
+
+def offline_tts_factory(latencies: Optional[Latencies] = None) -> Callable[..., tts.TTS]:
+    """A tts_pool factory that gives every pooled voice a SilentTTS."""
+
+    def factory(voice: str, style: str, text_pacing: bool) -> tts.TTS:
+        return SilentTTS(latencies)
+
+    return factory
+
+
+def turns_from_script(data: Dict) -> Dict[str, List[ScriptedTurn]]:
+    """Parse {"agent": [{"user", "reply", "tools": [{"name", "arguments"}]}, ...]}."""
+    return {agent: [ScriptedTurn.from_dict(t) for t in turns] for agent, turns in data.items()}
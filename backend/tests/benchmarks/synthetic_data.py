@@ -0,0 +1,132 @@
+"""Deterministic synthetic datasets shaped like the files in shared-data, at any size.
+
+    food_catalog(100_000)    food_catalog.json: categories of items, plus recipes
+    company_data(10_000)     company_data.json: company, pricing and FAQs
+    curriculum(5_000)        day4_tutor_content.json: concepts with summaries
+    world_state(5_000)       a game master's world state after a long session
+"""
+import random
+from typing import Dict, List
+
+CATEGORIES = ["groceries", "snacks", "prepared_food", "beverages", "produce", "bakery", "dairy", "frozen"]
+NOUNS = [
+    "milk", "bread", "cheese", "apple", "banana", "pasta", "rice", "coffee", "tea", "juice",
+    "yogurt", "butter", "eggs", "chicken", "salmon", "tofu", "cereal", "cookies", "chips", "pizza",
+    "salad", "soup", "sandwich", "noodles", "beans", "tomato", "onion", "garlic", "honey", "jam",
+]
+ADJECTIVES = ["organic", "fresh", "classic", "spicy", "creamy", "crunchy", "smoked", "sweet", "whole", "light"]
+BRANDS = ["QuickCart", "Nature's Own", "Farm Fresh", "Golden Valley", "Blue Harbor", "Sunrise", "Green Leaf"]
+UNITS = ["each", "lb", "pack", "bottle", "loaf", "box", "jar"]
+TAGS = ["healthy", "vegan", "gluten-free", "snack", "breakfast", "dinner", "kids", "protein", "sale", "local"]
+WORDS = [
+    "payment", "payments", "refund", "refunds", "card", "cards", "upi", "wallet", "settlement",
+    "settlements", "invoice", "invoices", "subscription", "subscriptions", "fee", "fees",
+    "international", "currency", "dashboard", "api", "webhook", "account", "kyc", "onboarding",
+    "payout", "payouts", "limit", "limits", "dispute", "chargeback", "integration", "plugin",
+    "checkout", "link",
+]
+TOPICS = [
+    "variables", "loops", "functions", "recursion", "classes", "objects", "lists", "dictionaries",
+    "sets", "tuples", "strings", "exceptions", "modules", "packages", "iterators", "generators",
+    "decorators", "closures", "threads", "processes", "files",
+]
+
+
+def food_catalog(items: int = 100_000, recipes: int = 200, seed: int = 47) -> dict:
+    rng = random.Random(seed)
+    categories: Dict[str, List[dict]] = {name: [] for name in CATEGORIES}
+    ids = []
+    for i in range(items):
+        noun = NOUNS[i % len(NOUNS)]
+        adjective = rng.choice(ADJECTIVES)
+        category = CATEGORIES[i % len(CATEGORIES)]
+        item_id = f"{noun}_{adjective}_{i}"
+        ids.append(item_id)
+        categories[category].append(
+            {
+                "id": item_id,
+                "name": f"{adjective.title()} {noun.title()} {i}",
+                "category": category,
+                "price": round(rng.uniform(0.5, 25.0), 2),
+                "unit": rng.choice(UNITS),
+                "brand": rng.choice(BRANDS),
+                "tags": rng.sample(TAGS, 3),
+            }
+        )
+    recipe_book = {}
+    for r in range(recipes):
+        key = f"recipe_{r}"
+        recipe_book[key] = {
+            "name": f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} Bowl {r}",
+            "description": "A synthetic recipe.",
+            "ingredients": [{"item_id": rng.choice(ids), "quantity": rng.randint(1, 3)} for _ in range(4)],
+        }
+    return {"categories": categories, "recipes": recipe_book}
+
+
+def company_data(faqs: int = 10_000, seed: int = 47) -> dict:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(faqs):
+        words = rng.sample(WORDS, 5)
+        entries.append(
+            {
+                "question": f"How do {words[0]} and {words[1]} work with {words[2]} {i}?",
+                "answer": f"Answer {i}: {' '.join(rng.choices(WORDS, k=30))}.",
+            }
+        )
+    return {
+        "company": "Synthetic Payments",
+        "description": "A synthetic payments company used for benchmarks.",
+        "products": ["Payment Gateway", "Payouts", "Subscriptions"],
+        "pricing": {"standard": "2% per transaction.", "setup_fee": "Zero setup fee."},
+        "faqs": entries,
+    }
+
+
+def curriculum(concepts: int = 5_000, seed: int = 47) -> List[dict]:
+    rng = random.Random(seed)
+    content = []
+    for i in range(concepts):
+        topic = TOPICS[i % len(TOPICS)]
+        title = f"{topic.title()} {i}"
+        content.append(
+            {
+                "id": f"{topic}_{i}",
+                "title": title,
+                "summary": f"{title} explained. " + " ".join(rng.choices(TOPICS + WORDS, k=60)) + ".",
+                "sample_question": f"What are {topic} used for in part {i}?",
+            }
+        )
+    return content
+
+
+def world_state(events: int = 5_000, characters: int = 500, locations: int = 300, quests: int = 200, seed: int = 47) -> dict:
+    rng = random.Random(seed)
+    return {
+        "characters": {
+            f"NPC {i}": {
+                "role": rng.choice(["merchant", "guard", "wizard", "thief", "fixer"]),
+                "attitude": rng.choice(["friendly", "hostile", "neutral"]),
+                "notes": " ".join(rng.choices(TOPICS, k=8)),
+                "met_at": rng.randrange(max(events, 1)),
+            }
+            for i in range(characters)
+        },
+        "locations": {
+            f"Location {i}": {
+                "description": " ".join(rng.choices(TOPICS, k=12)),
+                "connections": f"Location {rng.randrange(locations)}",
+                "visited_at": rng.randrange(max(events, 1)),
+            }
+            for i in range(locations)
+        },
+        "events": [
+            {"description": f"Event {i}: " + " ".join(rng.choices(TOPICS, k=10)), "turn": i + 1}
+            for i in range(events)
+        ],
+        "quests": [
+            {"title": f"Quest {i}", "description": "Find the thing.", "status": rng.choice(["active", "completed"])}
+            for i in range(quests)
+        ],
+    }
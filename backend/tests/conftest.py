@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import client_pool
+
+
+@pytest.fixture(autouse=True)
+def provider_clients(monkeypatch):
+    """Agents build their TTS client on construction; give each test an empty pool.
+
+    Tests that open a lease are async, so the lease stays in that test's task context.
+    """
+    monkeypatch.setenv("MURF_API_KEY", "test-key")
+    client_pool.clear()
+    yield
+    client_pool.clear()
@@ -0,0 +1,150 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from livekit import rtc
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audio_cache import AudioCache, CachedAudio, cache_key
+
+
+class _Event:
+    def __init__(self, frame):
+        self.frame = frame
+
+
+class _Stream:
+    def __init__(self, frames):
+        self._frames = frames
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for frame in self._frames:
+            yield _Event(frame)
+
+
+class LocalTTS:
+    """Stand-in TTS producing 10 ms of constant-valued PCM per character."""
+
+    sample_rate = 16000
+    num_channels = 1
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+        samples = self.sample_rate // 100
+        frames = [
+            rtc.AudioFrame(
+                data=bytes([ord(ch) % 256, 0]) * samples,
+                sample_rate=self.sample_rate,
+                num_channels=1,
+                samples_per_channel=samples,
+            )
+            for ch in text
+        ]
+        return _Stream(frames)
+
+
+def _audio(n_bytes: int) -> CachedAudio:
+    return CachedAudio(b"\x01\x00" * (n_bytes // 2), 16000, 1)
+
+
+@pytest.mark.asyncio
+async def test_second_synthesis_is_served_from_cache(tmp_path):
+    cache = AudioCache(tmp_path)
+    tts = LocalTTS()
+
+    first, hit = await cache.synthesize(tts, "en-US-matthew", "Conversation", "Hello there")
+    assert not hit
+    second, hit = await cache.synthesize(tts, "en-US-matthew", "Conversation", "Hello  there")
+    assert hit
+    assert tts.calls == 1
+    assert second.pcm == first.pcm
+    assert cache.hit_ratio == 0.5
+
+    frames = [frame async for frame in second.stream()]
+    assert sum(f.samples_per_channel for f in frames) == 11 * 160
+    assert frames[0].sample_rate == 16000
+
+
+@pytest.mark.asyncio
+async def test_key_includes_voice_and_style(tmp_path):
+    cache = AudioCache(tmp_path)
+    tts = LocalTTS()
+    await cache.synthesize(tts, "en-US-matthew", "Conversation", "Hi")
+    await cache.synthesize(tts, "en-US-alicia", "Conversation", "Hi")
+    await cache.synthesize(tts, "en-US-matthew", "Promo", "Hi")
+    assert tts.calls == 3
+    assert len(cache) == 3
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=3000)
+    cache.put("v", "s", "one", _audio(1000))
+    cache.put("v", "s", "two", _audio(1000))
+    assert cache.get("v", "s", "one") is not None
+    cache.put("v", "s", "three", _audio(1000))
+
+    assert cache.total_bytes <= 3000
+    assert cache_key("v", "s", "two") not in cache
+    assert cache.get("v", "s", "one") is not None
+    assert cache.get("v", "s", "three") is not None
+    assert len(list(tmp_path.glob("*.pcm"))) == 2
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    AudioCache(tmp_path).put("v", "s", "persisted", _audio(400))
+    reopened = AudioCache(tmp_path)
+    audio = reopened.get("v", "s", "persisted")
+    assert audio is not None
+    assert audio.sample_rate == 16000
+    assert len(audio.pcm) == 400
+
+
+@pytest.mark.asyncio
+async def test_fetch_and_store_match_get_and_put(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=3000)
+    await cache.store("v", "s", "one", _audio(1000))
+    await cache.store("v", "s", "two", _audio(1000))
+    await cache.store("v", "s", "three", _audio(1000))
+    assert cache_key("v", "s", "one") not in cache
+    assert len(list(tmp_path.glob("*.pcm"))) == 2
+
+    audio = await cache.fetch("v", "s", "two")
+    assert len(audio.pcm) == 1000
+    assert await cache.fetch("v", "s", "one") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_unreadable_entry_is_dropped(tmp_path):
+    cache = AudioCache(tmp_path)
+    await cache.store("v", "s", "broken", _audio(400))
+    path = tmp_path / f"{cache_key('v', 's', 'broken')}.pcm"
+    path.write_bytes(b"junk")
+    assert await cache.fetch("v", "s", "broken") is None
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stores_of_one_utterance(tmp_path):
+    cache = AudioCache(tmp_path)
+    await asyncio.gather(*(cache.store("v", "s", "same", _audio(400)) for _ in range(8)))
+    assert len(cache) == 1
+    assert cache.total_bytes == len(list(tmp_path.glob("*.pcm"))[0].read_bytes())
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,89 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import data_bundle
+import shared_data
+from data_bundle import Bundle, BundleDict, BundleList
+
+DATA_DIR = Path(__file__).parent.parent / "shared-data"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A copy of shared-data with every source compiled into bundles."""
+    for name in data_bundle.SOURCES:
+        source = tmp_path / name
+        source.write_bytes((DATA_DIR / name).read_bytes())
+        data_bundle.build(source, data_bundle.bundle_path(source))
+    monkeypatch.setattr(shared_data, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("name", data_bundle.SOURCES)
+def test_bundles_round_trip_the_source_json(data_dir, name):
+    bundle = Bundle(data_bundle.bundle_path(data_dir / name))
+    with open(data_dir / name, encoding="utf-8-sig") as f:
+        expected = json.load(f)
+    assert bundle.root == expected
+    assert data_bundle._to_python(bundle.root) == expected
+
+
+def test_large_containers_become_tables(tmp_path):
+    items = {f"item_{i:05d}": {"name": f"Item {i}", "price": i / 100} for i in range(3000)}
+    source = tmp_path / "catalog.json"
+    source.write_text(json.dumps({"items": items, "order": list(items)}))
+    data_bundle.build(source, data_bundle.bundle_path(source))
+    root = Bundle(data_bundle.bundle_path(source)).root
+
+    assert isinstance(root["items"], BundleDict) and isinstance(root["order"], BundleList)
+    assert root["items"]["item_02999"] == {"name": "Item 2999", "price": 29.99}
+    assert "item_03000" not in root["items"]
+    assert list(root["items"])[:2] == ["item_00000", "item_00001"]
+    assert [v["name"] for v in root["items"].values()][-1] == "Item 2999"
+    assert list(root["order"]) == list(items)
+    assert root["order"][-1] == "item_02999" and root["order"][1:3] == ["item_00001", "item_00002"]
+    # Records decode to fresh objects, so callers cannot change the shared data
+    root["items"]["item_00000"]["price"] = 99
+    assert root["items"]["item_00000"]["price"] == 0.0
+
+
+def test_shared_data_maps_fresh_bundles_and_ignores_stale_ones(data_dir, monkeypatch):
+    monkeypatch.setenv("SHARED_DATA_BUNDLES", "1")
+    catalog = shared_data._load_json("food_catalog.json", {})
+    assert isinstance(catalog, BundleDict)
+    assert catalog["categories"]["groceries"][0]["id"]
+
+    # Rewriting the source changes its size and mtime
+    (data_dir / "food_catalog.json").write_text(json.dumps({"categories": {}, "recipes": {}}))
+    assert shared_data._load_json("food_catalog.json", {}) == {"categories": {}, "recipes": {}}
+
+    monkeypatch.setenv("SHARED_DATA_BUNDLES", "0")
+    assert isinstance(shared_data._load_json("company_data.json", {}), dict)
+
+
+@pytest.mark.asyncio
+async def test_agents_run_over_bundled_data(data_dir, monkeypatch):
+    from agent_food_ordering import FoodOrderingAgent
+    from agent_sdr import SDRAgent
+    from retrieval import ConceptRetriever, content_version
+
+    catalog = shared_data._load_json("food_catalog.json", {})
+    food = FoodOrderingAgent()
+    plain = await food.search_catalog(None, "bread")
+    food.catalog = catalog
+    assert await food.search_catalog(None, "bread") == plain
+
+    sdr = SDRAgent(shared_data._load_json("company_data.json", {}))
+    assert sdr.company_data["faqs"][0]["question"]
+
+    content = shared_data._load_json("day4_tutor_content.json", [])
+    assert isinstance(content, BundleList) or isinstance(content, list)
+    retriever = ConceptRetriever(content)
+    assert retriever.version == content_version(json.loads((data_dir / "day4_tutor_content.json").read_text()))
+    assert retriever.lookup(content[0]["title"]) == content[0]
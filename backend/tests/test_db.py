@@ -67,3 +67,15 @@ def test_get_weakest_concepts(db):
     assert len(weakest) == 2
     assert weakest[0][0] == "Concept 1" # 50
     assert weakest[1][0] == "Concept 3" # 70
+
+def test_save_review(db):
+    db.upsert_concept("c1", "Concept 1")
+    db.save_review("learner", "c1", 2.36, 6.0, 2, 1000.0)
+
+    schedule = db.get_review_schedule("learner")
+    assert schedule["c1"]["ease_factor"] == 2.36
+    assert schedule["c1"]["interval_days"] == 6.0
+    assert schedule["c1"]["repetitions"] == 2
+    assert schedule["c1"]["due_at"] == 1000.0
+    assert db.get_review_schedule("someone_else") == {}
+    assert db.get_all_stats()["c1"]["times_quizzed"] == 1
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import env_flags
+import latency_metrics
+import loop_watchdog
+import session_memory
+import session_recording
+import shared_data
+import tool_profiler
+import turn_tracing
+
+
+@pytest.mark.parametrize("value", ["1", "true", "Yes", " ON "])
+def test_true_values(monkeypatch, value):
+    monkeypatch.setenv("SOME_FLAG", value)
+    assert env_flags.flag("SOME_FLAG") is True
+
+
+@pytest.mark.parametrize("value", ["0", "false", "No", "off"])
+def test_false_values(monkeypatch, value):
+    monkeypatch.setenv("SOME_FLAG", value)
+    assert env_flags.flag("SOME_FLAG", default=True) is False
+
+
+def test_unset_empty_and_unknown_keep_the_default(monkeypatch, caplog):
+    monkeypatch.delenv("SOME_FLAG", raising=False)
+    assert env_flags.flag("SOME_FLAG") is False
+    assert env_flags.flag("SOME_FLAG", default=True) is True
+    monkeypatch.setenv("SOME_FLAG", "")
+    assert env_flags.flag("SOME_FLAG", default=True) is True
+    monkeypatch.setenv("SOME_FLAG", "enabled")
+    assert env_flags.flag("SOME_FLAG") is False
+    assert "SOME_FLAG" in caplog.text
+
+
+def test_optional_features_are_off_by_default(monkeypatch):
+    features = {
+        "TOOL_PROFILE": tool_profiler.enabled,
+        "LATENCY_METRICS": latency_metrics.enabled,
+        "TURN_TRACING": turn_tracing.enabled,
+        "LOOP_WATCHDOG": loop_watchdog.enabled,
+        "SESSION_MEMORY": session_memory.enabled,
+        "SESSION_RECORDING": session_recording.enabled,
+        "SHARED_DATA_BUNDLES": shared_data.bundles_enabled,
+    }
+    for name, enabled in features.items():
+        monkeypatch.delenv(name, raising=False)
+        assert enabled() is False, name
+        monkeypatch.setenv(name, "1")
+        assert enabled() is True, name
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import agent_game_master
+from agent_game_master import GameMasterAgent
+
+
+@pytest.mark.asyncio
+async def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_game_master, "SAVES_DIR", tmp_path / "saves")
+    agent = GameMasterAgent()
+    await agent.add_character(None, "Vex", "fixer", "friendly")
+    await agent.record_event(None, "Met Vex at the bar")
+
+    assert "Game saved as 'test'" in await agent.save_game(None, "test")
+    assert (tmp_path / "saves" / "test.json").exists()
+
+    agent.world_state["events"].clear()
+    assert "Game loaded" in await agent.load_game(None, "test")
+    assert agent.world_state["events"][0]["description"] == "Met Vex at the bar"
+    assert "not found" in await agent.load_game(None, "missing")
+
+
+@pytest.mark.asyncio
+async def test_compact_memory_keeps_recent_events_and_turn_numbers():
+    agent = GameMasterAgent()
+    for i in range(agent_game_master.KEEP_EVENTS + 20):
+        await agent.record_event(None, f"Event {i}")
+
+    assert agent.compact_memory() == "dropped 20 old events"
+    assert len(agent.world_state["events"]) == agent_game_master.KEEP_EVENTS
+    assert agent.world_state["events"][0]["description"] == "Event 20"
+
+    await agent.record_event(None, "After compaction")
+    assert agent.world_state["events"][-1]["turn"] == agent_game_master.KEEP_EVENTS + 21
@@ -0,0 +1,79 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from livekit.agents import llm
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import greeting
+import tts_pool
+from audio_cache import AudioCache
+from test_audio_cache import LocalTTS
+
+
+class FakeSession:
+    def __init__(self, llm=None):
+        self.llm = llm
+        self.said = []
+
+    def say(self, text, audio=None):
+        self.said.append((text, audio))
+        return text
+
+
+class FakeLLM(llm.LLM):
+    def __init__(self):
+        super().__init__()
+        self.prewarms = 0
+        self.chats = 0
+
+    async def _prewarm_impl(self):
+        self.prewarms += 1
+
+    def chat(self, **kwargs):
+        self.chats += 1
+        raise AssertionError("greeting must not request a completion")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = AudioCache(tmp_path)
+    monkeypatch.setattr(tts_pool, "get_audio_cache", lambda: cache)
+    monkeypatch.setattr(tts_pool, "background_tts", lambda voice, style="Conversation": LocalTTS())
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_first_greeting_streams_and_fills_cache(cache):
+    session = FakeSession()
+    await tts_pool.say_cached(session, "Welcome!", "en-US-matthew")
+    assert session.said == [("Welcome!", None)]
+
+    await asyncio.gather(*tts_pool._RENDERS)
+    assert len(cache) == 1
+
+    await tts_pool.say_cached(session, "Welcome!", "en-US-matthew")
+    text, audio = session.said[-1]
+    assert audio is not None
+    assert len([frame async for frame in audio]) > 0
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_speak_greeting_prewarms_llm_without_a_completion(cache):
+    model = FakeLLM()
+    session = FakeSession(llm=model)
+    await greeting.speak_greeting(session, "Hello", "en-US-matthew")
+    assert session.said[0][0] == "Hello"
+    await greeting.speak_greeting(session, "Hello", "en-US-matthew")
+
+    await asyncio.gather(model._prewarm_task, *tts_pool._RENDERS)
+    assert model.prewarms == 1
+    assert model.chats == 0
+
+    cold = FakeLLM()
+    await greeting.speak_greeting(FakeSession(llm=cold), "Hello", "en-US-matthew", warm=False)
+    assert cold._prewarm_task is None
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+from livekit.agents import llm
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from handoff import HandoffPolicy
+from retrieval import estimate_tokens
+
+
+def _conversation(turns: int) -> llm.ChatContext:
+    chat_ctx = llm.ChatContext.empty()
+    chat_ctx.add_message(role="system", content="You are a tutor.")
+    for i in range(turns):
+        chat_ctx.add_message(role="user", content=f"User turn {i} " + "words " * 20)
+        chat_ctx.add_message(role="assistant", content=f"Agent turn {i} " + "words " * 20)
+    return chat_ctx
+
+
+def test_keeps_most_recent_turns_within_budget():
+    policy = HandoffPolicy(max_tokens=100, max_items=10)
+    carried, tokens = policy.carry_over(_conversation(20))
+    texts = [item.text_content for item in carried.items]
+    assert tokens <= 100
+    assert texts[-1].startswith("Agent turn 19")
+    assert not any(text.startswith("User turn 0 ") for text in texts)
+    assert all(item.role in ("user", "assistant") for item in carried.items)
+
+
+def test_item_limit_and_truncation():
+    chat_ctx = llm.ChatContext.empty()
+    chat_ctx.add_message(role="user", content="explain " * 500)
+    for i in range(5):
+        chat_ctx.add_message(role="user", content=f"short {i}")
+    policy = HandoffPolicy(max_tokens=1000, max_items=3, max_item_tokens=50)
+    assert [text for _, text in policy.select(chat_ctx)] == ["short 2", "short 3", "short 4"]
+
+    policy = HandoffPolicy(max_tokens=1000, max_items=10, max_item_tokens=50)
+    longest = max(estimate_tokens(text) for _, text in policy.select(chat_ctx))
+    assert longest <= 51
+
+
+def test_tool_results_are_carried_as_notes():
+    chat_ctx = llm.ChatContext.empty()
+    chat_ctx.add_message(role="user", content="Explain loops please")
+    chat_ctx.items.append(
+        llm.FunctionCallOutput(
+            call_id="call_1", name="explain_concept", output="Loops repeat actions.", is_error=False
+        )
+    )
+    selected = HandoffPolicy().select(chat_ctx)
+    assert selected[-1] == ("assistant", "(result of explain_concept: Loops repeat actions.)")
+    assert HandoffPolicy(include_tool_results=False).select(chat_ctx) == [
+        ("user", "Explain loops please")
+    ]
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+from livekit.agents.worker import ServerEnvOption
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from idle_pool import AdaptiveIdleProcesses, ArrivalRateEstimator, idle_target
+
+
+def test_burst_raises_rate_and_peak_decays():
+    estimator = ArrivalRateEstimator(short_window=10, long_window=100, peak_half_life=60)
+    for i in range(20):
+        estimator.record(at=i * 0.5)
+    assert estimator.rate(now=10) == 2.0
+    # Short window is empty again, the peak has halved once
+    assert estimator.rate(now=70) == 1.0
+    assert estimator.rate(now=1000) < 0.01
+
+
+def test_idle_target_is_bounded():
+    assert idle_target(0.0, 4.0, 1.5, 1, 8) == 1
+    assert idle_target(0.5, 4.0, 1.5, 1, 8) == 3
+    assert idle_target(10.0, 4.0, 1.5, 1, 8) == 8
+
+
+def test_worker_reads_ceiling_first_then_adaptive_target():
+    clock = [0.0]
+    option = AdaptiveIdleProcesses(
+        ArrivalRateEstimator(clock=lambda: clock[0]), min_idle=1, max_idle=6, replenish_seconds=4.0
+    )
+    assert isinstance(option, ServerEnvOption)
+    assert ServerEnvOption.getvalue(option, False) == 6
+    assert ServerEnvOption.getvalue(option, False) == 1
+    for _ in range(10):
+        option.record_arrival()
+    assert ServerEnvOption.getvalue(option, False) == 6
+    assert ServerEnvOption.getvalue(option, True) == 0
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from import_profile import parse_importtime, top_level_packages
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   encodings.aliases
+import time:      2000 |       2500 | livekit.plugins.google
+import time:       500 |        500 |     livekit.plugins.google.llm
+some unrelated warning
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(SAMPLE)
+    assert [r["module"] for r in records] == [
+        "encodings.aliases",
+        "livekit.plugins.google",
+        "livekit.plugins.google.llm",
+    ]
+    assert records[1]["self_us"] == 2000
+    assert records[1]["cumulative_us"] == 2500
+    assert [r["depth"] for r in records] == [1, 0, 2]
+
+
+def test_top_level_packages():
+    totals = top_level_packages(parse_importtime(SAMPLE))
+    assert totals == {"encodings": 120, "livekit": 2500}
+
+
+def test_worker_import_defers_provider_plugins():
+    # The main worker process only routes jobs, so it must not pay for the provider SDKs
+    code = (
+        "import sys, worker, session_factory\n"
+        "loaded = [p for p in session_factory.JOB_PLUGINS if p in sys.modules]\n"
+        "print(','.join(loaded))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent / "src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
@@ -0,0 +1,120 @@
+import os
+import socket
+import sys
+import urllib.request
+from pathlib import Path
+
+import pytest
+from livekit.agents import metrics
+from livekit.agents.metrics.base import Metadata
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import latency_metrics
+from latency_metrics import Histogram
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    latency_metrics.reset()
+    yield
+    latency_metrics.reset()
+
+
+def llm_metrics(ttft: float, model: str = "gemini-2.5-flash-lite", cancelled: bool = False):
+    return metrics.LLMMetrics(
+        label="google.LLM",
+        request_id="r",
+        timestamp=0.0,
+        duration=1.0,
+        ttft=ttft,
+        cancelled=cancelled,
+        completion_tokens=1,
+        prompt_tokens=1,
+        prompt_cached_tokens=0,
+        total_tokens=2,
+        tokens_per_second=1.0,
+        metadata=Metadata(model_name=model, model_provider="google"),
+    )
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    h = Histogram()
+    for _ in range(90):
+        h.observe(0.12)
+    for _ in range(10):
+        h.observe(1.1)
+    assert 0.1 < h.quantile(0.5) <= 0.15
+    assert 1.0 < h.quantile(0.95) <= 1.25
+    assert h.count == 100
+    assert h.sum == pytest.approx(90 * 0.12 + 10 * 1.1)
+
+
+def test_histogram_overflow_reports_last_bound():
+    h = Histogram()
+    h.observe(60.0)
+    assert h.quantile(0.99) == latency_metrics.BUCKETS[-1]
+
+
+def test_observe_splits_by_agent_and_model_and_skips_cancelled():
+    latency_metrics.observe("tutor", llm_metrics(0.3))
+    latency_metrics.observe("tutor", llm_metrics(0.4, model="gemini-2.5-flash"))
+    latency_metrics.observe("sdr", llm_metrics(0.5))
+    latency_metrics.observe("sdr", llm_metrics(0.5, cancelled=True))
+    latency_metrics.observe("sdr", llm_metrics(-1.0))
+    eou = metrics.EOUMetrics(
+        timestamp=0.0,
+        end_of_utterance_delay=0.7,
+        transcription_delay=0.1,
+        on_user_turn_completed_delay=0.0,
+    )
+    latency_metrics.observe("sdr", eou)
+    counts = {key: h.count for key, h in latency_metrics.histograms().items()}
+    assert counts == {
+        ("llm_ttft", "tutor", "gemini-2.5-flash-lite"): 1,
+        ("llm_ttft", "tutor", "gemini-2.5-flash"): 1,
+        ("llm_ttft", "sdr", "gemini-2.5-flash-lite"): 1,
+        ("eou_delay", "sdr", "turn-detector"): 1,
+    }
+
+
+def test_snapshots_merge_across_processes(tmp_path):
+    latency_metrics.observe("tutor", llm_metrics(0.3))
+    latency_metrics.flush(tmp_path)
+    # Another process's snapshot for the same series
+    (tmp_path / "1.json").write_text((tmp_path / f"{os.getpid()}.json").read_text())
+    merged = latency_metrics.collect(tmp_path)
+    assert merged[("llm_ttft", "tutor", "gemini-2.5-flash-lite")].count == 2
+
+
+def test_render_prometheus_histogram_and_quantiles():
+    latency_metrics.observe("food", llm_metrics(0.2))
+    text = latency_metrics.render_prometheus(latency_metrics.histograms())
+    labels = 'agent="food",model="gemini-2.5-flash-lite"'
+    assert "# TYPE voice_agent_llm_ttft_seconds histogram" in text
+    assert f'voice_agent_llm_ttft_seconds_bucket{{{labels},le="0.2"}} 1' in text
+    assert f'voice_agent_llm_ttft_seconds_bucket{{{labels},le="0.15"}} 0' in text
+    assert f"voice_agent_llm_ttft_seconds_count{{{labels}}} 1" in text
+    assert f'voice_agent_llm_ttft_quantile_seconds{{{labels},quantile="0.95"}}' in text
+    assert "tts_ttfb" not in text
+
+
+def test_endpoint_serves_metrics(tmp_path):
+    latency_metrics.observe("game_master", llm_metrics(0.25))
+    server = latency_metrics.start_server(port=_free_port(), directory=tmp_path)
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+        assert response.status == 200
+        assert 'agent="game_master"' in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,65 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import loop_watchdog
+from loop_watchdog import LoopWatchdog
+
+
+def save_file_synchronously():
+    # Stands in for a tool doing blocking file I/O on the event loop
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_attributes_stall_to_blocking_function():
+    watchdog = LoopWatchdog("room-42", "food", threshold=0.1, interval=0.02)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.05)
+        save_file_synchronously()
+        await asyncio.sleep(0.1)
+    finally:
+        watchdog.stop()
+
+    assert len(watchdog.stalls) == 1
+    stall = watchdog.stalls[0]
+    assert stall.room == "room-42"
+    assert stall.function == "save_file_synchronously"
+    assert stall.location.startswith("test_loop_watchdog.py:")
+    assert stall.duration >= 0.2
+    assert "save_file_synchronously" in watchdog.summary()
+
+
+@pytest.mark.asyncio
+async def test_no_stalls_when_loop_stays_responsive():
+    watchdog = LoopWatchdog("room-1", threshold=0.1, interval=0.01)
+    watchdog.start()
+    try:
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+    finally:
+        watchdog.stop()
+    assert watchdog.stalls == []
+    assert watchdog.lag.count > 0
+
+
+def test_blocking_site_skips_library_frames():
+    import json
+    import traceback
+
+    app = traceback.FrameSummary(__file__, 10, "view_world_state")
+    library = traceback.FrameSummary(json.__file__, 200, "dumps")
+    assert loop_watchdog.blocking_site([app, library]).name == "view_world_state"
+    assert loop_watchdog.blocking_site([library]).name == "dumps"
+
+
+def test_threshold_from_env(monkeypatch):
+    monkeypatch.setenv("LOOP_STALL_MS", "250")
+    assert LoopWatchdog("room").threshold == 0.25
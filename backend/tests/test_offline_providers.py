@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+import pytest
+from livekit import rtc
+from livekit.agents import llm
+from livekit.agents.stt import SpeechEventType
+
+# Add src and the benchmarks to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+from offline_providers import (
+    FakeSTT,
+    Latencies,
+    ScriptedLLM,
+    ScriptedTurn,
+    SilentTTS,
+    script_responder,
+)
+
+INSTANT = Latencies(stt=0, llm_ttft=0, llm_per_chunk=0, tts_ttfb=0)
+TURNS = [
+    ScriptedTurn("Add milk", "Added milk.", [("add_to_cart", {"item_id": "milk_whole"})]),
+    ScriptedTurn("Hello", "Hi there, what can I get you?"),
+]
+
+
+def user_says(text):
+    ctx = llm.ChatContext.empty()
+    ctx.add_message(role="system", content="You are a grocery assistant.")
+    ctx.add_message(role="user", content=text)
+    return ctx
+
+
+def test_responder_calls_tools_then_replies():
+    respond = script_responder(TURNS)
+    ctx = user_says("Add milk")
+    assert respond(ctx) == ([("add_to_cart", {"item_id": "milk_whole"})], "")
+
+    ctx.items.append(llm.FunctionCall(call_id="c1", name="add_to_cart", arguments="{}"))
+    ctx.items.append(llm.FunctionCallOutput(call_id="c1", name="add_to_cart", output="ok", is_error=False))
+    assert respond(ctx) == ([], "Added milk.")
+    # After a handoff the new agent's instructions follow the user message instead
+    handoff = user_says("Add milk")
+    handoff.add_message(role="system", content="You are now in checkout mode.")
+    assert respond(handoff) == ([], "Added milk.")
+    # Context an agent injects after the user message is not an answer
+    injected = user_says("Add milk")
+    injected.add_message(role="assistant", content="Relevant items: milk_whole")
+    assert respond(injected) == ([("add_to_cart", {"item_id": "milk_whole"})], "")
+    assert respond(user_says("Something else")) == ([], "Okay.")
+
+
+@pytest.mark.asyncio
+async def test_scripted_llm_streams_tool_calls_and_text():
+    model = ScriptedLLM(script_responder(TURNS), INSTANT, words_per_chunk=2)
+    calls, text = [], []
+    async with model.chat(chat_ctx=user_says("Add milk")) as stream:
+        async for chunk in stream:
+            if chunk.delta and chunk.delta.tool_calls:
+                calls.extend(call.name for call in chunk.delta.tool_calls)
+    async with model.chat(chat_ctx=user_says("Hello")) as stream:
+        async for chunk in stream:
+            if chunk.delta and chunk.delta.content:
+                text.append(chunk.delta.content)
+    assert calls == ["add_to_cart"]
+    assert "".join(text) == "Hi there, what can I get you?"
+    assert len(text) == 4
+    assert model.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_stt_returns_queued_transcripts():
+    stt = FakeSTT(INSTANT)
+    stt.queue("first")
+    stt.queue("second")
+    frame = rtc.AudioFrame(b"\x00\x00" * 160, sample_rate=16000, num_channels=1, samples_per_channel=160)
+    assert (await stt.recognize(frame)).alternatives[0].text == "first"
+    assert (await stt.recognize(frame)).alternatives[0].text == "second"
+
+
+@pytest.mark.asyncio
+async def test_fake_stt_stream_ends_a_turn_per_queued_utterance():
+    stt = FakeSTT(INSTANT)
+    frame = rtc.AudioFrame(b"\x00\x00" * 160, sample_rate=16000, num_channels=1, samples_per_channel=160)
+    stream = stt.stream()
+    # Silence: nothing queued, nothing recognized
+    stream.push_frame(frame)
+    stt.queue("hello there")
+    stream.push_frame(frame)
+    stream.end_input()
+    events = [ev async for ev in stream]
+    assert [ev.type for ev in events] == [
+        SpeechEventType.START_OF_SPEECH,
+        SpeechEventType.FINAL_TRANSCRIPT,
+        SpeechEventType.RECOGNITION_USAGE,
+        SpeechEventType.END_OF_SPEECH,
+    ]
+    assert events[1].alternatives[0].text == "hello there"
+
+
+@pytest.mark.asyncio
+async def test_silent_tts_length_follows_text():
+    tts = SilentTTS(INSTANT, sample_rate=16000)
+    frames = [ev.frame async for ev in tts.synthesize("Hello there")]
+    samples = sum(frame.samples_per_channel for frame in frames)
+    # The emitter pads the last frame out to a whole 10 ms frame
+    assert samples == pytest.approx(16000 * 0.06 * len("Hello there"), abs=160)
+    assert not any(any(frame.data) for frame in frames)
+    assert tts.characters == len("Hello there")
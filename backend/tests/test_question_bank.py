@@ -0,0 +1,113 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import shared_data
+from question_bank import (
+    QuestionBank,
+    StubLLM,
+    build_question_bank,
+    content_version,
+    get_question_bank,
+    parse_questions,
+    write_question_bank,
+)
+from agent import QuizAgent
+from scheduler import ReviewScheduler
+
+
+@pytest.fixture
+def content():
+    content_path = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
+    with open(content_path, "r") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+async def bank_file(content, tmp_path):
+    bank = await build_question_bank(content, StubLLM().complete, per_difficulty=2)
+    path = tmp_path / "question_bank.json"
+    write_question_bank(bank, path)
+    return path
+
+
+def test_parse_questions_handles_code_fences():
+    text = '```json\n[{"question": "Q?", "answer": "A."}, {"question": ""}]\n```'
+    assert parse_questions(text) == [{"question": "Q?", "answer": "A."}]
+
+
+@pytest.mark.asyncio
+async def test_builder_indexes_every_concept_and_difficulty(content, bank_file):
+    bank = QuestionBank.load(bank_file, content)
+    assert bank.version == content_version(content)
+    assert len(bank) == len(content) * 3 * 2
+    for concept in content:
+        for difficulty in ("easy", "medium", "hard"):
+            assert difficulty in bank.pick(concept["id"], difficulty)["question"]
+
+
+@pytest.mark.asyncio
+async def test_builder_falls_back_to_sample_question(content):
+    async def broken(prompt):
+        return "not json"
+
+    bank = QuestionBank(await build_question_bank(content[:1], broken))
+    assert bank.pick(content[0]["id"])["question"] == content[0]["sample_question"]
+
+
+@pytest.mark.asyncio
+async def test_pick_rotates_through_questions(bank_file):
+    bank = QuestionBank.load(bank_file)
+    first = bank.pick("loops", "easy")["question"]
+    second = bank.pick("loops", "easy")["question"]
+    third = bank.pick("loops", "easy")["question"]
+    assert first != second
+    assert first == third
+    assert bank.pick("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_quiz_agent_serves_banked_question(content, bank_file):
+    agent = QuizAgent(
+        content,
+        question_bank=QuestionBank.load(bank_file),
+        scheduler=ReviewScheduler([c["id"] for c in content]),
+    )
+    response = await agent.ask_question(None, "loops")
+    assert "easy question about Loops" in response
+    assert "Reference answer" in response
+
+
+@pytest.mark.asyncio
+async def test_bank_for_another_curriculum_is_not_served(content, bank_file):
+    changed = [dict(content[0], summary="A rewritten summary.")] + content[1:]
+    assert QuestionBank.load(bank_file, changed) is None
+    assert QuestionBank.load(bank_file, content) is not None
+
+
+def test_fallback_reports_the_difficulty_actually_used():
+    bank = QuestionBank(
+        {
+            "version": "v",
+            "difficulties": ["easy", "medium", "hard"],
+            "questions": [["Medium Q?", "A."]],
+            "index": {"loops": {"easy": [], "medium": [0]}},
+        }
+    )
+    picked = bank.pick("loops", "hard")
+    assert picked["question"] == "Medium Q?"
+    assert picked["difficulty"] == "medium"
+
+
+@pytest.mark.asyncio
+async def test_bank_built_after_a_miss_is_loaded(tmp_path):
+    path = tmp_path / "question_bank.json"
+    assert get_question_bank(path) is None
+    write_question_bank(await build_question_bank(shared_data.tutor_content(), StubLLM().complete), path)
+    bank = get_question_bank(path)
+    assert bank is not None
+    assert get_question_bank(path) is bank
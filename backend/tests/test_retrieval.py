@@ -0,0 +1,67 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from retrieval import ConceptRetriever, estimate_tokens, tokenize
+from agent import LearnAgent, QuizAgent
+
+
+@pytest.fixture
+def content():
+    content_path = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
+    with open(content_path, "r") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def retriever(content):
+    return ConceptRetriever(content, top_k=2)
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("Can you explain the loops?") == ["loop"]
+
+
+def test_search_ranks_matching_concept_first(retriever):
+    results = retriever.search("what is the difference between a for and while loop")
+    assert results[0]["id"] == "loops"
+    assert len(results) <= 2
+
+
+def test_search_returns_exact_title_match(retriever):
+    results = retriever.search("Functions")
+    assert results[0]["id"] == "functions"
+
+
+def test_search_without_keywords_returns_nothing(retriever):
+    assert retriever.search("ok, sounds good") == []
+
+
+def test_render_context_is_smaller_than_full_curriculum(content, retriever):
+    context = retriever.render_context(retriever.search("variables"), include_question=True)
+    full = retriever.render_context(content, include_question=True)
+    assert "Variables" in context
+    assert estimate_tokens(context) < estimate_tokens(full)
+
+
+def test_instructions_do_not_embed_curriculum(content):
+    agent = QuizAgent(content)
+    for concept in content:
+        assert concept["sample_question"] not in agent.instructions
+
+
+@pytest.mark.asyncio
+async def test_explain_concept_uses_index(content):
+    agent = LearnAgent(content)
+    response = await agent.explain_concept(None, "loops")
+    assert "Here's the explanation for Loops" in response
+
+
+def test_spot_matches_partial_transcript(retriever):
+    assert retriever.spot("so can you explain func") is None
+    assert retriever.spot("so can you explain functions to")["id"] == "functions"
+    assert retriever.spot("um, okay") is None
@@ -0,0 +1,61 @@
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from scheduler import DAY_SECONDS, MIN_EASE, ReviewScheduler, ReviewState, sm2_update
+
+
+def test_sm2_intervals_grow_on_good_answers():
+    state = ReviewState(concept_id="loops")
+    state = sm2_update(state, 5, now=0)
+    assert state.interval_days == 1.0
+    state = sm2_update(state, 5, now=0)
+    assert state.interval_days == 6.0
+    ease = state.ease_factor
+    state = sm2_update(state, 5, now=0)
+    assert state.interval_days == round(6.0 * ease, 2)
+    assert state.due_at == state.interval_days * DAY_SECONDS
+
+
+def test_sm2_failed_answer_resets_repetitions():
+    state = ReviewState(concept_id="loops", repetitions=3, interval_days=15.0)
+    state = sm2_update(state, 1, now=0)
+    assert state.repetitions == 0
+    assert state.interval_days == 1.0
+    assert state.ease_factor < 2.5
+    for _ in range(10):
+        state = sm2_update(state, 0, now=0)
+    assert state.ease_factor == MIN_EASE
+
+
+def test_new_concepts_come_in_curriculum_order():
+    scheduler = ReviewScheduler(["a", "b", "c"])
+    assert scheduler.next_concept() == "a"
+    scheduler.review("a", 5, now=100)
+    assert scheduler.next_concept() == "b"
+
+
+def test_overdue_and_weak_concepts_come_first():
+    states = {
+        "a": {"ease_factor": 2.5, "interval_days": 6, "repetitions": 2, "due_at": 500.0},
+        "b": {"ease_factor": 1.5, "interval_days": 1, "repetitions": 0, "due_at": 200.0},
+        "c": {"ease_factor": 2.5, "interval_days": 1, "repetitions": 0, "due_at": 200.0},
+    }
+    scheduler = ReviewScheduler(["a", "b", "c"], states)
+    assert scheduler.next_concept() == "b"
+    scheduler.review("b", 5, now=1000)
+    assert scheduler.next_concept() == "c"
+
+
+def test_scales_to_large_curricula():
+    ids = [f"concept_{i}" for i in range(20000)]
+    start = time.perf_counter()
+    scheduler = ReviewScheduler(ids)
+    for i in range(2000):
+        concept_id = scheduler.next_concept()
+        scheduler.review(concept_id, i % 6, now=float(i))
+    assert len(scheduler) == 20000
+    assert time.perf_counter() - start < 2.0
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from segmenter import FirstChunkSegmenter, first_chunk_end
+
+
+async def _segment(text: str, step: int = 3, **kwargs) -> list:
+    stream = FirstChunkSegmenter(**kwargs).stream()
+    for i in range(0, len(text), step):
+        stream.push_text(text[i : i + step])
+    stream.end_input()
+    return [data.token async for data in stream]
+
+
+def test_first_chunk_prefers_earliest_boundary():
+    assert first_chunk_end("Sure! Let me check that. ", 3, 8) == len("Sure! ")
+    assert first_chunk_end("Hi, the ancient gates creak open", 3, 8) == 0
+    text = "The ancient gates creak open, revealing"
+    assert text[: first_chunk_end(text, 3, 8)] == "The ancient gates creak open, "
+    text = "one two three four five six seven eight nine"
+    assert text[: first_chunk_end(text, 3, 4)] == "one two three four "
+
+
+def test_abbreviations_do_not_end_first_chunk():
+    assert first_chunk_end("Mr. Smith is here", 3, 8) == 0
+    assert first_chunk_end("Use a loop, e.g. for", 5, 8) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_clause_then_sentences():
+    text = (
+        "The ancient gates creak open, revealing a torchlit hall. "
+        "Shadows dance across the walls! What do you do?"
+    )
+    assert await _segment(text) == [
+        "The ancient gates creak open,",
+        "revealing a torchlit hall.",
+        "Shadows dance across the walls!",
+        "What do you do?",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_is_released_before_sentence_completes():
+    stream = FirstChunkSegmenter(max_first_words=4).stream()
+    for word in "Razorpay helps businesses accept payments online ".split(" "):
+        stream.push_text(word + " ")
+    first = await stream.__anext__()
+    assert first.token == "Razorpay helps businesses accept"
+    stream.end_input()
+    assert [data.token async for data in stream] == ["payments online"]
+
+
+@pytest.mark.asyncio
+async def test_each_flushed_segment_gets_a_new_first_chunk():
+    stream = FirstChunkSegmenter().stream()
+    stream.push_text("Okay, here we go. Next part")
+    stream.flush()
+    stream.push_text("The second reply, as it happens, has a clause. ")
+    stream.end_input()
+    tokens = [data async for data in stream]
+    assert [t.token for t in tokens] == [
+        "Okay, here we go.",
+        "Next part",
+        "The second reply,",
+        "as it happens, has a clause.",
+    ]
+    assert tokens[0].segment_id != tokens[-1].segment_id
@@ -0,0 +1,114 @@
+import sys
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from livekit.plugins.turn_detector import multilingual
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import client_pool
+import session_factory
+import session_memory
+import tts_pool
+from session_factory import AgentSpec, SessionConfig
+
+
+class FakeProc:
+    def __init__(self):
+        self.userdata = {"vad": None}
+
+
+@pytest.fixture(autouse=True)
+def provider_keys(monkeypatch):
+    for key in ("CARTESIA_API_KEY", "GOOGLE_API_KEY", "MURF_API_KEY"):
+        monkeypatch.setenv(key, "test-key")
+    monkeypatch.setattr(multilingual, "MultilingualModel", lambda: None)
+
+
+def test_override_keeps_other_fields():
+    config = SessionConfig(voice="en-IN-Anisha", voice_style="Promo")
+    faster = config.override(llm_model="gemini-2.5-flash")
+    assert faster.voice == "en-IN-Anisha"
+    assert faster.llm_model == "gemini-2.5-flash"
+    assert config.llm_model == "gemini-2.5-flash-lite"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sessions_get_their_own_clients():
+    first_lease = client_pool.open_lease()
+    first = session_factory.create_session(FakeProc(), SessionConfig())
+    client_pool.open_lease()
+    second = session_factory.create_session(FakeProc(), SessionConfig())
+    assert first is not second
+    assert first.stt is not second.stt
+    assert first.llm is not second.llm
+    assert first.tts is not second.tts
+    # The first session's clients are held by its own lease
+    assert [key[0] for key in first_lease.held()] == ["stt", "llm", "tts"]
+
+
+@pytest.mark.asyncio
+async def test_next_session_reuses_released_clients():
+    lease = client_pool.open_lease()
+    first = session_factory.create_session(FakeProc(), SessionConfig())
+    lease.release()
+    client_pool.open_lease()
+    second = session_factory.create_session(FakeProc(), SessionConfig(voice="en-US-alicia"))
+    assert first.stt is second.stt
+    assert first.llm is second.llm
+    assert first.tts is not second.tts
+    assert tts_pool.pool_size() == 2
+
+
+def test_prewarm_records_stages_and_warms_each_agent():
+    proc = FakeProc()
+    warmed = []
+    specs = [
+        AgentSpec(name="tutor", build=object, warm=lambda: warmed.append("tutor")),
+        AgentSpec(
+            name="sdr",
+            build=object,
+            config=SessionConfig(voice="en-IN-Anisha", voice_style="Promo"),
+            warm=lambda: warmed.append("sdr"),
+        ),
+    ]
+    session_factory.prewarm(proc, specs)
+    assert proc.userdata["vad"] is not None
+    assert proc.userdata["noise_cancellation"] is not None
+    assert warmed == ["tutor", "sdr"]
+    assert tts_pool.pool_size() == 2
+    assert list(proc.userdata["prewarm_timings"]) == [
+        "vad_load",
+        "vad_inference",
+        "noise_cancellation",
+        "audio_cache",
+        "provider_clients",
+        "data_tutor",
+        "data_sdr",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_setup_releases_session_memory(monkeypatch):
+    monkeypatch.setenv("SESSION_MEMORY", "1")
+
+    def broken():
+        raise ValueError("bad content")
+
+    ctx = SimpleNamespace(
+        room=SimpleNamespace(name="room-1"),
+        job=SimpleNamespace(id="job-1"),
+        proc=FakeProc(),
+        add_shutdown_callback=lambda callback: pytest.fail("setup failed before shutdown hooks"),
+    )
+    with pytest.raises(ValueError):
+        await session_factory.run_session(ctx, AgentSpec(name="tutor", build=broken))
+
+    # The next session in this process is measured again
+    memory = session_memory.SessionMemory("room-2", "tutor")
+    assert memory.start()
+    memory.stop()
+    tracemalloc.stop()
@@ -0,0 +1,91 @@
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from livekit.agents import ChatContext
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import latency_metrics
+import session_memory
+from agent_game_master import GameMasterAgent
+from session_memory import SessionMemory
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    latency_metrics.reset()
+    yield
+    latency_metrics.reset()
+    tracemalloc.stop()
+    session_memory._ACTIVE = None
+
+
+async def fake_session(agent, turns: int):
+    history = ChatContext()
+    for i in range(turns):
+        history.add_message(role="user", content=f"turn {i}")
+    await agent.update_chat_ctx(history)
+    return SimpleNamespace(current_agent=agent, history=history)
+
+
+@pytest.mark.asyncio
+async def test_under_budget_records_sample_without_compacting():
+    memory = SessionMemory("room-1", "game_master", budget_mb=64)
+    memory.start()
+    session = await fake_session(GameMasterAgent(), 50)
+
+    await memory.check(session)
+
+    assert memory.compactions == 0
+    assert len(session.history.items) == 50
+    assert latency_metrics.histograms()[("session_memory", "game_master", "tracemalloc")].count == 1
+
+
+@pytest.mark.asyncio
+async def test_over_budget_compacts_agent_and_history_then_warns(caplog):
+    memory = SessionMemory("room-1", "game_master", budget_mb=0.25)
+    memory.start()
+    agent = GameMasterAgent()
+    session = await fake_session(agent, 80)
+    # Keep growth alive after compaction so the warning fires
+    ballast = [bytearray(1024) for _ in range(1024)]
+    agent.world_state["events"] = [{"description": "x", "turn": i + 1} for i in range(500)]
+
+    with caplog.at_level(logging.WARNING, logger="session-memory"):
+        await memory.check(session)
+        await memory.check(session)
+
+    # The second check has not grown 25% past the first compaction
+    assert memory.compactions == 1
+    assert len(agent.world_state["events"]) == 100
+    assert len(agent.chat_ctx.items) == session_memory.KEEP_CHAT_ITEMS
+    assert len(session.history.items) == session_memory.KEEP_CHAT_ITEMS
+    assert memory.warnings == 1
+    assert "largest sites" in caplog.text
+
+    ballast.extend(bytearray(1024) for _ in range(1024))
+    await memory.check(session)
+    assert memory.compactions == 2
+    assert memory.warnings == 2
+    del ballast
+
+    memory.stop()
+    assert latency_metrics.histograms()[("session_memory_peak", "game_master", "tracemalloc")].count == 1
+
+
+def test_second_session_in_process_is_not_measured(caplog):
+    first = SessionMemory("room-1", "game_master")
+    assert first.start()
+    with caplog.at_level(logging.WARNING, logger="session-memory"):
+        assert not SessionMemory("room-2", "game_master").start()
+    assert "one session per process" in caplog.text
+
+    first.stop()
+    second = SessionMemory("room-2", "game_master")
+    assert second.start()
+    second.stop()
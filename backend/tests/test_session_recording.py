@@ -0,0 +1,112 @@
+import gzip
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+from livekit.agents import llm, metrics
+from livekit.agents.voice.events import FunctionToolsExecutedEvent
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import agent
+import agent_game_master
+import session_recording
+from session_recording import CallResult, SessionRecorder
+
+SAMPLES = Path(__file__).parent / "benchmarks" / "data" / "recordings"
+
+
+@pytest.fixture(autouse=True)
+def data_paths(monkeypatch, tmp_path):
+    """Replay warms and builds real agents; keep their database and saves out of shared-data."""
+    monkeypatch.setattr(agent, "MASTERY_DB_PATH", tmp_path / "mastery.db")
+    monkeypatch.setattr(agent_game_master, "SAVES_DIR", tmp_path / "game_saves")
+
+
+def test_recorder_round_trip(tmp_path):
+    recorder = SessionRecorder("room-1", "food", tmp_path)
+    started = recorder.started
+    recorder.on_item(llm.ChatMessage(role="user", content=["Add milk"]), started + 1.0)
+    call = llm.FunctionCall(
+        call_id="c1", name="add_to_cart", arguments='{"item_id": "milk_whole"}', created_at=started + 1.5
+    )
+    output = llm.FunctionCallOutput(
+        call_id="c1", name="add_to_cart", output="Added 1 Whole Milk", is_error=False, created_at=started + 1.502
+    )
+    recorder.on_tools_executed(FunctionToolsExecutedEvent(function_calls=[call], function_call_outputs=[output]))
+    recorder.on_metrics(
+        metrics.TTSMetrics(
+            label="murf.TTS", request_id="r", timestamp=started + 2.0, ttfb=0.2, duration=0.5,
+            audio_duration=1.0, cancelled=False, characters_count=20, streamed=True,
+        )
+    )
+    path = recorder.save()
+
+    with gzip.open(path, "rt") as f:
+        assert f.readline().startswith('{"v":1')
+    header, events = session_recording.load(path)
+    assert header["agent"] == "food" and header["room"] == "room-1"
+    assert [e["k"] for e in events] == ["msg", "tool", "tts"]
+    assert events[0]["t"] == 1000.0
+    assert events[1]["args"] == {"item_id": "milk_whole"}
+    assert events[1]["ms"] == pytest.approx(2.0)
+
+
+def test_compare_flags_regressions_above_the_noise_floor():
+    recorded = [CallResult("search_catalog", 0.002, 40000), CallResult("place_order", skipped=True), CallResult("list_cart", 0.00001, 500)]
+    baseline = session_recording.baseline_record(recorded, reference=0.01)
+    assert baseline["calls"][0]["relative"] == pytest.approx(0.2)
+
+    same = [CallResult("search_catalog", 0.0021, 41000), CallResult("place_order", skipped=True), CallResult("list_cart", 0.00003, 1500)]
+    assert session_recording.compare(same, baseline, reference=0.01) == []
+    # The same times on a machine twice as fast are a regression
+    problems = session_recording.compare(same, baseline, reference=0.005)
+    assert problems == ["call 0 search_catalog took 2.10 ms, baseline 1.00 ms on this machine"]
+
+    slower = [CallResult("search_catalog", 0.004, 90000), CallResult("place_order", skipped=True), CallResult("list_cart", 0.00001, 500)]
+    problems = session_recording.compare(slower, baseline, reference=0.01)
+    assert len(problems) == 2
+    assert "took 4.00 ms" in problems[0] and "allocated" in problems[1]
+
+    assert "no longer match" in session_recording.compare(same[:2], baseline, reference=0.01)[0]
+    assert "--update-baseline" in session_recording.compare(same, baseline["calls"], reference=0.01)[0]
+
+
+def test_missing_baseline_fails_unless_updating(tmp_path):
+    sample = tmp_path / "food-sample.jsonl.gz"
+    shutil.copy(SAMPLES / "food-sample.jsonl.gz", sample)
+    assert session_recording.main(["replay", str(sample), "--repeat", "1"]) == 1
+    assert session_recording.main(["replay", str(sample), "--repeat", "1", "--update-baseline"]) == 0
+    assert "calls" in json.loads(session_recording.baseline_path(sample).read_text())
+
+
+@pytest.mark.benchmark
+def test_committed_samples_match_committed_baselines():
+    samples = sorted(SAMPLES.glob("*.jsonl.gz"))
+    assert samples and all(session_recording.baseline_path(p).exists() for p in samples)
+    # A loose latency bound; this guards against regressions, not scheduler noise on CI
+    assert session_recording.main(["replay", *map(str, samples), "--repeat", "3", "--latency-ratio", "3"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_runs_recorded_calls_offline():
+    calls = [
+        {"name": "search_catalog", "args": {"query": "milk"}},
+        {"name": "add_to_cart", "args": {"item_id": "milk_whole", "quantity": 2}},
+        {"name": "place_order", "args": {}},
+        {"name": "renamed_tool", "args": {}},
+    ]
+    results = await session_recording.replay("food", calls, repeat=2)
+    assert [r.name for r in results] == [c["name"] for c in calls]
+    assert results[0].seconds > 0 and results[0].peak_bytes > 0 and results[0].error is None
+    assert results[2].skipped
+    assert "no tool renamed_tool" in results[3].error
+
+
+def test_sample_recordings_load():
+    for path in SAMPLES.glob("*.jsonl.gz"):
+        header, events = session_recording.load(path)
+        assert any(e["k"] == "tool" for e in events), path.name
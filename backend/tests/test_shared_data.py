@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import shared_data
+
+
+def test_loaders_parse_once_per_process():
+    assert shared_data.tutor_content() is shared_data.tutor_content()
+    assert shared_data.concept_retriever().content is shared_data.tutor_content()
+
+
+def test_game_universes_tolerate_byte_order_mark():
+    # game_universes.json is saved with a UTF-8 BOM
+    universes = shared_data.game_universes()
+    assert "fantasy" in universes
+    assert universes["fantasy"]["player_template"]["name"]
+
+
+def test_missing_file_falls_back_to_default(monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_data, "DATA_DIR", tmp_path)
+    assert shared_data._load_json("missing.json", {"faqs": []}) == {"faqs": []}
@@ -0,0 +1,26 @@
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from timing import StageTimer, export_job_timings
+
+
+def test_stage_timer_records_stages_in_order():
+    timer = StageTimer()
+    timer.mark("data")
+    timer.mark("session")
+    stages = timer.as_dict()
+    assert list(stages) == ["data", "session"]
+    assert timer.total >= 0
+    assert timer.summary().endswith("ms)")
+
+
+def test_export_appends_one_line_per_job(tmp_path):
+    path = tmp_path / "timings.jsonl"
+    export_job_timings({"job_id": "a", "stages_ms": {"data": 1.0}}, path)
+    export_job_timings({"job_id": "b", "stages_ms": {"data": 2.0}}, path)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["job_id"] for r in records] == ["a", "b"]
@@ -0,0 +1,116 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from livekit.agents import Agent, RunContext, function_tool
+from livekit.agents.llm.utils import build_legacy_openai_schema
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import tool_profiler
+
+
+class ToolAgent(Agent):
+    def __init__(self) -> None:
+        super().__init__(instructions="test")
+
+    @function_tool
+    async def lookup(self, context: RunContext, query: str):
+        """Look something up.
+
+        Args:
+            query: What to look up
+        """
+        await asyncio.sleep(0.02)
+        return f"found {query}"
+
+    @function_tool
+    async def crunch(self, context: RunContext):
+        """Block the event loop."""
+        time.sleep(0.02)
+        return "done"
+
+    @function_tool
+    async def fail(self, context: RunContext):
+        """Always fails."""
+        raise ValueError("nope")
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    tool_profiler.reset()
+    yield
+    tool_profiler.reset()
+
+
+@pytest.fixture(scope="module")
+def agent_cls():
+    assert tool_profiler.instrument(ToolAgent) == 3
+    # A second pass finds nothing left to wrap
+    assert tool_profiler.instrument(ToolAgent) == 0
+    return ToolAgent
+
+
+@pytest.mark.asyncio
+async def test_instrumented_tools_keep_their_schema(agent_cls):
+    agent = agent_cls()
+    tools = {t.info.name: t for t in agent.tools}
+    assert set(tools) == {"lookup", "crunch", "fail"}
+    schema = build_legacy_openai_schema(tools["lookup"])
+    assert list(schema["function"]["parameters"]["properties"]) == ["query"]
+    assert await tools["lookup"](None, query="apples") == "found apples"
+
+
+@pytest.mark.asyncio
+async def test_separates_io_wait_from_event_loop_time(agent_cls):
+    agent = agent_cls()
+    await agent.lookup(None, query="x" * 100)
+    await agent.crunch(None)
+
+    lookup = tool_profiler.stats()["ToolAgent.lookup"]
+    assert lookup.calls == 1
+    assert lookup.wall.sum >= 0.02
+    assert lookup.loop.sum < 0.01
+    assert lookup.io.sum >= 0.015
+    assert lookup.arg_chars == 100
+    assert lookup.result_chars == len("found " + "x" * 100)
+
+    # A blocking call holds the event loop instead of awaiting
+    crunch = tool_profiler.stats()["ToolAgent.crunch"]
+    assert crunch.loop.sum >= 0.02
+    assert crunch.io.sum < 0.01
+
+
+@pytest.mark.asyncio
+async def test_records_exceptions_and_reraises(agent_cls):
+    agent = agent_cls()
+    with pytest.raises(ValueError):
+        await agent.fail(None)
+    stats = tool_profiler.stats()["ToolAgent.fail"]
+    assert stats.errors == {"ValueError": 1}
+    assert stats.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_report_sorted_by_total_time(agent_cls):
+    agent = agent_cls()
+    await agent.crunch(None)
+    for _ in range(3):
+        await agent.lookup(None, query="a")
+    lines = tool_profiler.report().splitlines()
+    assert lines[1].startswith("ToolAgent.lookup")
+    assert lines[2].startswith("ToolAgent.crunch")
+
+
+def test_report_without_calls():
+    assert tool_profiler.report() == "No tool calls recorded"
+
+
+def test_enabled_from_env(monkeypatch):
+    monkeypatch.setenv("TOOL_PROFILE", "1")
+    assert tool_profiler.enabled()
+    monkeypatch.setenv("TOOL_PROFILE", "0")
+    assert not tool_profiler.enabled()
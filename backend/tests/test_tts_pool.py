@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import client_pool
+import tts_pool
+
+
+def test_same_voice_returns_same_instance():
+    first = tts_pool.get_tts("en-US-matthew")
+    assert tts_pool.get_tts("en-US-matthew") is first
+    assert tts_pool.pool_size() == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_leases_never_share_a_client():
+    first = client_pool.open_lease()
+    matthew = tts_pool.get_tts("en-US-matthew")
+    assert tts_pool.get_tts("en-US-matthew") is matthew
+    client_pool.open_lease()
+    other = tts_pool.get_tts("en-US-matthew")
+    assert other is not matthew
+    assert tts_pool.background_tts("en-US-matthew") not in (matthew, other)
+
+    first.release()
+    client_pool.open_lease()
+    assert tts_pool.get_tts("en-US-matthew") is matthew
+    assert tts_pool.pool_size() == 3
+
+
+@pytest.mark.asyncio
+async def test_released_lease_falls_back_to_shared_client():
+    lease = client_pool.open_lease()
+    leased = tts_pool.get_tts("en-US-matthew")
+    lease.release()
+    lease.release()
+    assert tts_pool.get_tts("en-US-matthew") is tts_pool.background_tts("en-US-matthew")
+    assert tts_pool.get_tts("en-US-matthew") is not leased
+
+
+@pytest.mark.asyncio
+async def test_warmed_client_is_leased_first():
+    tts_pool.warm_tts("en-US-matthew")
+    tts_pool.warm_tts("en-US-matthew")
+    client_pool.open_lease()
+    tts_pool.get_tts("en-US-matthew")
+    assert tts_pool.pool_size() == 1
+
+
+def test_pool_is_keyed_by_voice_and_style():
+    matthew = tts_pool.get_tts("en-US-matthew")
+    alicia = tts_pool.get_tts("en-US-alicia")
+    promo = tts_pool.get_tts("en-US-matthew", style="Promo")
+    assert len({id(matthew), id(alicia), id(promo)}) == 3
+    assert tts_pool.pool_size() == 3
+    assert "en-US-matthew/Promo" in tts_pool.pooled_voices()
+
+
+def test_factory_replaces_pooled_voices():
+    tts_pool.get_tts("en-US-matthew")
+    made = []
+    tts_pool.set_factory(lambda voice, style, text_pacing: made.append(voice) or voice)
+    try:
+        assert tts_pool.pool_size() == 0
+        assert tts_pool.get_tts("en-US-ken") == "en-US-ken"
+        assert made == ["en-US-ken"]
+    finally:
+        tts_pool.set_factory(tts_pool.murf_tts)
+
+
+def test_threads_racing_for_a_shared_client_build_one():
+    built = []
+
+    def slow_factory():
+        # Long enough for every thread to miss the pool before the first build finishes
+        time.sleep(0.05)
+        built.append(threading.get_ident())
+        return object()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        clients = list(pool.map(lambda _: client_pool.shared(("tts", "race"), slow_factory), range(4)))
+    assert len(built) == 1
+    assert all(client is clients[0] for client in clients)
@@ -0,0 +1,134 @@
+import sys
+from pathlib import Path
+
+import pytest
+from livekit.agents import llm, metrics
+from livekit.agents.metrics.base import Metadata
+from livekit.agents.voice.events import FunctionToolsExecutedEvent
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import turn_tracing
+from turn_tracing import SpanExporter, TurnTracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def eou(speech_id="turn-1", at=100.0):
+    return metrics.EOUMetrics(
+        timestamp=at,
+        end_of_utterance_delay=0.5,
+        transcription_delay=0.3,
+        on_user_turn_completed_delay=0.1,
+        speech_id=speech_id,
+    )
+
+
+def llm_metrics(speech_id="turn-1", at=101.0):
+    return metrics.LLMMetrics(
+        label="google.LLM",
+        request_id="r",
+        timestamp=at,
+        duration=0.9,
+        ttft=0.4,
+        cancelled=False,
+        completion_tokens=20,
+        prompt_tokens=100,
+        prompt_cached_tokens=0,
+        total_tokens=120,
+        tokens_per_second=20.0,
+        speech_id=speech_id,
+        metadata=Metadata(model_name="gemini-2.5-flash-lite", model_provider="google"),
+    )
+
+
+def tts_metrics(speech_id="turn-1", at=102.0):
+    return metrics.TTSMetrics(
+        label="murf.TTS",
+        request_id="r",
+        timestamp=at,
+        ttfb=0.2,
+        duration=1.5,
+        audio_duration=3.0,
+        cancelled=False,
+        characters_count=80,
+        streamed=True,
+        speech_id=speech_id,
+    )
+
+
+def test_builds_stage_spans_from_metrics():
+    exporter = ListExporter()
+    tracer = TurnTracer("room-1", "tutor", exporter)
+    tracer.on_metrics(eou())
+    tracer.on_metrics(llm_metrics())
+    tracer.on_metrics(tts_metrics())
+
+    spans = {s["span"]: s for s in exporter.spans}
+    assert set(spans) == {
+        "vad_endpointing",
+        "stt_final",
+        "on_user_turn_completed",
+        "llm_first_token",
+        "llm",
+        "tts_first_byte",
+        "tts",
+    }
+    assert all(s["room"] == "room-1" and s["turn"] == "turn-1" for s in exporter.spans)
+    # User speech ended at 100.0 - 0.1 (hook) - 0.5 (endpointing)
+    assert spans["vad_endpointing"]["start"] == 99.4
+    assert spans["stt_final"]["end"] == 99.7
+    assert spans["llm_first_token"]["end"] - spans["llm_first_token"]["start"] == pytest.approx(0.4)
+    assert spans["llm"]["attrs"]["model"] == "gemini-2.5-flash-lite"
+
+
+def test_tool_spans_join_the_current_turn():
+    exporter = ListExporter()
+    tracer = TurnTracer("room-1", "food", exporter)
+    tracer.on_metrics(llm_metrics(speech_id="turn-7"))
+    call = llm.FunctionCall(call_id="c1", name="search_catalog", arguments="{}", created_at=101.0)
+    output = llm.FunctionCallOutput(call_id="c1", name="search_catalog", output="[]", is_error=False, created_at=101.25)
+    tracer.on_tools_executed(FunctionToolsExecutedEvent(function_calls=[call], function_call_outputs=[output]))
+
+    tool = exporter.spans[-1]
+    assert tool["span"] == "tool:search_catalog"
+    assert tool["turn"] == "turn-7"
+    assert tool["end"] - tool["start"] == pytest.approx(0.25)
+
+
+def test_disabled_tracer_exports_nothing():
+    tracer = TurnTracer("room-1", "tutor", None)
+    tracer.on_metrics(eou())
+
+
+def test_exporter_writes_rotates_and_renders(tmp_path):
+    exporter = SpanExporter(directory=tmp_path, max_bytes=500, backups=2, interval=0.05)
+    for i, room in enumerate(["fast", "slow"]):
+        tracer = TurnTracer(room, "tutor", exporter)
+        tracer.on_metrics(eou(speech_id=f"t{i}"))
+        tracer.on_metrics(llm_metrics(speech_id=f"t{i}", at=101.0 + i))
+        tracer.on_metrics(tts_metrics(speech_id=f"t{i}", at=102.0 + 2 * i))
+    assert exporter.flush()
+
+    files = turn_tracing.trace_files(tmp_path)
+    assert any(p.name.endswith(".jsonl.1") for p in files)
+    turns = turn_tracing.load_turns(files)
+    slowest = turn_tracing.slowest_turns(turns, 1)
+    (room, turn), spans = slowest[0]
+    assert room == "slow"
+
+    text = turn_tracing.render_waterfall(room, turn, spans)
+    assert text.splitlines()[0].startswith("slow turn t1 (tutor)")
+    assert "tts_first_byte" in text
+
+
+def test_cli_reports_missing_traces(tmp_path, capsys):
+    assert turn_tracing.main(["--dir", str(tmp_path)]) == 1
+    assert "No turn traces" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from agent import CoordinatorAgent, LearnAgent, QuizAgent, TutorModes
+
+
+@pytest.fixture
+def content():
+    content_path = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
+    with open(content_path, "r") as f:
+        return json.load(f)
+
+
+@pytest.mark.asyncio
+async def test_mode_agents_are_reused(content):
+    modes = TutorModes(content)
+    coordinator = modes.get("coordinator")
+    quiz, message = await coordinator.switch_to_quiz(None)
+    assert isinstance(quiz, QuizAgent)
+    assert message == "Switching to quiz mode"
+
+    learn, _ = await quiz.switch_to_learn(None)
+    quiz_again, _ = await learn.switch_to_quiz(None)
+    assert quiz_again is quiz
+    back, _ = await quiz_again.switch_to_coordinator(None)
+    assert back is coordinator
+
+
+def test_rendered_instructions_are_cached(content):
+    first = LearnAgent(content)
+    second = LearnAgent(content)
+    assert first.instructions is second.instructions
+    assert first.enter_instructions is second.enter_instructions
+    assert "Variables" in first.enter_instructions
+
+
+@pytest.mark.asyncio
+async def test_handoff_latency_is_reported(content):
+    reports = []
+    modes = TutorModes(content, on_handoff=lambda *args: reports.append(args))
+    coordinator = CoordinatorAgent(content, modes=modes)
+    learn, _ = await coordinator.switch_to_learn(None)
+
+    modes.entered("coordinator")  # not the pending target, ignored
+    modes.entered(learn.mode)
+    assert len(reports) == 1
+    from_mode, to_mode, seconds = reports[0]
+    assert (from_mode, to_mode) == ("coordinator", "learn")
+    assert seconds >= 0
+
+
+@pytest.mark.asyncio
+async def test_handoff_carries_recent_conversation(content):
+    modes = TutorModes(content)
+    coordinator = modes.get("coordinator")
+    chat_ctx = coordinator.chat_ctx.copy()
+    chat_ctx.add_message(role="user", content="I want to be quizzed on loops")
+    await coordinator.update_chat_ctx(chat_ctx)
+
+    quiz, _ = await coordinator.switch_to_quiz(None)
+    texts = [item.text_content for item in quiz.chat_ctx.items if item.type == "message"]
+    assert texts == ["I want to be quizzed on loops"]
+
+
+@pytest.mark.asyncio
+async def test_learn_agent_injects_prefetched_concept(content):
+    from types import SimpleNamespace
+    from livekit.agents import llm
+
+    agent = LearnAgent(content)
+    agent._on_user_input_transcribed(SimpleNamespace(transcript="explain loo", is_final=False))
+    agent._on_user_input_transcribed(SimpleNamespace(transcript="explain loops", is_final=False))
+
+    turn_ctx = llm.ChatContext.empty()
+    message = turn_ctx.add_message(role="user", content="explain loops please")
+    await agent.on_user_turn_completed(turn_ctx, message)
+    injected = turn_ctx.items[-1].text_content
+    assert "The learner is asking about Loops" in injected
+    assert "without calling explain_concept" in injected
+
+    agent._on_agent_state_changed(SimpleNamespace(new_state="speaking"))
+    assert len(agent.modes.prefetch_stats.samples[True]) == 1
+    assert "with prefetch: 1 turns" in agent.modes.prefetch_stats.summary()
@@ -0,0 +1,144 @@
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from livekit.agents import metrics
+from livekit.agents.metrics.base import Metadata
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import usage_metrics
+from usage_metrics import UsageRecorder
+
+
+def llm_metrics(prompt: int, completion: int, cached: int = 0, model: str = "gemini-2.5-flash"):
+    return metrics.LLMMetrics(
+        label="google.LLM",
+        request_id="r",
+        timestamp=0.0,
+        duration=1.0,
+        ttft=0.3,
+        cancelled=False,
+        completion_tokens=completion,
+        prompt_tokens=prompt,
+        prompt_cached_tokens=cached,
+        total_tokens=prompt + completion,
+        tokens_per_second=1.0,
+        metadata=Metadata(model_name=model, model_provider="google"),
+    )
+
+
+def tts_metrics(characters: int, audio: float):
+    return metrics.TTSMetrics(
+        label="murf.TTS",
+        request_id="r",
+        timestamp=0.0,
+        ttfb=0.1,
+        duration=1.0,
+        audio_duration=audio,
+        cancelled=False,
+        characters_count=characters,
+        streamed=True,
+        metadata=Metadata(model_name="FALCON", model_provider="murf"),
+    )
+
+
+def test_flush_writes_one_batch_per_interval_and_rolls_up(tmp_path):
+    db = tmp_path / "usage.db"
+    food = UsageRecorder("room-1", "food", db)
+    tutor = UsageRecorder("room-2", "tutor", db)
+    food.observe(llm_metrics(100, 20, cached=40))
+    food.observe(llm_metrics(150, 30))
+    food.observe(tts_metrics(60, 4.0))
+    tutor.observe(llm_metrics(500, 50, model="gemini-2.5-flash-lite"))
+
+    assert food.flush() == 2
+    assert food.flush() == 0
+    food.observe(tts_metrics(40, 2.5))
+    assert food.flush() == 1
+    assert tutor.flush() == 1
+
+    rows = usage_metrics.rollup(["agent", "model"], path=db)
+    assert [row[:-1] for row in rows] == [
+        ("food", "llm:gemini-2.5-flash", 2, 250, 40, 50, 0, 0.0),
+        ("food", "tts:FALCON", 2, 0, 0, 0, 100, 6.5),
+        ("tutor", "llm:gemini-2.5-flash-lite", 1, 500, 0, 50, 0, 0.0),
+    ]
+    # Cached tokens are charged at the cached rate, not on top of the input rate
+    assert [row[-1] for row in rows] == pytest.approx([(210 * 0.30 + 40 * 0.03 + 50 * 2.50) / 1e6, 6.5 * 0.01 / 60, (500 * 0.10 + 50 * 0.40) / 1e6])
+    (hour, *totals), = usage_metrics.rollup(["hour"], path=db)
+    assert hour.endswith(":00") and totals[:2] == [5, 750]
+    assert usage_metrics.rollup(["agent"], since=4e9, path=db) == []
+
+
+@pytest.mark.asyncio
+async def test_periodic_flush_survives_without_shutdown(tmp_path):
+    db = tmp_path / "usage.db"
+    recorder = UsageRecorder("room-1", "sdr", db)
+    task = asyncio.create_task(recorder.flush_periodically(interval=0.01))
+    recorder.observe(llm_metrics(10, 5))
+    await asyncio.sleep(0.1)
+    task.cancel()
+
+    assert recorder.rows_written == 1
+    assert usage_metrics.rollup(["agent"], path=db) == [("sdr", 1, 10, 0, 5, 0, 0.0, pytest.approx(15.5e-6))]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_usage_for_the_next_flush(tmp_path):
+    # A file where the database directory should be makes every write fail
+    (tmp_path / "blocked").write_text("")
+    recorder = UsageRecorder("room-1", "food", tmp_path / "blocked" / "usage.db")
+    recorder.observe(llm_metrics(100, 20))
+
+    with pytest.raises(OSError):
+        await recorder.store()
+    recorder.observe(llm_metrics(50, 10))
+    recorder.path = tmp_path / "usage.db"
+    assert await recorder.store() == 1
+
+    assert recorder.rows_written == 1
+    assert usage_metrics.rollup(["agent"], path=recorder.path) == [("food", 2, 150, 0, 30, 0, 0.0, pytest.approx(120e-6))]
+
+
+def test_unknown_models_cost_nothing_and_old_files_gain_a_cost_column(tmp_path):
+    assert usage_metrics.cost("llm", "some-new-model", [1, 1000, 0, 1000, 0, 0.0]) == 0.0
+
+    db = tmp_path / "usage.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE usage (at REAL, room TEXT, agent TEXT, kind TEXT, model TEXT, provider TEXT, requests INTEGER,"
+        " input_tokens INTEGER, cached_tokens INTEGER, output_tokens INTEGER, characters INTEGER, audio_seconds REAL)"
+    )
+    conn.execute("INSERT INTO usage VALUES (1, 'room-0', 'sdr', 'llm', 'gemini-2.5-flash', 'google', 1, 10, 0, 5, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    recorder = UsageRecorder("room-1", "sdr", db)
+    recorder.observe(llm_metrics(10, 5))
+    assert recorder.flush() == 1
+    assert usage_metrics.rollup(["room"], path=db) == [
+        ("room-0", 1, 10, 0, 5, 0, 0.0, 0.0),
+        ("room-1", 1, 10, 0, 5, 0, 0.0, pytest.approx(15.5e-6)),
+    ]
+
+
+def test_tracking_is_opt_in(monkeypatch):
+    monkeypatch.delenv("USAGE_TRACKING", raising=False)
+    assert not usage_metrics.enabled()
+    monkeypatch.setenv("USAGE_TRACKING", "1")
+    assert usage_metrics.enabled()
+
+
+def test_cli_prints_rollup(tmp_path, capsys):
+    db = tmp_path / "usage.db"
+    recorder = UsageRecorder("room-1", "game_master", db)
+    recorder.observe(tts_metrics(12, 1.0))
+    recorder.flush()
+
+    assert usage_metrics.main(["--db", str(db), "--by", "agent,hour"]) == 0
+    assert "game_master" in capsys.readouterr().out
+    assert usage_metrics.main(["--db", str(tmp_path / "missing.db")]) == 1
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import worker
+from worker import AGENTS, agent_from_metadata, agent_from_room_name, route
+
+
+def test_metadata_accepts_bare_names_and_json():
+    assert agent_from_metadata("sdr") == "sdr"
+    assert agent_from_metadata('{"agent": "game-master", "universe": "horror"}') == "game_master"
+    assert agent_from_metadata('"food_ordering"') == "food"
+    assert agent_from_metadata('{"universe": "horror"}') is None
+    assert agent_from_metadata("unknown") is None
+    assert agent_from_metadata("") is None
+
+
+def test_room_name_prefix():
+    assert agent_from_room_name("sdr-9f3a") == "sdr"
+    assert agent_from_room_name("Game-Master_1") == "game_master"
+    assert agent_from_room_name("food_ordering-42") == "food"
+    assert agent_from_room_name("sdrx-1") is None
+
+
+def test_route_precedence():
+    assert route('{"agent": "food"}', "sdr", "game_master-1") == "food"
+    assert route("", "sdr", "game_master-1") == "sdr"
+    assert route("", "", "game_master-1") == "game_master"
+    assert route("", "", "room-1") == worker.DEFAULT_AGENT
+
+
+def test_every_agent_has_a_spec():
+    assert set(AGENTS) == {"tutor", "food", "game_master", "sdr"}
+    assert AGENTS["sdr"].config.voice_style == "Promo"